@@ -0,0 +1,76 @@
+"""Stand-in for the hidapi module, used by benchmarks without hardware.
+
+It exposes one device answering each APDU with the APDU itself and
+status word 0x9000, using the HID framing of Ledger devices.
+"""
+
+import collections
+from typing import Any, Deque, Dict, List
+
+CHANNEL_TAG = b"\x01\x01\x05"
+REPORT_DATA_SIZE = 59  # 64-byte report minus channel, tag and sequence index
+
+DEVICES: List[Dict[str, Any]] = [
+    {"path": b"fakehid-0", "vendor_id": 0x2C97, "product_id": 0x4015, "interface_number": 0}
+]
+
+
+def enumerate(vendor_id: int = 0, product_id: int = 0) -> List[Dict[str, Any]]:
+    """List fake devices matching `vendor_id` (0 for any)."""
+    return [dict(device) for device in DEVICES if vendor_id in (0, device["vendor_id"])]
+
+
+class device:
+    """Fake device echoing APDUs."""
+
+    def __init__(self) -> None:
+        self._apdu = bytearray()
+        self._expected = 0
+        self._reports: Deque[bytes] = collections.deque()
+
+    def open_path(self, path: bytes) -> None:
+        """Open the fake device, whatever `path`."""
+
+    def set_nonblocking(self, nonblocking: int) -> int:
+        """Nothing to do, responses are ready as soon as APDUs are written."""
+        return 0
+
+    def write(self, report: Any) -> int:
+        """Receive one report (prefixed with report ID) of an APDU."""
+        report = bytes(report)
+        seq = int.from_bytes(report[4:6], byteorder="big")
+
+        if seq == 0:
+            self._expected = int.from_bytes(report[6:8], byteorder="big")
+            self._apdu = bytearray(report[8:])
+        else:
+            self._apdu += report[6:]
+
+        if len(self._apdu) >= self._expected:
+            self._respond(bytes(self._apdu[: self._expected]) + b"\x90\x00")
+
+        return len(report)
+
+    def _respond(self, response: bytes) -> None:
+        data = len(response).to_bytes(2, byteorder="big") + response
+
+        # no enumerate() here, shadowed by the hidapi function
+        for i in range(0, len(data), REPORT_DATA_SIZE):
+            seq = i // REPORT_DATA_SIZE
+            chunk = data[i : i + REPORT_DATA_SIZE]
+            self._reports.append(
+                CHANNEL_TAG
+                + seq.to_bytes(2, byteorder="big")
+                + chunk
+                + bytes(REPORT_DATA_SIZE - len(chunk))
+            )
+
+    def read(self, size: int, timeout_ms: int = 0) -> List[int]:
+        """Read the next report of the response, empty if none."""
+        if not self._reports:
+            return []
+
+        return list(self._reports.popleft())
+
+    def close(self) -> None:
+        """Close the fake device."""
@@ -0,0 +1,426 @@
+"""Benchmarks of ledgercomm framing, transports and CLI, without hardware.
+
+HID exchanges go through `benchmarks/fakehid`, a stand-in for hidapi
+echoing APDUs, and TCP/Unix exchanges through `FakeDevice`. Results are
+printed and can be saved as JSON to be compared across releases:
+
+    $ python benchmarks/run.py --output before.json
+    $ python benchmarks/run.py --compare before.json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# benchmark the checkout, with the stand-in for hidapi
+sys.path[:0] = [str(ROOT), str(ROOT / "benchmarks" / "fakehid")]
+
+from ledgercomm import Transport, __version__
+from ledgercomm.apdu import ApduTemplate, BulkEncoder
+from ledgercomm.fake_device import FakeDevice
+from ledgercomm.interfaces.hid_framing import (
+    HID_CHANNEL,
+    HIDFrameDecoder,
+    HIDFrameEncoder,
+)
+from ledgercomm.reconnect import ReconnectPolicy
+
+# command data sizes: small APDU and largest short APDU
+PAYLOADS = {"small": 4, "large": 255}
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of `sorted_values`."""
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def measure(name: str, op: Callable[[], Any], n: int, batch: int = 1) -> Dict[str, Any]:
+    """Time `n` calls of `op` (each doing `batch` operations), then trace its allocations."""
+    for _ in range(min(n, 100)):  # warm up
+        op()
+
+    timings: List[float] = []
+    clock = time.perf_counter
+    start = clock()
+    for _ in range(n):
+        t = clock()
+        op()
+        timings.append(clock() - t)
+    total = clock() - start
+    timings.sort()
+
+    calls = max(1, n // 10)
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    for _ in range(calls):
+        op()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "name": name,
+        "ops": n * batch,
+        "ops_per_s": round(n * batch / total, 1),
+        "p50_us": round(percentile(timings, 0.50) / batch * 1e6, 2),
+        "p99_us": round(percentile(timings, 0.99) / batch * 1e6, 2),
+        "alloc_peak_bytes": peak - baseline,
+        "alloc_retained_bytes_per_op": round((current - baseline) / (calls * batch), 1),
+    }
+
+
+def apdu(size: int) -> bytes:
+    """APDU with `size` bytes of command data."""
+    return bytes([0xE0, 0x01, 0x00, 0x00, size]) + bytes(range(size))
+
+
+def bench_framing(n: int) -> Iterator[Dict[str, Any]]:
+    """HID codec, APDU header packing and APDU templates."""
+    yield measure("apdu_header", lambda: Transport.apdu_header(0xE0, 0x01, 0, 0, None, 4), n)
+
+    template = ApduTemplate(0xE0, 0x01)
+    yield measure("apdu_template_header", lambda: template.header(4), n)
+
+    for label, size in PAYLOADS.items():
+        cdata = bytes(range(size))
+        if template.encode(cdata) != Transport.apdu_header(0xE0, 0x01, lc=size) + cdata:
+            raise RuntimeError("ApduTemplate doesn't match Transport.apdu_header")
+        yield measure(
+            f"apdu_header_concat_{label}",
+            lambda c=cdata: Transport.apdu_header(0xE0, 0x01, 0, 0, None, len(c)) + c,
+            n,
+        )
+        yield measure(f"apdu_template_encode_{label}", lambda c=cdata: template.encode(c), n)
+
+    cdata = bytes(range(PAYLOADS["small"]))
+    bulk = BulkEncoder()
+
+    def bulk_encode(count: int = 1000) -> None:
+        bulk.clear()
+        for _ in range(count):
+            bulk.add(template, cdata)
+
+    bulk_encode()
+    if bytes(bulk.getbuffer()) != template.encode(cdata) * 1000:
+        raise RuntimeError("BulkEncoder doesn't match ApduTemplate")
+    yield measure("bulk_encode_small", bulk_encode, max(1, n // 100), batch=1000)
+
+    encoder = HIDFrameEncoder(HID_CHANNEL, 64, report_id=0)
+    decoder = HIDFrameDecoder(HID_CHANNEL)
+
+    for label, size in PAYLOADS.items():
+        data = apdu(size)
+        yield measure(f"hid_encode_{label}", lambda data=data: list(encoder.encode(data)), n)
+
+        response = len(data + b"\x90\x00").to_bytes(2, byteorder="big") + data + b"\x90\x00"
+        reports = [
+            HID_CHANNEL.to_bytes(2, byteorder="big")
+            + b"\x05"
+            + (i // 59).to_bytes(2, byteorder="big")
+            + response[i : i + 59].ljust(59, b"\x00")
+            for i in range(0, len(response), 59)
+        ]
+
+        def decode(reports: List[bytes] = reports) -> Any:
+            decoder.reset()
+            for report in reports:
+                decoder.feed(report)
+            return decoder.response()
+
+        yield measure(f"hid_decode_{label}", decode, n)
+
+
+@contextlib.contextmanager
+def fake_device_process(*args: str) -> Iterator[None]:
+    """Run `ledgercomm-fake-device` in a subprocess, so it isn't traced with the benchmark."""
+    process = subprocess.Popen(  # pylint: disable=consider-using-with
+        [sys.executable, "-m", "ledgercomm.cli.fake_device", *args],
+        env=dict(os.environ, PYTHONPATH=str(ROOT)),
+    )
+
+    try:
+        yield
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def connect(interface: str, deadline: float = 10.0, **kwargs: Any) -> Transport:
+    """Connect to a fake device which may not listen yet."""
+    end = time.monotonic() + deadline
+
+    while True:
+        try:
+            return Transport(interface=interface, **kwargs)  # type: ignore
+        except OSError:
+            if time.monotonic() > end:
+                raise
+            time.sleep(0.05)
+
+
+def free_port() -> int:
+    """TCP port free on localhost."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def bench_exchanges(n: int) -> Iterator[Dict[str, Any]]:
+    """Exchanges through fake HID, TCP and Unix socket stand-ins."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "fake-device.sock")
+        port = free_port()
+
+        with fake_device_process("--port", str(port)), fake_device_process("--path", path):
+            transports = {
+                "hid": Transport(interface="hid"),
+                "tcp": connect("tcp", port=port),
+                "unix": connect("unix", path=path),
+            }
+
+            for interface, transport in transports.items():
+                for label, size in PAYLOADS.items():
+                    cdata = bytes(range(size))
+                    yield measure(
+                        f"{interface}_exchange_{label}",
+                        lambda t=transport, c=cdata: t.exchange(0xE0, 0x01, cdata=c),
+                        n,
+                    )
+
+            batch = [apdu(PAYLOADS["small"])] * 64
+
+            for interface in ("tcp", "unix"):
+                yield measure(
+                    f"{interface}_exchange_many_small",
+                    lambda t=transports[interface]: t.exchange_many(batch, window=16),
+                    max(1, n // 64),
+                    batch=len(batch),
+                )
+
+            # responses read in place, only copied for the history when the buffer is reused
+            client = transports["tcp"].com
+            large = apdu(PAYLOADS["large"])
+
+            def send_recv_view() -> None:
+                client.send(large)
+                client.recv_view()
+
+            yield measure("tcp_recv_view_large", send_recv_view, n)
+
+            # overhead of keeping APDUs in flight for recovery, on a healthy connection
+            resilient = Transport(interface="tcp", port=port, reconnect=ReconnectPolicy())
+            cdata = bytes(range(PAYLOADS["small"]))
+            yield measure(
+                "tcp_reconnect_exchange_small",
+                lambda: resilient.exchange(0xE0, 0x01, cdata=cdata),
+                n,
+            )
+            resilient.close()
+
+            for transport in transports.values():
+                transport.close()
+
+
+def bench_cli(size_mb: float) -> Iterator[Dict[str, Any]]:
+    """Throughput of `ledgercomm-send file` on an APDU script of `size_mb` MB."""
+    line = apdu(PAYLOADS["large"]).hex().upper() + "\n"
+    count = max(1, int(size_mb * 1e6) // len(line))
+
+    with tempfile.TemporaryDirectory() as tmp, FakeDevice() as device:
+        script = Path(tmp) / "apdus.txt"
+        script.write_text(line * count, encoding="utf-8")
+
+        env = dict(os.environ, PYTHONPATH=str(ROOT))
+
+        # results as JSON lines on stdout, then without any output
+        for name, options in (("cli_send_file", []), ("cli_send_file_quiet", ["--quiet"])):
+            exchanges = device.exchanges
+            start = time.perf_counter()
+            subprocess.run(
+                [sys.executable, "-m", "ledgercomm.cli.send", "--port", str(device.port)]
+                + options
+                + ["file", str(script)],
+                check=True,
+                env=env,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            total = time.perf_counter() - start
+
+            if device.exchanges - exchanges != count:
+                raise RuntimeError(
+                    f"{device.exchanges - exchanges} APDUs exchanged instead of {count}"
+                )
+
+            yield {
+                "name": name,
+                "ops": count,
+                "ops_per_s": round(count / total, 1),
+                "mb_per_s": round(len(line) * count / total / 1e6, 3),
+                "seconds": round(total, 3),
+            }
+
+
+# statements run in a fresh interpreter to measure their import time
+IMPORTS = {
+    "import_ledgercomm": "import ledgercomm",
+    "import_transport": "from ledgercomm import Transport",
+    "import_tcp_interface": (
+        "from ledgercomm import Transport\nfrom ledgercomm.interfaces.tcp_client import TCPClient"
+    ),
+}
+
+
+def import_time(statement: str, env: Dict[str, str]) -> float:
+    """Seconds spent importing ledgercomm modules to run `statement`, from `-X importtime`."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        check=True,
+        env=env,
+        capture_output=True,
+        text=True,
+    ).stderr
+    total = 0
+    for line in stderr.splitlines():
+        # "import time: self [us] | cumulative | name", nested imports are indented
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].startswith(" ledgercomm"):
+            total += int(fields[1])
+
+    return total / 1e6
+
+
+def bench_imports(runs: int) -> Iterator[Dict[str, Any]]:
+    """Import time of ledgercomm and startup time of `ledgercomm-send`."""
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+
+    for name, statement in IMPORTS.items():
+        timings = sorted(import_time(statement, env) for _ in range(runs))
+        yield {
+            "name": name,
+            "ops": runs,
+            "ops_per_s": round(1 / percentile(timings, 0.5), 1),
+            "median_ms": round(percentile(timings, 0.5) * 1e3, 2),
+        }
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-m", "ledgercomm.cli.send", "--version"],
+            check=True,
+            env=env,
+            stdout=subprocess.DEVNULL,
+        )
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+
+    yield {
+        "name": "cli_send_startup",
+        "ops": runs,
+        "ops_per_s": round(1 / percentile(timings, 0.5), 1),
+        "median_ms": round(percentile(timings, 0.5) * 1e3, 2),
+    }
+
+
+def describe(result: Dict[str, Any]) -> str:
+    """One line summary of `result`."""
+    line = f"{result['name']:<30} {result['ops_per_s']:>12,.0f} ops/s"
+
+    if "p50_us" in result:
+        return (
+            line + f"  p50 {result['p50_us']:>8.2f} us  p99 {result['p99_us']:>8.2f} us"
+            f"  peak {result['alloc_peak_bytes']:>7} B"
+        )
+    if "median_ms" in result:
+        return line + f"  median {result['median_ms']:.2f} ms"
+
+    return line + f"  {result['mb_per_s']:.3f} MB/s"
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str) -> None:
+    """Print the throughput of `results` relative to a previous run."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {r["name"]: r for r in json.load(f)["results"]}
+
+    print(f"\ncompared to {baseline_path}:")
+    for result in results:
+        before = baseline.get(result["name"])
+        if before and before["ops_per_s"]:
+            ratio = result["ops_per_s"] / before["ops_per_s"]
+            print(f"  {result['name']:<28} {ratio:6.2f}x ops/s")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entrypoint of the benchmarks."""
+    parser = argparse.ArgumentParser(description="Benchmarks of ledgercomm without hardware")
+    parser.add_argument("-n", help="Calls per benchmark (default: 5000)", default=5000, type=int)
+    parser.add_argument(
+        "--cli-mb",
+        help="Size in MB of the APDU script sent with the CLI (default: 4)",
+        default=4.0,
+        type=float,
+    )
+    parser.add_argument("--quick", help="Short run, e.g. as a smoke test", action="store_true")
+    parser.add_argument(
+        "--only",
+        help="Only run these groups of benchmarks (default: all)",
+        nargs="+",
+        choices=["framing", "exchanges", "cli", "imports"],
+    )
+    parser.add_argument("--output", help="Save results as JSON to OUTPUT")
+    parser.add_argument("--compare", help="Compare results with a JSON file of a previous run")
+
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        args.n, args.cli_mb = 500, 0.2
+
+    results: List[Dict[str, Any]] = []
+
+    groups = {
+        "framing": lambda: bench_framing(args.n),
+        "exchanges": lambda: bench_exchanges(args.n),
+        "cli": lambda: bench_cli(args.cli_mb),
+        "imports": lambda: bench_imports(5 if args.quick else 20),
+    }
+
+    for group, bench in groups.items():
+        if args.only and group not in args.only:
+            continue
+        for result in bench():
+            results.append(result)
+            print(describe(result))
+
+    if args.output:
+        report = {
+            "ledgercomm": __version__,
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "n": args.n,
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        compare(results, args.compare)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,34 @@
 """ledgercomm module."""
 
-from ledgercomm.transport import Transport
+import importlib
+from typing import TYPE_CHECKING, Any, List
 
 try:
     from ledgercomm.__version__ import __version__  # noqa
 except ImportError:
     __version__ = "unknown version"  # noqa
 
-__all__ = ["Transport"]
+if TYPE_CHECKING:
+    from ledgercomm.async_transport import AsyncTransport
+    from ledgercomm.transport import Transport
+
+__all__ = ["AsyncTransport", "Transport"]
+
+# public classes imported on first access, e.g. `Transport` doesn't import asyncio
+_LAZY_ATTRIBUTES = {
+    "AsyncTransport": "ledgercomm.async_transport",
+    "Transport": "ledgercomm.transport",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+        globals()[name] = value
+        return value
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> List[str]:
+    return sorted(list(globals()) + list(_LAZY_ATTRIBUTES))
@@ -0,0 +1,284 @@
+"""ledgercomm.apdu module."""
+
+import enum
+import struct
+from array import array
+from typing import Iterator, List, Optional, Union
+
+from ledgercomm.interfaces.comm import BytesLike
+
+# CLA, INS, P1, P2, Lc
+HEADER = struct.Struct("BBBBB")
+# CLA, INS, P1, P2, Lc, Opt
+HEADER_WITH_OPTION = struct.Struct("BBBBBB")
+
+
+class ApduTemplate:
+    """ApduTemplate class, an APDU command with fixed CLA, INS, P1, P2.
+
+    Encodes the same bytes as `Transport.apdu_header()` followed by the
+    command data, without resolving parameters on every call.
+
+    Parameters
+    ----------
+    cla : int
+        Instruction class: CLA (1 byte)
+    ins : Union[int, IntEnum]
+        Instruction code: INS (1 byte)
+    p1 : int
+        Instruction parameter: P1 (1 byte).
+    p2 : int
+        Instruction parameter: P2 (1 byte).
+    option : Optional[int]
+        Optional parameter: Opt (1 byte), sent before the command data.
+
+    Attributes
+    ----------
+    cla : int
+        Instruction class.
+    ins : int
+        Instruction code.
+    p1 : int
+        Instruction parameter P1.
+    p2 : int
+        Instruction parameter P2.
+    option : Optional[int]
+        Optional parameter.
+
+    Examples
+    --------
+    >>> sign = ApduTemplate(cla=0xE0, ins=0x04, p2=0x80)
+    >>> sw, rdata = transport.exchange_template(sign, cdata=chunk)
+
+    """
+
+    __slots__ = ("cla", "ins", "p1", "p2", "option", "_struct")
+
+    def __init__(
+        self,
+        cla: int,
+        ins: Union[int, enum.IntEnum],
+        p1: int = 0,
+        p2: int = 0,
+        option: Optional[int] = None,
+    ) -> None:
+        """Init constructor of ApduTemplate."""
+        self.cla: int = cla
+        self.ins: int = int(ins)
+        self.p1: int = p1
+        self.p2: int = p2
+        # as in `Transport.apdu_header`, a null option isn't sent
+        self.option: Optional[int] = option if option else None
+        self._struct: struct.Struct = HEADER if self.option is None else HEADER_WITH_OPTION
+        # checks parameters once
+        self._struct.pack(*self._values(0))
+
+    def _values(self, lc: int) -> tuple:
+        if self.option is None:
+            return (self.cla, self.ins, self.p1, self.p2, lc)
+
+        return (self.cla, self.ins, self.p1, self.p2, 1 + lc, self.option)
+
+    @property
+    def header_size(self) -> int:
+        """Length of the header in bytes, option included."""
+        return self._struct.size
+
+    def header(self, lc: int = 0) -> bytes:
+        """Pack the APDU header for `lc` bytes of command data.
+
+        Parameters
+        ----------
+        lc : int
+            Number of bytes in the command data.
+
+        Returns
+        -------
+        bytes
+            APDU header, option included.
+
+        """
+        return self._struct.pack(*self._values(lc))
+
+    def encode(self, cdata: BytesLike = b"") -> bytes:
+        """Encode the whole APDU with command data `cdata`.
+
+        Parameters
+        ----------
+        cdata : Union[bytes, bytearray, memoryview]
+            Command data.
+
+        Returns
+        -------
+        bytes
+            APDU header followed by `cdata`.
+
+        """
+        return self.header(len(cdata)) + cdata
+
+    def pack_into(self, buffer: bytearray, offset: int, cdata: BytesLike = b"") -> int:
+        """Encode the APDU with command data `cdata` into `buffer` at `offset`.
+
+        Parameters
+        ----------
+        buffer : bytearray
+            Destination, large enough for the APDU.
+        offset : int
+            Position of the APDU in `buffer`.
+        cdata : Union[bytes, bytearray, memoryview]
+            Command data.
+
+        Returns
+        -------
+        int
+            Position in `buffer` right after the APDU.
+
+        """
+        self._struct.pack_into(buffer, offset, *self._values(len(cdata)))
+        offset += self._struct.size
+        end: int = offset + len(cdata)
+        buffer[offset:end] = cdata
+
+        return end
+
+
+class BulkEncoder:
+    """BulkEncoder class, packing APDUs into one contiguous buffer.
+
+    APDUs are encoded one after the other in a growing `bytearray` and an
+    offset table keeps their boundaries, so thousands of APDUs cost a few
+    reallocations instead of one object each. `views()` gives them without
+    copy for `Transport.exchange_iter()` or `Comm.send_many()`.
+
+    Views on the buffer must be released before adding APDUs, otherwise
+    the buffer can't grow and `BufferError` is raised.
+
+    Parameters
+    ----------
+    size : int
+        Initial size of the buffer in bytes.
+
+    Examples
+    --------
+    >>> encoder = BulkEncoder()
+    >>> for chunk in chunks:
+    ...     encoder.add(sign, chunk)
+    >>> responses = transport.exchange_many(encoder.views())
+
+    """
+
+    def __init__(self, size: int = 64 * 1024) -> None:
+        """Init constructor of BulkEncoder."""
+        self._buffer: bytearray = bytearray(max(size, 1))
+        # offset of the start of each APDU, then offset of the end of the last one
+        self._offsets: array = array("Q", [0])
+
+    def __len__(self) -> int:
+        """Number of APDUs encoded."""
+        return len(self._offsets) - 1
+
+    @property
+    def nbytes(self) -> int:
+        """Total length of APDUs encoded."""
+        return self._offsets[-1]
+
+    @property
+    def offsets(self) -> array:
+        """Offset table: start of each APDU, then end of the last one."""
+        return self._offsets
+
+    def _reserve(self, size: int) -> None:
+        needed: int = self._offsets[-1] + size
+
+        if needed > len(self._buffer):
+            self._buffer.extend(bytes(max(needed, 2 * len(self._buffer)) - len(self._buffer)))
+
+    def add(self, template: ApduTemplate, cdata: BytesLike = b"") -> int:
+        """Encode the APDU of `template` with command data `cdata`.
+
+        Parameters
+        ----------
+        template : ApduTemplate
+            Command to encode.
+        cdata : Union[bytes, bytearray, memoryview]
+            Command data.
+
+        Returns
+        -------
+        int
+            Index of the APDU.
+
+        """
+        self._reserve(template.header_size + len(cdata))
+        self._offsets.append(template.pack_into(self._buffer, self._offsets[-1], cdata))
+
+        return len(self._offsets) - 2
+
+    def add_raw(self, apdu: BytesLike) -> int:
+        """Copy the already encoded `apdu`.
+
+        Parameters
+        ----------
+        apdu : Union[bytes, bytearray, memoryview]
+            Raw APDU.
+
+        Returns
+        -------
+        int
+            Index of the APDU.
+
+        """
+        start: int = self._offsets[-1]
+        self._reserve(len(apdu))
+        self._buffer[start : start + len(apdu)] = apdu
+        self._offsets.append(start + len(apdu))
+
+        return len(self._offsets) - 2
+
+    def __getitem__(self, i: int) -> memoryview:
+        """View on the `i`-th APDU."""
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("APDU index out of range")
+
+        return memoryview(self._buffer)[self._offsets[i] : self._offsets[i + 1]]
+
+    def __iter__(self) -> Iterator[memoryview]:
+        """Iterate over views on APDUs."""
+        return iter(self.views())
+
+    def views(self) -> List[memoryview]:
+        """Views on each APDU, without copy.
+
+        Returns
+        -------
+        List[memoryview]
+            One view per APDU, in the order they were added.
+
+        """
+        buffer: memoryview = memoryview(self._buffer)
+        offsets: array = self._offsets
+
+        return [buffer[offsets[i] : offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+    def getbuffer(self) -> memoryview:
+        """View on all APDUs, contiguous.
+
+        Returns
+        -------
+        memoryview
+            APDUs one after the other, boundaries given by `offsets`.
+
+        """
+        return memoryview(self._buffer)[: self._offsets[-1]]
+
+    def clear(self) -> None:
+        """Drop all APDUs, keeping the buffer allocated.
+
+        Returns
+        -------
+        None
+
+        """
+        del self._offsets[1:]
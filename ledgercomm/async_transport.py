@@ -0,0 +1,262 @@
+"""ledgercomm.async_transport module."""
+
+import asyncio
+import enum
+from typing import Any, Awaitable, Literal, Optional, Tuple, TypeVar, Union
+
+from ledgercomm.interfaces.async_comm import AsyncComm
+from ledgercomm.interfaces.async_tcp_client import AsyncTCPClient
+from ledgercomm.log import enable_debug_logs
+from ledgercomm.transport import Transport, TransportType
+
+T = TypeVar("T")
+
+
+class AsyncTransport:
+    """AsyncTransport class to send APDUs from an asyncio event loop.
+
+    Same API as `Transport` but every IO method is a coroutine accepting
+    a `timeout` (in seconds) which overrides the default one. Exchanges
+    may run concurrently (e.g. with `asyncio.gather()`) and responses are
+    handed out in the order APDUs were sent. A timed out or cancelled
+    exchange doesn't desynchronize the interface: its response is
+    discarded when it eventually comes, while the response awaited by a
+    timed out `recv()` is returned by the next one.
+
+    Parameters
+    ----------
+    interface : str
+        Either "hid" or "tcp" for the underlying communication interface.
+    server : str
+        IP address of the TCP server if interface is "tcp".
+    port : int
+        Port of the TCP server if interface is "tcp".
+    debug : bool
+        Whether you want debug logs or not.
+    timeout : Optional[float]
+        Default timeout in seconds of IO methods, None to wait forever.
+
+    Attributes
+    ----------
+    interface : TransportType
+        Either TransportType.HID or TransportType.TCP.
+    com : AsyncComm
+        Communication interface to send/receive APDUs.
+    timeout : Optional[float]
+        Default timeout in seconds of IO methods.
+
+    Examples
+    --------
+    >>> async with AsyncTransport(interface="tcp", port=9999) as transport:
+    ...     sw, rdata = await transport.exchange(cla=0xE0, ins=0x01, timeout=5)
+
+    """
+
+    def __init__(
+        self,
+        interface: Literal["hid", "tcp"] = "tcp",
+        server: str = "127.0.0.1",
+        port: int = 9999,
+        debug: bool = False,
+        timeout: Optional[float] = None,
+    ) -> None:
+        """Init constructor of AsyncTransport."""
+        if debug:
+            enable_debug_logs()
+
+        self.interface: TransportType
+
+        try:
+            self.interface = TransportType[interface.upper()]
+        except KeyError as exc:
+            raise KeyError(f"Unknown interface '{interface}'!") from exc
+
+        self.com: AsyncComm
+
+        if self.interface == TransportType.TCP:
+            self.com = AsyncTCPClient(server=server, port=port)
+        else:
+            # imported here to keep hidapi optional for TCP users
+            from ledgercomm.interfaces.async_hid_device import AsyncHID
+
+            self.com = AsyncHID()
+
+        self.timeout: Optional[float] = timeout
+
+    async def __aenter__(self) -> "AsyncTransport":
+        """Open the interface when entering `async with` block."""
+        await self.open()
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        """Close the interface when leaving `async with` block."""
+        await self.close()
+
+    async def _wait(self, aw: Awaitable[T], timeout: Optional[float]) -> T:
+        return await asyncio.wait_for(aw, timeout if timeout is not None else self.timeout)
+
+    async def open(self, timeout: Optional[float] = None) -> None:
+        """Open `self.com` interface.
+
+        Parameters
+        ----------
+        timeout : Optional[float]
+            Timeout in seconds, default to `self.timeout`.
+
+        Returns
+        -------
+        None
+
+        """
+        await self._wait(self.com.open(), timeout)
+
+    async def send(
+        self,
+        cla: int,
+        ins: Union[int, enum.IntEnum],
+        p1: int = 0,
+        p2: int = 0,
+        option: Optional[int] = None,
+        cdata: bytes = b"",
+        timeout: Optional[float] = None,
+    ) -> int:
+        """Send structured APDUs through `self.com`.
+
+        Parameters
+        ----------
+        cla : int
+            Instruction class: CLA (1 byte)
+        ins : Union[int, IntEnum]
+            Instruction code: INS (1 byte)
+        p1 : int
+            Instruction parameter: P1 (1 byte).
+        p2 : int
+            Instruction parameter: P2 (1 byte).
+        option : Optional[int]
+            Optional parameter: Opt (1 byte).
+        cdata : bytes
+            Command data (variable length).
+        timeout : Optional[float]
+            Timeout in seconds, default to `self.timeout`.
+
+        Returns
+        -------
+        int
+            Total length of the APDU sent.
+
+        """
+        header: bytes = Transport.apdu_header(cla, ins, p1, p2, option, len(cdata))
+
+        return await self._wait(self.com.send(header + cdata), timeout)
+
+    async def send_raw(self, apdu: Union[str, bytes], timeout: Optional[float] = None) -> int:
+        """Send raw bytes `apdu` through `self.com`.
+
+        Parameters
+        ----------
+        apdu : Union[str, bytes]
+            Hexstring or bytes within APDU to be sent through `self.com`.
+        timeout : Optional[float]
+            Timeout in seconds, default to `self.timeout`.
+
+        Returns
+        -------
+        int
+            Total length of APDU sent.
+
+        """
+        if isinstance(apdu, str):
+            apdu = bytes.fromhex(apdu)
+
+        return await self._wait(self.com.send(apdu), timeout)
+
+    async def recv(self, timeout: Optional[float] = None) -> Tuple[int, bytes]:
+        """Receive data from `self.com`.
+
+        Parameters
+        ----------
+        timeout : Optional[float]
+            Timeout in seconds, default to `self.timeout`.
+
+        Returns
+        -------
+        Tuple[int, bytes]
+            A pair (sw, rdata) for the status word (2 bytes represented
+            as int) and the response data (variable length).
+
+        """
+        return await self._wait(self.com.recv(), timeout)
+
+    async def exchange(
+        self,
+        cla: int,
+        ins: Union[int, enum.IntEnum],
+        p1: int = 0,
+        p2: int = 0,
+        option: Optional[int] = None,
+        cdata: bytes = b"",
+        timeout: Optional[float] = None,
+    ) -> Tuple[int, bytes]:
+        """Send structured APDUs and wait to receive data from `self.com`.
+
+        Parameters
+        ----------
+        cla : int
+            Instruction class: CLA (1 byte)
+        ins : Union[int, IntEnum]
+            Instruction code: INS (1 byte)
+        p1 : int
+            Instruction parameter: P1 (1 byte).
+        p2 : int
+            Instruction parameter: P2 (1 byte).
+        option : Optional[int]
+            Optional parameter: Opt (1 byte).
+        cdata : bytes
+            Command data (variable length).
+        timeout : Optional[float]
+            Timeout in seconds for the whole exchange, default to `self.timeout`.
+
+        Returns
+        -------
+        Tuple[int, bytes]
+            A pair (sw, rdata) for the status word (2 bytes represented
+            as int) and the response data (bytes of variable length).
+
+        """
+        header: bytes = Transport.apdu_header(cla, ins, p1, p2, option, len(cdata))
+
+        return await self._wait(self.com.exchange(header + cdata), timeout)
+
+    async def exchange_raw(
+        self, apdu: Union[str, bytes], timeout: Optional[float] = None
+    ) -> Tuple[int, bytes]:
+        """Send raw bytes `apdu` and wait to receive data from `self.com`.
+
+        Parameters
+        ----------
+        apdu : Union[str, bytes]
+            Hexstring or bytes within APDU to send through `self.com`.
+        timeout : Optional[float]
+            Timeout in seconds for the whole exchange, default to `self.timeout`.
+
+        Returns
+        -------
+        Tuple[int, bytes]
+            A pair (sw, rdata) for the status word (2 bytes represented
+            as int) and the response (bytes of variable length).
+
+        """
+        if isinstance(apdu, str):
+            apdu = bytes.fromhex(apdu)
+
+        return await self._wait(self.com.exchange(apdu), timeout)
+
+    async def close(self) -> None:
+        """Close `self.com` interface.
+
+        Returns
+        -------
+        None
+
+        """
+        await self.com.close()
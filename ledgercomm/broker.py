@@ -0,0 +1,285 @@
+"""ledgercomm.broker module."""
+
+import collections
+import contextlib
+import socket
+import threading
+from typing import Any, Deque, List, Optional
+
+from ledgercomm.interfaces.broker_client import default_broker_path
+from ledgercomm.interfaces.comm import Comm
+from ledgercomm.interfaces.unix_socket import remove_socket
+from ledgercomm.log import LOG
+
+# larger than any extended APDU, longer lengths come from broken or hostile clients
+MAX_APDU_LENGTH = 64 * 1024
+
+
+class _Client:
+    """Connection of a client process to the broker."""
+
+    def __init__(self, conn: socket.socket, name: str) -> None:
+        self.conn = conn
+        self.name = name
+        self.requests: Deque[bytes] = collections.deque()
+        self.closed: bool = False
+        self.thread: Optional[threading.Thread] = None
+
+    def read_exact(self, size: int) -> bytes:
+        data = bytearray()
+        while len(data) < size:
+            chunk = self.conn.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError(f"Client {self.name} disconnected")
+            data += chunk
+        return bytes(data)
+
+
+class Broker:
+    """Broker class to share one device between several processes.
+
+    The broker owns the communication interface `com` (e.g. `HID` or
+    `TCPClient`) and serves clients on a Unix socket with the same
+    protocol as Speculos: 4-byte length then APDU, answered by 4-byte
+    length, response data then 2-byte status word. Clients connect with
+    `Transport(interface="broker", path=...)`.
+
+    Each client has its own queue of APDUs and queues are served in
+    round-robin, one APDU at a time, so a client sending many APDUs
+    doesn't starve others. APDUs of a client which disconnects are
+    dropped, as are clients announcing APDUs longer than `MAX_APDU_LENGTH`.
+
+    Parameters
+    ----------
+    com : Comm
+        Communication interface to the device, opened by `start()`.
+    path : Optional[str]
+        Path of the Unix socket to listen on, `default_broker_path()` if None.
+        A socket left at `path` by a previous broker is replaced, anything
+        else makes `start()` fail.
+
+    Attributes
+    ----------
+    com : Comm
+        Communication interface to the device.
+    path : str
+        Path of the Unix socket.
+    exchanges : int
+        Number of APDUs exchanged with the device.
+
+    """
+
+    def __init__(self, com: Comm, path: Optional[str] = None) -> None:
+        """Init constructor of Broker."""
+        self.com: Comm = com
+        self.path: str = path if path is not None else default_broker_path()
+        self.exchanges: int = 0
+        self._server: Optional[socket.socket] = None
+        self._clients: List[_Client] = []
+        # clients with pending requests, in round-robin order
+        self._ready: Deque[_Client] = collections.deque()
+        self._cond = threading.Condition()
+        self._running: bool = False
+        self._threads: List[threading.Thread] = []
+        self._count: int = 0
+
+    def __enter__(self) -> "Broker":
+        """Start the broker when entering `with` block."""
+        self.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        """Stop the broker when leaving `with` block."""
+        self.stop()
+
+    @property
+    def clients(self) -> int:
+        """Number of clients connected."""
+        with self._cond:
+            return len(self._clients)
+
+    def start(self) -> None:
+        """Open `self.com` and listen on `self.path` in background threads.
+
+        Returns
+        -------
+        None
+
+        """
+        if self._running:
+            return
+
+        # stale socket of a previous broker, raises if `self.path` isn't a socket
+        remove_socket(self.path)
+
+        self.com.open()
+
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(self.path)
+        self._server.listen()
+        # accept() wakes up periodically to notice stop()
+        self._server.settimeout(0.5)
+        self._running = True
+
+        for target, name in ((self._accept, "accept"), (self._dispatch, "dispatch")):
+            thread = threading.Thread(target=target, name=f"ledgercomm-broker-{name}")
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+        LOG.info("Broker listening on %s", self.path)
+
+    def serve_forever(self) -> None:
+        """Start the broker and block until `stop()` is called (or KeyboardInterrupt).
+
+        Returns
+        -------
+        None
+
+        """
+        self.start()
+
+        try:
+            for thread in self._threads:
+                while thread.is_alive():
+                    thread.join(0.5)
+        finally:
+            self.stop()
+
+    def _accept(self) -> None:
+        assert self._server is not None
+
+        while self._running:
+            try:
+                conn, _ = self._server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break  # server socket closed by stop()
+
+            conn.settimeout(None)
+
+            self._count += 1
+            client = _Client(conn, f"#{self._count}")
+            client.thread = threading.Thread(
+                target=self._read, args=(client,), name=f"ledgercomm-broker-client{client.name}"
+            )
+            client.thread.daemon = True
+
+            with self._cond:
+                self._clients.append(client)
+
+            LOG.info("Broker client %s connected", client.name)
+            client.thread.start()
+
+    def _read(self, client: _Client) -> None:
+        try:
+            while self._running:
+                length: int = int.from_bytes(client.read_exact(4), byteorder="big")
+                if length > MAX_APDU_LENGTH:
+                    LOG.warning(
+                        "Broker client %s sent a %d-byte APDU (max %d), disconnecting",
+                        client.name,
+                        length,
+                        MAX_APDU_LENGTH,
+                    )
+                    return
+                apdu: bytes = client.read_exact(length)
+
+                with self._cond:
+                    if not client.requests:
+                        self._ready.append(client)
+                    client.requests.append(apdu)
+                    self._cond.notify()
+        except OSError:
+            pass
+        finally:
+            self._drop(client)
+
+    def _drop(self, client: _Client) -> None:
+        with self._cond:
+            if client.closed:
+                return
+            client.closed = True
+            if client.requests:
+                LOG.warning(
+                    "Broker client %s disconnected, %d APDU(s) dropped",
+                    client.name,
+                    len(client.requests),
+                )
+                client.requests.clear()
+            if client in self._ready:
+                self._ready.remove(client)
+            self._clients.remove(client)
+
+        client.conn.close()
+        LOG.info("Broker client %s disconnected", client.name)
+
+    def _dispatch(self) -> None:
+        while True:
+            with self._cond:
+                while self._running and not self._ready:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                client = self._ready.popleft()
+                apdu = client.requests.popleft()
+                if client.requests:
+                    self._ready.append(client)
+
+            try:
+                sw, rdata = self.com.exchange(apdu)
+            except Exception as exc:  # pylint: disable=broad-except
+                LOG.error("Broker exchange failed for client %s: %s", client.name, exc)
+                self._drop(client)
+                continue
+
+            self.exchanges += 1
+
+            try:
+                client.conn.sendall(
+                    len(rdata).to_bytes(4, byteorder="big")
+                    + rdata
+                    + sw.to_bytes(2, byteorder="big")
+                )
+            except OSError:
+                self._drop(client)
+
+    def stop(self) -> None:
+        """Disconnect clients, stop listening and close `self.com`.
+
+        Returns
+        -------
+        None
+
+        """
+        if not self._running:
+            return
+
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+            clients = list(self._clients)
+
+        if self._server is not None:
+            self._server.close()
+
+        for client in clients:
+            try:
+                client.conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+        for thread in self._threads:
+            thread.join()
+        self._threads.clear()
+
+        for client in clients:
+            if client.thread is not None:
+                client.thread.join()
+
+        # replaced by someone else meanwhile, left as is
+        with contextlib.suppress(FileExistsError):
+            remove_socket(self.path)
+
+        self.com.close()
@@ -0,0 +1,252 @@
+"""ledgercomm.cache module."""
+
+import collections
+import threading
+import time
+from typing import Dict, Optional, OrderedDict, Tuple
+
+from ledgercomm.interfaces.comm import BytesLike
+
+
+class ResponseCache:
+    """ResponseCache class, LRU cache of responses to idempotent APDUs.
+
+    Only APDUs whose (CLA, INS) pair has been registered are cached, keyed
+    by their raw bytes. The least recently used entry is evicted when the
+    cache is full and entries expire after their time-to-live.
+
+    Parameters
+    ----------
+    maxsize : int
+        Maximum number of responses kept.
+    ttl : Optional[float]
+        Default time-to-live of entries in seconds, None for no expiration.
+    only_success : bool
+        Whether only responses with status word 0x9000 are cached.
+
+    Attributes
+    ----------
+    maxsize : int
+        Maximum number of responses kept.
+    ttl : Optional[float]
+        Default time-to-live of entries in seconds.
+    only_success : bool
+        Whether only responses with status word 0x9000 are cached.
+    hits : int
+        Number of lookups answered from the cache.
+    misses : int
+        Number of lookups of cacheable APDUs not found (or expired).
+    evictions : int
+        Number of entries evicted because the cache was full.
+
+    Examples
+    --------
+    >>> cache = ResponseCache(maxsize=128, ttl=60)
+    >>> cache.register(cla=0xE0, ins=0x01)  # get version
+    >>> transport = Transport(interface="hid", cache=cache)
+
+    """
+
+    def __init__(
+        self, maxsize: int = 256, ttl: Optional[float] = None, only_success: bool = True
+    ) -> None:
+        """Init constructor of ResponseCache."""
+        if maxsize < 1:
+            raise ValueError(f"Cache size must be at least 1, not {maxsize}!")
+
+        self.maxsize: int = maxsize
+        self.ttl: Optional[float] = ttl
+        self.only_success: bool = only_success
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        # (CLA, INS) -> time-to-live of the command
+        self._commands: Dict[Tuple[int, int], Optional[float]] = {}
+        # APDU -> (expiration time, (sw, rdata))
+        self._entries: OrderedDict[bytes, Tuple[Optional[float], Tuple[int, bytes]]] = (
+            collections.OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of entries in the cache, including expired ones not yet purged."""
+        return len(self._entries)
+
+    def register(self, cla: int, ins: int, ttl: Optional[float] = None) -> None:
+        """Make APDUs with `cla` and `ins` cacheable.
+
+        Parameters
+        ----------
+        cla : int
+            Instruction class: CLA (1 byte)
+        ins : int
+            Instruction code: INS (1 byte)
+        ttl : Optional[float]
+            Time-to-live of these entries in seconds, default to `self.ttl`.
+
+        Returns
+        -------
+        None
+
+        """
+        with self._lock:
+            self._commands[(cla, int(ins))] = ttl if ttl is not None else self.ttl
+
+    def unregister(self, cla: int, ins: int) -> None:
+        """Stop caching APDUs with `cla` and `ins` and drop their entries.
+
+        Returns
+        -------
+        None
+
+        """
+        with self._lock:
+            self._commands.pop((cla, int(ins)), None)
+        self.invalidate(cla=cla, ins=ins)
+
+    def cacheable(self, apdu: BytesLike) -> bool:
+        """Whether `apdu` belongs to a registered command.
+
+        Parameters
+        ----------
+        apdu : Union[bytes, bytearray, memoryview]
+            Raw APDU.
+
+        Returns
+        -------
+        bool
+            True if responses to `apdu` can be cached.
+
+        """
+        return len(apdu) >= 2 and (apdu[0], apdu[1]) in self._commands
+
+    def get(self, apdu: BytesLike) -> Optional[Tuple[int, bytes]]:
+        """Get the response cached for `apdu`.
+
+        Parameters
+        ----------
+        apdu : Union[bytes, bytearray, memoryview]
+            Raw APDU.
+
+        Returns
+        -------
+        Optional[Tuple[int, bytes]]
+            The pair (sw, rdata) cached, None if not cached or expired.
+
+        """
+        key: bytes = bytes(apdu)
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None:
+                expires_at, response = entry
+                if expires_at is None or time.monotonic() < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return response
+                del self._entries[key]
+
+            self.misses += 1
+
+            return None
+
+    def put(self, apdu: BytesLike, response: Tuple[int, bytes]) -> None:
+        """Cache `response` for `apdu` if cacheable.
+
+        Parameters
+        ----------
+        apdu : Union[bytes, bytearray, memoryview]
+            Raw APDU.
+        response : Tuple[int, bytes]
+            The pair (sw, rdata) received for `apdu`.
+
+        Returns
+        -------
+        None
+
+        """
+        if self.only_success and response[0] != 0x9000:
+            return
+
+        with self._lock:
+            command: Tuple[int, int] = (apdu[0], apdu[1])
+            if command not in self._commands:
+                return
+
+            ttl: Optional[float] = self._commands[command]
+            key: bytes = bytes(apdu)
+
+            self._entries[key] = (time.monotonic() + ttl if ttl is not None else None, response)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(
+        self,
+        apdu: Optional[BytesLike] = None,
+        cla: Optional[int] = None,
+        ins: Optional[int] = None,
+    ) -> int:
+        """Drop cached entries.
+
+        Without argument, the whole cache is cleared.
+
+        Parameters
+        ----------
+        apdu : Optional[Union[bytes, bytearray, memoryview]]
+            Drop the entry of this raw APDU only.
+        cla : Optional[int]
+            Drop entries with this instruction class.
+        ins : Optional[int]
+            Drop entries with this instruction code.
+
+        Returns
+        -------
+        int
+            Number of entries dropped.
+
+        """
+        with self._lock:
+            if apdu is not None:
+                return 1 if self._entries.pop(bytes(apdu), None) is not None else 0
+
+            keys = [
+                key
+                for key in self._entries
+                if (cla is None or key[0] == cla) and (ins is None or key[1] == ins)
+            ]
+            for key in keys:
+                del self._entries[key]
+
+            return len(keys)
+
+    def clear(self) -> None:
+        """Drop all entries and reset counters.
+
+        Returns
+        -------
+        None
+
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Counters of the cache.
+
+        Returns
+        -------
+        Dict[str, int]
+            Hits, misses, evictions and current size of the cache.
+
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+        }
@@ -0,0 +1,327 @@
+"""ledgercomm.capture module.
+
+Capture files record exchanges with a device in a compact binary format:
+
+- header: magic `LCAP`, version (1 byte), 3 padding bytes and the
+  capture start as a UNIX timestamp (double),
+- one record per exchange: start relative to the capture start and
+  duration in seconds (doubles), status word (2 bytes), lengths of the
+  APDU and of the response data (4 bytes each), then the APDU and the
+  response data,
+- index: offset of each record (8 bytes each),
+- trailer: offset of the index (8 bytes), number of records (4 bytes)
+  and magic `LIDX`.
+
+All integers are big endian. A capture without trailer (e.g. recorder
+not closed) is still readable by scanning its records.
+"""
+
+import mmap
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterator, List, NamedTuple, Optional, Sequence, Union
+
+from ledgercomm.interfaces.comm import BytesLike, Comm
+from ledgercomm.interfaces.observed import ObservedComm
+
+CAPTURE_MAGIC = b"LCAP"
+CAPTURE_VERSION = 1
+
+_HEADER = struct.Struct(">4sBxxxd")
+_RECORD = struct.Struct(">ddHII")
+_TRAILER = struct.Struct(">QI4s")
+_INDEX_ENTRY = struct.Struct(">Q")
+_INDEX_MAGIC = b"LIDX"
+
+
+class CaptureFormatError(Exception):
+    """Custom error to be raised when a capture file is malformed."""
+
+
+class CaptureRecord(NamedTuple):
+    """Exchange recorded in a capture.
+
+    Attributes
+    ----------
+    start : float
+        Time the APDU was sent, in seconds since the capture start.
+    duration : float
+        Time to receive the response, in seconds.
+    apdu : bytes
+        APDU sent.
+    sw : int
+        Status word of the response.
+    rdata : bytes
+        Response data.
+
+    """
+
+    start: float
+    duration: float
+    apdu: bytes
+    sw: int
+    rdata: bytes
+
+
+class Recorder:
+    """Recorder class writing exchanges to a capture file.
+
+    Parameters
+    ----------
+    path : Union[str, Path]
+        Path of the capture file, overwritten if it exists.
+
+    Attributes
+    ----------
+    path : Path
+        Path of the capture file.
+    created : float
+        Capture start as a UNIX timestamp.
+
+    Examples
+    --------
+    >>> with Recorder("session.lcap") as recorder:
+    ...     transport = Transport(interface="hid", recorder=recorder)
+    ...     transport.exchange(cla=0xE0, ins=0x01)
+
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        """Init constructor of Recorder."""
+        self.path: Path = Path(path)
+        self.created: float = time.time()
+        self._origin: float = time.perf_counter()
+        self._index: bytearray = bytearray()
+        self._count: int = 0
+        self._lock = threading.Lock()
+        self._file = open(self.path, "wb")  # pylint: disable=consider-using-with
+        self._file.write(_HEADER.pack(CAPTURE_MAGIC, CAPTURE_VERSION, self.created))
+        self._offset: int = _HEADER.size
+
+    def __enter__(self) -> "Recorder":
+        """Enter `with` block."""
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        """Close the capture when leaving `with` block."""
+        self.close()
+
+    def __len__(self) -> int:
+        """Number of exchanges recorded."""
+        return self._count
+
+    def record(self, apdu: BytesLike, sw: int, rdata: BytesLike, start: float, end: float) -> None:
+        """Append an exchange to the capture.
+
+        Parameters
+        ----------
+        apdu : Union[bytes, bytearray, memoryview]
+            APDU sent.
+        sw : int
+            Status word of the response.
+        rdata : Union[bytes, bytearray, memoryview]
+            Response data.
+        start : float
+            Time the APDU was sent, as given by `time.perf_counter()`.
+        end : float
+            Time the response was received, as given by `time.perf_counter()`.
+
+        Returns
+        -------
+        None
+
+        """
+        header: bytes = _RECORD.pack(start - self._origin, end - start, sw, len(apdu), len(rdata))
+
+        with self._lock:
+            if self._file.closed:
+                raise ValueError("Recorder is closed!")
+            self._file.write(header)
+            self._file.write(apdu)
+            self._file.write(rdata)
+            self._index += _INDEX_ENTRY.pack(self._offset)
+            self._count += 1
+            self._offset += len(header) + len(apdu) + len(rdata)
+
+    def close(self) -> None:
+        """Write the index and close the capture file.
+
+        Returns
+        -------
+        None
+
+        """
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(self._index)
+            self._file.write(_TRAILER.pack(self._offset, self._count, _INDEX_MAGIC))
+            self._file.close()
+
+
+class Capture(Sequence[CaptureRecord]):
+    """Capture class reading a capture file through mmap.
+
+    Records are decoded on access, so opening a large capture is cheap.
+
+    Parameters
+    ----------
+    path : Union[str, Path]
+        Path of the capture file.
+
+    Attributes
+    ----------
+    path : Path
+        Path of the capture file.
+    created : float
+        Capture start as a UNIX timestamp.
+
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        """Init constructor of Capture."""
+        self.path: Path = Path(path)
+
+        with open(self.path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < _HEADER.size:
+                raise CaptureFormatError(f"{self.path}: file too short to be a capture")
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.created = _HEADER.unpack_from(self._mm, 0)
+
+        if magic != CAPTURE_MAGIC:
+            raise CaptureFormatError(f"{self.path}: not a capture file")
+        if version != CAPTURE_VERSION:
+            raise CaptureFormatError(f"{self.path}: unsupported capture version {version}")
+
+        self._index_offset: int
+        self._count: int
+        # offsets of records, only for captures without index
+        self._offsets: Optional[List[int]] = None
+
+        if not self._read_trailer():
+            self._scan()
+
+    def _read_trailer(self) -> bool:
+        size: int = len(self._mm)
+
+        if size < _HEADER.size + _TRAILER.size:
+            return False
+
+        index_offset, count, magic = _TRAILER.unpack_from(self._mm, size - _TRAILER.size)
+
+        if magic != _INDEX_MAGIC or index_offset + count * _INDEX_ENTRY.size != (
+            size - _TRAILER.size
+        ):
+            return False
+
+        self._index_offset, self._count = index_offset, count
+        return True
+
+    def _scan(self) -> None:
+        """Rebuild the index of a capture without trailer."""
+        offsets: List[int] = []
+        offset: int = _HEADER.size
+        size: int = len(self._mm)
+
+        while offset + _RECORD.size <= size:
+            _, _, _, apdu_len, rdata_len = _RECORD.unpack_from(self._mm, offset)
+            end: int = offset + _RECORD.size + apdu_len + rdata_len
+            if end > size:
+                break  # truncated record
+            offsets.append(offset)
+            offset = end
+
+        self._offsets = offsets
+        self._count = len(offsets)
+
+    def _offset(self, i: int) -> int:
+        if self._offsets is not None:
+            return self._offsets[i]
+
+        return _INDEX_ENTRY.unpack_from(self._mm, self._index_offset + i * _INDEX_ENTRY.size)[0]
+
+    def __enter__(self) -> "Capture":
+        """Enter `with` block."""
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        """Close the capture when leaving `with` block."""
+        self.close()
+
+    def __len__(self) -> int:
+        """Number of exchanges in the capture."""
+        return self._count
+
+    def __getitem__(self, i: Any) -> Any:
+        """Decode the `i`-th exchange of the capture."""
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._count))]
+
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("capture index out of range")
+
+        offset: int = self._offset(i)
+        start, duration, sw, apdu_len, rdata_len = _RECORD.unpack_from(self._mm, offset)
+        offset += _RECORD.size
+
+        return CaptureRecord(
+            start,
+            duration,
+            self._mm[offset : offset + apdu_len],
+            sw,
+            self._mm[offset + apdu_len : offset + apdu_len + rdata_len],
+        )
+
+    def __iter__(self) -> Iterator[CaptureRecord]:
+        """Iterate over exchanges of the capture."""
+        for i in range(self._count):
+            yield self[i]
+
+    def close(self) -> None:
+        """Unmap the capture file.
+
+        Returns
+        -------
+        None
+
+        """
+        self._mm.close()
+
+
+class RecordingComm(ObservedComm):
+    """RecordingComm class, recording exchanges of another interface.
+
+    Used by `Transport(recorder=...)`, the recorder is left open when the
+    interface is closed.
+
+    Parameters
+    ----------
+    com : Comm
+        Communication interface to record.
+    recorder : Recorder
+        Recorder of the exchanges.
+
+    Attributes
+    ----------
+    com : Comm
+        Communication interface recorded.
+    recorder : Recorder
+        Recorder of the exchanges.
+
+    """
+
+    def __init__(self, com: Comm, recorder: Recorder) -> None:
+        """Init constructor of RecordingComm."""
+        super().__init__(com)
+        self.recorder: Recorder = recorder
+
+    def _observe(
+        self, apdu: bytes, size: int, sw: int, rdata: bytes, start: float, end: float
+    ) -> None:
+        self.recorder.record(apdu, sw, rdata, start, end)
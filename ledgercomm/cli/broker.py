@@ -0,0 +1,77 @@
+"""ledgercomm.cli.broker module."""
+
+import argparse
+import sys
+
+from ledgercomm import __version__
+from ledgercomm.broker import Broker
+from ledgercomm.interfaces.comm import Comm
+from ledgercomm.log import enable_debug_logs
+
+
+def main():
+    """Entrypoint of ledgercomm-broker binary."""
+    parser = argparse.ArgumentParser(
+        description="Share a device between processes through a Unix socket"
+    )
+    parser.add_argument("--hid", help="Use HID instead of TCP client", action="store_true")
+    parser.add_argument(
+        "--server",
+        help="IP server of the TCP client (default: 127.0.0.1)",
+        default="127.0.0.1",
+    )
+    parser.add_argument(
+        "--port", help="Port of the TCP client (default: 9999)", default=9999, type=int
+    )
+    parser.add_argument(
+        "--path",
+        help="Path of the Unix socket to listen on "
+        "(default: $XDG_RUNTIME_DIR/ledgercomm-broker.sock)",
+    )
+    parser.add_argument("--debug", help="Print debug logs", action="store_true")
+    parser.add_argument(
+        "--version",
+        "-v",
+        help="Print LedgerComm package current version",
+        default=False,
+        action="store_true",
+    )
+
+    args = parser.parse_args()
+
+    if args.version:
+        print(__version__)
+        return 0
+
+    if args.debug:
+        enable_debug_logs()
+
+    com: Comm
+
+    if args.hid:
+        from ledgercomm.interfaces.hid_device import HID
+
+        com = HID()
+    else:
+        from ledgercomm.interfaces.tcp_client import TCPClient
+
+        com = TCPClient(server=args.server, port=args.port)
+
+    try:
+        broker = Broker(com, path=args.path)
+    except ValueError as exc:  # no default path
+        parser.error(str(exc))
+
+    try:
+        broker.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    except FileExistsError as exc:  # path taken by something else than a socket
+        print(f"ledgercomm-broker: error: {exc}", file=sys.stderr)
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,458 @@
+"""ledgercomm.cli.corpus module.
+
+Run a corpus of independent APDU scripts across several endpoints in
+parallel, for `ledgercomm-send corpus`.
+
+One worker process is started per endpoint and keeps one transport open.
+Workers pull scripts from a shared queue, largest first, so the corpus is
+sharded dynamically and an endpoint which can't be reached doesn't take
+any script. Results of every script are merged into one report.
+"""
+
+import multiprocessing
+import queue
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from ledgercomm import Transport
+from ledgercomm.cli.send import InvalidInputError, exchange_script, parse_file
+
+# messages of workers: (kind, endpoint, value)
+_STARTED = "started"  # value: script
+_RESULT = "result"  # value: ScriptResult
+_FAILED = "failed"  # value: error, the worker has exited
+_DONE = "done"  # value: None, the worker has exited
+
+# period in seconds of the liveness check of workers
+_POLL_INTERVAL = 0.2
+
+
+class ScriptResult(NamedTuple):
+    """Result of one script of a corpus.
+
+    Attributes
+    ----------
+    script : str
+        Path of the script.
+    endpoint : Optional[str]
+        Endpoint the script has been sent to, None if it hasn't been run.
+    status : str
+        "passed" if every status word is 0x9000, "failed" if not, "error"
+        if the script couldn't be sent entirely and "not run" if no
+        endpoint was available.
+    apdus : int
+        Number of APDUs exchanged.
+    failures : List[Dict[str, Any]]
+        Line, APDU and status word of each response other than 0x9000.
+    seconds : float
+        Time to send the script.
+    error : Optional[str]
+        Error which stopped the script, if any.
+
+    """
+
+    script: str
+    endpoint: Optional[str]
+    status: str
+    apdus: int
+    failures: List[Dict[str, Any]]
+    seconds: float
+    error: Optional[str]
+
+
+class CorpusReport:
+    """Results of a corpus merged from all endpoints.
+
+    Parameters
+    ----------
+    results : List[ScriptResult]
+        Result of each script.
+    endpoint_errors : Dict[str, str]
+        Error of each endpoint which failed.
+    seconds : float
+        Time to run the whole corpus.
+
+    Attributes
+    ----------
+    results : List[ScriptResult]
+        Result of each script, sorted by path.
+    endpoint_errors : Dict[str, str]
+        Error of each endpoint which failed.
+    seconds : float
+        Time to run the whole corpus.
+
+    """
+
+    def __init__(
+        self, results: List[ScriptResult], endpoint_errors: Dict[str, str], seconds: float
+    ) -> None:
+        """Init constructor of CorpusReport."""
+        self.results: List[ScriptResult] = sorted(results, key=lambda result: result.script)
+        self.endpoint_errors: Dict[str, str] = endpoint_errors
+        self.seconds: float = seconds
+
+    def count(self, status: str) -> int:
+        """Number of scripts with `status`."""
+        return sum(1 for result in self.results if result.status == status)
+
+    @property
+    def passed(self) -> bool:
+        """Whether every script has passed."""
+        return all(result.status == "passed" for result in self.results)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Report as a JSON serializable dictionary.
+
+        Returns
+        -------
+        Dict[str, Any]
+            Summary, statistics by endpoint and result of each script.
+
+        """
+        endpoints: Dict[str, Dict[str, Any]] = {
+            endpoint: {"scripts": 0, "apdus": 0, "seconds": 0.0, "error": error}
+            for endpoint, error in self.endpoint_errors.items()
+        }
+
+        for result in self.results:
+            if result.endpoint is not None:
+                stats = endpoints.setdefault(
+                    result.endpoint, {"scripts": 0, "apdus": 0, "seconds": 0.0, "error": None}
+                )
+                stats["scripts"] += 1
+                stats["apdus"] += result.apdus
+                stats["seconds"] = round(stats["seconds"] + result.seconds, 6)
+
+        return {
+            "scripts": len(self.results),
+            **{
+                status.replace(" ", "_"): self.count(status)
+                for status in ("passed", "failed", "error", "not run")
+            },
+            "apdus": sum(result.apdus for result in self.results),
+            "seconds": round(self.seconds, 6),
+            "endpoints": endpoints,
+            "results": [result._asdict() for result in self.results],
+        }
+
+
+def parse_endpoint(spec: str, timeout: Optional[float] = None) -> List[Tuple[str, Dict[str, Any]]]:
+    """Name and `Transport` arguments of the endpoints given by `spec`.
+
+    Parameters
+    ----------
+    spec : str
+        "HOST:PORT" for TCP, "unix:PATH" for a Unix socket, "hid:PATH" for
+        one HID device or "hid" for every Ledger device connected.
+    timeout : Optional[float]
+        Timeout in seconds of socket operations of TCP and Unix endpoints.
+
+    Returns
+    -------
+    List[Tuple[str, Dict[str, Any]]]
+        Name of each endpoint and keyword arguments of its `Transport`.
+
+    Raises
+    ------
+    ValueError
+        If `spec` isn't a valid endpoint.
+
+    """
+    kind, _, address = spec.partition(":")
+
+    if kind == "hid":
+        if address:
+            return [(spec, {"interface": "hid", "path": address.encode()})]
+
+        # imported here to keep hidapi optional for TCP users
+        from ledgercomm.interfaces.hid_device import HID  # pylint: disable=import-outside-toplevel
+
+        return [
+            (f"hid:{path.decode()}", {"interface": "hid", "path": path})
+            for path in HID.enumerate_devices()
+        ]
+
+    if kind == "unix":
+        return [(spec, {"interface": "unix", "path": address, "timeout": timeout})]
+
+    server, _, port = spec.rpartition(":")
+    if not server or not port.isdigit():
+        raise ValueError(f"Invalid endpoint '{spec}', expected HOST:PORT, unix:PATH or hid[:PATH]")
+
+    return [
+        (
+            spec,
+            {
+                "interface": "tcp",
+                "server": server.strip("[]"),
+                "port": int(port),
+                "timeout": timeout,
+            },
+        )
+    ]
+
+
+def find_scripts(paths: Iterable[str], pattern: str = "*") -> List[Path]:
+    """Script files of `paths`, directories searched recursively for `pattern`.
+
+    Parameters
+    ----------
+    paths : Iterable[str]
+        Script files or directories of scripts.
+    pattern : str
+        Glob pattern of scripts in directories.
+
+    Returns
+    -------
+    List[Path]
+        Scripts, largest first so that long scripts don't end the run alone.
+
+    """
+    scripts: List[Path] = []
+
+    for path in map(Path, paths):
+        if path.is_dir():
+            scripts.extend(p for p in path.rglob(pattern) if p.is_file())
+        else:
+            scripts.append(path)
+
+    return sorted(set(scripts), key=lambda p: (-p.stat().st_size, str(p)))
+
+
+def run_script(
+    transport: Transport,
+    script: str,
+    endpoint: str,
+    condition: Optional[str] = None,
+    strict: bool = False,
+    window: int = 8,
+    stop_on_error: bool = False,
+    validate_first: bool = False,
+) -> ScriptResult:
+    """Send `script` through `transport` and sum up its responses.
+
+    Errors of the exchanges themselves are raised, as the transport may be
+    out of sync, errors of the script are reported in the result. An
+    invalid line stops the script once the responses of the APDUs sent
+    before it are received, and they are counted in the result.
+
+    Parameters
+    ----------
+    transport : Transport
+        Transport of the worker.
+    script : str
+        Path of the script, possibly compressed.
+    endpoint : str
+        Name of the endpoint of `transport`.
+    condition : Optional[str]
+        Prefix of lines to send, see `parse_lines`.
+    strict : bool
+        Whether lines are parsed strictly, see `parse_lines`.
+    window : int
+        Maximum number of APDUs sent without having received their response.
+    stop_on_error : bool
+        Stop the script after the first status word other than 0x9000.
+    validate_first : bool
+        Parse the whole script before sending it, so that nothing is sent
+        if it is invalid.
+
+    Returns
+    -------
+    ScriptResult
+        Result of the script.
+
+    """
+    start: float = time.perf_counter()
+    apdus: int = 0
+    failures: List[Dict[str, Any]] = []
+    error: Optional[str] = None
+
+    try:
+        lines: Iterable[Tuple[int, bytes]] = parse_file(Path(script), condition, strict)
+        if validate_first:
+            lines = list(lines)
+
+        for result in exchange_script(transport, lines, window, stop_on_error):
+            apdus += 1
+            if result.sw != 0x9000:
+                failures.append(
+                    {"line": result.line, "apdu": result.apdu.hex(), "sw": f"{result.sw:04x}"}
+                )
+    except InvalidInputError as exc:
+        error = str(exc)
+
+    return ScriptResult(
+        script,
+        endpoint,
+        "error" if error else "failed" if failures else "passed",
+        apdus,
+        failures,
+        time.perf_counter() - start,
+        error,
+    )
+
+
+def _worker(
+    endpoint: str,
+    kwargs: Dict[str, Any],
+    options: Dict[str, Any],
+    tasks: "multiprocessing.Queue[Optional[str]]",
+    results: "multiprocessing.Queue[Tuple[str, str, Any]]",
+) -> None:
+    """Send scripts of `tasks` to `endpoint` until a None is received."""
+    try:
+        transport = Transport(**kwargs)
+    except Exception as exc:  # pylint: disable=broad-except
+        results.put((_FAILED, endpoint, f"{type(exc).__name__}: {exc}"))
+        return
+
+    try:
+        for script in iter(tasks.get, None):
+            results.put((_STARTED, endpoint, script))
+            start: float = time.perf_counter()
+
+            try:
+                result: ScriptResult = run_script(transport, script, endpoint, **options)
+            except Exception as exc:  # pylint: disable=broad-except
+                error: str = f"{type(exc).__name__}: {exc}"
+                result = ScriptResult(
+                    script, endpoint, "error", 0, [], time.perf_counter() - start, error
+                )
+            results.put((_RESULT, endpoint, result))
+
+            if result.status == "error":
+                # the connection may be out of sync, next scripts start on a new one
+                transport.close()
+                try:
+                    transport = Transport(**kwargs)
+                except Exception as exc:  # pylint: disable=broad-except
+                    results.put((_FAILED, endpoint, f"{type(exc).__name__}: {exc}"))
+                    return
+    finally:
+        transport.close()
+
+    results.put((_DONE, endpoint, None))
+
+
+def run_corpus(
+    scripts: Sequence[Path],
+    endpoints: Sequence[Tuple[str, Dict[str, Any]]],
+    condition: Optional[str] = None,
+    strict: bool = False,
+    window: int = 8,
+    stop_on_error: bool = False,
+    debug: bool = False,
+    validate_first: bool = False,
+) -> CorpusReport:
+    """Send `scripts` across `endpoints` in parallel, one worker process per endpoint.
+
+    Parameters
+    ----------
+    scripts : Sequence[Path]
+        Scripts to send, in the order they are taken by workers.
+    endpoints : Sequence[Tuple[str, Dict[str, Any]]]
+        Name and `Transport` arguments of each endpoint, see `parse_endpoint`.
+    condition : Optional[str]
+        Prefix of lines to send, see `parse_lines`.
+    strict : bool
+        Whether lines are parsed strictly, see `parse_lines`.
+    window : int
+        Maximum number of APDUs sent without having received their response.
+    stop_on_error : bool
+        Stop each script after its first status word other than 0x9000.
+    debug : bool
+        Whether workers print debug logs.
+    validate_first : bool
+        Parse each script entirely before sending it.
+
+    Returns
+    -------
+    CorpusReport
+        Results of every script, "not run" if every endpoint failed before.
+
+    Examples
+    --------
+    >>> endpoints = [e for port in (9999, 10000) for e in parse_endpoint(f"127.0.0.1:{port}")]
+    >>> report = run_corpus(find_scripts(["corpus/"]), endpoints)
+    >>> report.passed
+    True
+
+    """
+    start: float = time.perf_counter()
+    options: Dict[str, Any] = {
+        "condition": condition,
+        "strict": strict,
+        "window": window,
+        "stop_on_error": stop_on_error,
+        "validate_first": validate_first,
+    }
+    tasks: "multiprocessing.Queue[Optional[str]]" = multiprocessing.Queue()
+    results: "multiprocessing.Queue[Tuple[str, str, Any]]" = multiprocessing.Queue()
+
+    for script in scripts:
+        tasks.put(str(script))
+    for _ in endpoints:
+        tasks.put(None)
+
+    processes: Dict[str, multiprocessing.Process] = {
+        name: multiprocessing.Process(
+            target=_worker,
+            args=(name, dict(kwargs, debug=debug), options, tasks, results),
+            daemon=True,
+        )
+        for name, kwargs in endpoints
+    }
+    running: Dict[str, Optional[str]] = dict.fromkeys(processes)
+    script_results: List[ScriptResult] = []
+    endpoint_errors: Dict[str, str] = {}
+    alive = set(processes)
+
+    try:
+        for process in processes.values():
+            process.start()
+
+        while alive:
+            # workers seen dead before waiting have sent all their messages
+            dead = {name for name in alive if processes[name].exitcode is not None}
+
+            try:
+                kind, name, value = results.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                for name in dead:
+                    # killed or crashed without reporting it
+                    error: str = f"worker exited with code {processes[name].exitcode}"
+                    endpoint_errors[name] = error
+                    in_flight: Optional[str] = running[name]
+                    if in_flight is not None:
+                        script_results.append(
+                            ScriptResult(in_flight, name, "error", 0, [], 0.0, error)
+                        )
+                    alive.discard(name)
+                continue
+
+            if kind == _STARTED:
+                running[name] = value
+            elif kind == _RESULT:
+                running[name] = None
+                script_results.append(value)
+            else:
+                if kind == _FAILED:
+                    endpoint_errors[name] = value
+                alive.discard(name)
+    finally:
+        for process in processes.values():
+            if process.is_alive():
+                process.terminate()
+            process.join()
+        # scripts left if every worker failed
+        tasks.cancel_join_thread()
+
+    done = {result.script for result in script_results}
+    script_results.extend(
+        ScriptResult(str(script), None, "not run", 0, [], 0.0, None)
+        for script in scripts
+        if str(script) not in done
+    )
+
+    return CorpusReport(script_results, endpoint_errors, time.perf_counter() - start)
@@ -0,0 +1,84 @@
+"""ledgercomm.cli.fake_device module."""
+
+import argparse
+import asyncio
+
+from ledgercomm import __version__
+from ledgercomm.fake_device import EchoHandler, FakeDevice, Handler, LatencyHandler, ScriptedHandler
+from ledgercomm.log import enable_debug_logs
+
+
+def main():
+    """Entrypoint of ledgercomm-fake-device binary."""
+    parser = argparse.ArgumentParser(
+        description="Stand-in for Speculos answering APDUs with echo or scripted replies"
+    )
+    parser.add_argument(
+        "--server",
+        help="IP address to listen on (default: 127.0.0.1)",
+        default="127.0.0.1",
+    )
+    parser.add_argument("--port", help="Port to listen on (default: 9999)", default=9999, type=int)
+    parser.add_argument("--path", help="Listen on a Unix socket at PATH instead of TCP")
+    parser.add_argument(
+        "--script",
+        help="File of scripted replies, one 'APDU_PREFIX RESPONSE' in hex per line "
+        "(default: echo APDUs)",
+    )
+    parser.add_argument(
+        "--sw",
+        help="Status word of echoed APDUs, or of unknown APDUs with --script "
+        "(default: 9000, 6D00 with --script)",
+        type=lambda sw: int(sw, 16),
+    )
+    parser.add_argument(
+        "--latency", help="Delay of each response in seconds (default: 0)", default=0.0, type=float
+    )
+    parser.add_argument(
+        "--jitter",
+        help="Random extra delay of each response in seconds (default: 0)",
+        default=0.0,
+        type=float,
+    )
+    parser.add_argument("--debug", help="Print debug logs", action="store_true")
+    parser.add_argument(
+        "--version",
+        "-v",
+        help="Print LedgerComm package current version",
+        default=False,
+        action="store_true",
+    )
+
+    args = parser.parse_args()
+
+    if args.version:
+        print(__version__)
+        return 0
+
+    if args.debug:
+        enable_debug_logs()
+
+    handler: Handler
+
+    if args.script:
+        handler = ScriptedHandler.from_file(
+            args.script, default_sw=args.sw if args.sw is not None else 0x6D00
+        )
+    else:
+        handler = EchoHandler(sw=args.sw if args.sw is not None else 0x9000)
+
+    if args.latency or args.jitter:
+        handler = LatencyHandler(handler, delay=args.latency, jitter=args.jitter)
+
+    device = FakeDevice(handler, server=args.server, port=args.port, path=args.path)
+
+    try:
+        asyncio.run(device.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+    return 0
+
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,372 @@
 """ledgercomm.cli.send module."""
 
 import argparse
-from pathlib import Path
+import collections
+import importlib
+import json
 import re
-from typing import Iterator, Optional
+import sys
+import time
+from pathlib import Path
+from typing import (
+    Any,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    TextIO,
+    Tuple,
+    Union,
+)
 
 from ledgercomm import Transport, __version__
+from ledgercomm.capture import Recorder
+from ledgercomm.history import install_dump_handlers
+
+# APDU in hexadecimal, spaces removed
+HEX_APDU = re.compile(r"(?:[0-9a-fA-F]{2})+")
+# characters stripped from APDUs of scripts, unless strict
+NON_HEX = re.compile(r"[^0-9a-fA-F]")
+# APDU sent in Ledger Live logs, e.g. "=> e001000000"
+LOG_APDU = re.compile(r"=>\s*([0-9a-fA-F]+)")
+# separators between entries of JSON arrays and JSON lines
+JSON_SEPARATORS = re.compile(r"[\s\[\],]*")
+# what a JSON entry cut by the end of a chunk may end with, after the error position
+TRUNCATED_VALUES = (
+    "true",
+    "false",
+    "null",
+    "NaN",
+    "Infinity",
+    "-Infinity",
+    ".",
+    "e+",
+    "e-",
+    "E+",
+    "E-",
+)
+
+# module opening compressed inputs by file extension
+DECOMPRESSORS = {".gz": "gzip", ".bz2": "bz2", ".xz": "lzma", ".lzma": "lzma"}
+
+
+class InvalidInputError(ValueError):
+    """Input which can't be parsed as APDUs."""
+
+
+class ExchangeResult(NamedTuple):
+    """Result of one APDU sent by `exchange_script`.
+
+    Attributes
+    ----------
+    line : int
+        Line of the APDU in its input, entry number for JSON logs.
+    apdu : bytes
+        APDU sent.
+    sw : int
+        Status word of the response.
+    rdata : bytes
+        Response data.
+    start : float
+        Time the APDU was sent, from `time.perf_counter()`.
+    latency : float
+        Time between sending the APDU and receiving its response, in seconds.
+
+    """
+
+    line: int
+    apdu: bytes
+    sw: int
+    rdata: bytes
+    start: float
+    latency: float
+
+
+def open_input(filepath: Union[str, Path]) -> TextIO:
+    """Open `filepath` as text, decompressed if it ends with .gz, .bz2, .xz or .lzma."""
+    module: Optional[str] = DECOMPRESSORS.get(Path(filepath).suffix.lower())
+
+    if module is None:
+        return open(filepath, "r", encoding="utf-8")
+
+    # imported here to only load the decompressor needed
+    return importlib.import_module(module).open(filepath, "rt", encoding="utf-8")
+
+
+def parse_apdu(text: str, name: str, line: int, strip: bool = False) -> bytes:
+    """Decode the hexadecimal APDU `text` found at `line` of `name`.
+
+    Spaces are ignored, and any non-hexadecimal character if `strip`.
+    """
+    apdu: str = NON_HEX.sub("", text) if strip else text.replace(" ", "")
+
+    if not HEX_APDU.fullmatch(apdu):
+        raise InvalidInputError(f"{name}:{line}: invalid APDU '{text}'")
+
+    return bytes.fromhex(apdu)
+
+
+def parse_lines(
+    lines: Iterable[str], condition: Optional[str], name: str = "<stdin>", strict: bool = False
+) -> Iterator[Tuple[int, bytes]]:
+    """Yield APDUs of a script, one hexadecimal APDU per line.
+
+    Empty lines and lines starting with "#" are skipped. Non-hexadecimal
+    characters are stripped from other lines, which are skipped if
+    nothing is left.
+
+    Parameters
+    ----------
+    lines : Iterable[str]
+        Lines of the script, read lazily.
+    condition : Optional[str]
+        If set, removed from the start of lines starting with it.
+    name : str
+        Name of the script in error messages.
+    strict : bool
+        Whether only lines starting with `condition` are sent and
+        non-hexadecimal characters are invalid instead of stripped.
+
+    Yields
+    ------
+    Tuple[int, bytes]
+        Line number and APDU.
+
+    Raises
+    ------
+    InvalidInputError
+        If a line to send isn't an hexadecimal APDU (e.g. odd length).
+
+    """
+    for i, line in enumerate(lines, start=1):
+        if condition:
+            if line.startswith(condition):
+                line = line[len(condition) :]
+            elif strict:
+                continue
+
+        line = line.strip()
+
+        if not line or line.startswith("#") or not (strict or NON_HEX.sub("", line)):
+            continue
+
+        yield i, parse_apdu(line, name, i, strip=not strict)
+
+
+def parse_file(
+    filepath: Path, condition: Optional[str], strict: bool = False
+) -> Iterator[Tuple[int, bytes]]:
+    """Filter with `condition` and yield APDUs of `filepath`, see `parse_lines`."""
+    try:
+        with open_input(filepath) as f:
+            yield from parse_lines(f, condition, str(filepath), strict)
+    except (OSError, EOFError, UnicodeDecodeError) as exc:
+        raise InvalidInputError(f"{filepath}: {exc}") from exc
+
+
+def _truncated(buffer: str, exc: json.JSONDecodeError) -> bool:
+    """Whether decoding failed because the entry is cut by the end of `buffer`."""
+    if exc.msg.startswith("Unterminated string"):
+        return True
+
+    rest: str = buffer[exc.pos :]
+
+    if exc.msg.startswith("Invalid \\uXXXX escape"):
+        # also raised for a complete escape right at the end of the buffer
+        return len(rest) <= len("uXXXX")
+
+    # nothing left, or the beginning of a literal or of the end of a number
+    return any(value.startswith(rest) for value in TRUNCATED_VALUES)
+
+
+def _json_entries(f: Any, chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """Decode a JSON array or JSON lines entry by entry, reading `f` by chunks.
+
+    Invalid entries raise `json.JSONDecodeError` as soon as they are read,
+    and the chunk size doubles while an entry is truncated so that long
+    entries are read in linear time.
+
+    """
+    decoder = json.JSONDecoder()
+    buffer: str = ""
+    pos: int = 0
+    size: int = chunk_size
+    eof: bool = False
+
+    while True:
+        pos = JSON_SEPARATORS.match(buffer, pos).end()  # type: ignore
+
+        if pos < len(buffer):
+            try:
+                entry, pos = decoder.raw_decode(buffer, pos)
+                size = chunk_size
+                yield entry
+                continue
+            except json.JSONDecodeError as exc:
+                if eof or not _truncated(buffer, exc):
+                    raise
+                size *= 2
+        elif eof:
+            return
+
+        # entry truncated at the end of the buffer
+        chunk: str = f.read(size)
+        eof = not chunk
+        buffer, pos = buffer[pos:] + chunk, 0
+
+
+class _Prepend:
+    """Text stream `f` with `head` read again first."""
+
+    def __init__(self, head: str, f: TextIO) -> None:
+        self.head = head
+        self.f = f
+
+    def read(self, size: int = -1) -> str:
+        head, self.head = self.head, ""
+        return head + self.f.read(size - len(head) if size > 0 else size)
+
+    def __iter__(self) -> Iterator[str]:
+        head, self.head = self.head, ""
+        for line in self.f:
+            yield head + line
+            head = ""
+
+
+def parse_ledger_live_log(filepath: Path) -> Iterator[Tuple[int, bytes]]:
+    """Yield APDUs sent in a Ledger Live log file.
+
+    Logs exported as a JSON array or JSON lines are decoded lazily and
+    APDUs taken from entries {"type": "apdu", "message": "=> ..."}.
+    Other files are read as text, taking APDUs of lines with "=> ...".
+
+    Parameters
+    ----------
+    filepath : Path
+        Path of the log file, possibly compressed.
+
+    Yields
+    ------
+    Tuple[int, bytes]
+        Entry number (JSON) or line number (text) and APDU.
+
+    Raises
+    ------
+    InvalidInputError
+        If the file can't be read, an entry isn't valid JSON or an APDU
+        isn't valid hexadecimal.
 
+    """
+    try:
+        yield from _parse_ledger_live_log(filepath)
+    except (OSError, EOFError, UnicodeDecodeError) as exc:
+        raise InvalidInputError(f"{filepath}: {exc}") from exc
 
-def parse_file(filepath: Path, condition: Optional[str]) -> Iterator[str]:
-    """Filter with `condition` and yield line of `filepath`."""
-    with open(filepath, "r", encoding="utf-8") as f:
-        for line in f:
-            if condition and line.startswith(condition):
-                yield line.replace(condition, "").strip()
-            else:
-                yield line.strip()
+
+def _parse_ledger_live_log(filepath: Path) -> Iterator[Tuple[int, bytes]]:
+    name: str = str(filepath)
+
+    with open_input(filepath) as f:
+        head: str = f.read(1)
+        while head.isspace():
+            head = f.read(1)
+
+        if head in ("[", "{"):
+            i: int = 0
+            try:
+                for i, entry in enumerate(_json_entries(_Prepend(head, f)), start=1):
+                    if isinstance(entry, dict) and entry.get("type") == "apdu":
+                        match = LOG_APDU.match(str(entry.get("message", "")))
+                        if match:
+                            yield i, parse_apdu(match.group(1), name, i)
+            except json.JSONDecodeError as exc:
+                raise InvalidInputError(f"{name}: invalid JSON entry {i + 1}, {exc.msg}") from exc
+            return
+
+        for i, line in enumerate(_Prepend(head, f), start=1):
+            match = LOG_APDU.search(line)
+            if match:
+                yield i, parse_apdu(match.group(1), name, i)
+
+
+def exchange_script(
+    transport: Transport,
+    apdus: Iterable[Tuple[int, bytes]],
+    window: int = 8,
+    stop_on_error: bool = False,
+) -> Iterator[ExchangeResult]:
+    """Pipeline `apdus` through `transport` and yield timed results in order.
+
+    Parameters
+    ----------
+    transport : Transport
+        Transport to send APDUs through.
+    apdus : Iterable[Tuple[int, bytes]]
+        Line numbers and APDUs, read lazily.
+    window : int
+        Maximum number of APDUs sent without having received their response.
+    stop_on_error : bool
+        Stop after the first status word other than 0x9000.
+
+    Yields
+    ------
+    ExchangeResult
+        Result of each APDU, in the same order as `apdus`.
+
+    """
+    # APDUs sent waiting for their response, with the time they were sent
+    sent: Deque[Tuple[int, bytes, float]] = collections.deque()
+    clock = time.perf_counter
+
+    def timed() -> Iterator[bytes]:
+        for line, apdu in apdus:
+            sent.append((line, apdu, clock()))
+            yield apdu
+
+    for sw, rdata in transport.exchange_iter(timed(), window, stop_on_error):
+        end: float = clock()
+        line, apdu, start = sent.popleft()
+        yield ExchangeResult(line, apdu, sw, rdata, start, end - start)
 
 
 def main():
-    """Entrypoint of ledgercomm-parse binary."""
+    """Entrypoint of ledgercomm-send binary."""
     parser = argparse.ArgumentParser()
     subparsers = parser.add_subparsers(help="sub-command help", dest="command")
     # file subparser
-    parser_file = subparsers.add_parser("file", help="send APDUs from file")
+    parser_file = subparsers.add_parser(
+        "file", help="send APDUs from file, possibly compressed (.gz, .bz2, .xz)"
+    )
     parser_file.add_argument("filepath", help="path of the file within APDUs")
     # stdin subparser
-    _ = subparsers.add_parser("stdin", help="send APDUs from stdin")
-    # stdin subparser
+    _ = subparsers.add_parser("stdin", help="send APDUs from stdin, one per line")
+    # log subparser
     parser_log = subparsers.add_parser("log", help="send APDUs from Ledger Live log file")
     parser_log.add_argument("filepath", help="path of the Ledger Live log file within APDUs")
+    # corpus subparser
+    parser_corpus = subparsers.add_parser(
+        "corpus", help="send many scripts in parallel, one worker process per endpoint"
+    )
+    parser_corpus.add_argument("paths", nargs="+", help="script files or directories of scripts")
+    parser_corpus.add_argument(
+        "--endpoint",
+        "-e",
+        help='"HOST:PORT", "unix:PATH", "hid:PATH" or "hid" for every Ledger device, '
+        "repeated for each endpoint",
+        action="append",
+        required=True,
+    )
+    parser_corpus.add_argument(
+        "--glob", help="Scripts to send in directories (default: *)", default="*"
+    )
+    parser_corpus.add_argument(
+        "--timeout",
+        help="Timeout in seconds of TCP and Unix socket operations (default: None)",
+        type=float,
+    )
     # args for main parser
     parser.add_argument("--hid", help="Use HID instead of TCP client", action="store_true")
     parser.add_argument(
@@ -45,6 +382,47 @@ def main():
         help="Only send APDUs which starts with STARTSWITH (default: None)",
         default=None,
     )
+    parser.add_argument(
+        "--strict",
+        help="Skip lines not starting with STARTSWITH and reject non-hexadecimal characters "
+        "instead of stripping them",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--record", help="Record exchanges to the capture file RECORD (default: None)"
+    )
+    parser.add_argument(
+        "--window",
+        help="APDUs in flight with TCP (default: 8, 1 for interactive stdin)",
+        default=None,
+        type=int,
+    )
+    parser.add_argument(
+        "--validate-first",
+        help="Parse all APDUs, of each script with corpus, before sending the first one, "
+        "keeping them in memory, so that nothing is sent if the input is invalid",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--stop-on-error",
+        help="Stop after the first status word other than 0x9000 and exit with status 1",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        help="Write results as JSON lines, or the JSON report with corpus, to OUTPUT "
+        "(default: stdout)",
+        default=None,
+    )
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument(
+        "--quiet",
+        "-q",
+        help="Don't print results on stdout nor the summary on stderr",
+        action="store_true",
+    )
+    verbosity.add_argument("--debug", help="Print debug logs of each frame", action="store_true")
     parser.add_argument(
         "--version",
         "-v",
@@ -59,36 +437,153 @@ def main():
         print(__version__)
         return 0
 
+    if args.command is None:
+        parser.print_usage(sys.stderr)
+        return 2
+
+    if args.command == "corpus":
+        if args.record:
+            parser.error("argument --record: not allowed with corpus")
+        return run_corpus(args)
+
+    apdus: Iterator[Tuple[int, bytes]]
+
+    if args.command == "file":
+        apdus = parse_file(Path(args.filepath), args.startswith, args.strict)
+    elif args.command == "stdin":
+        apdus = parse_lines(sys.stdin, args.startswith, strict=args.strict)
+    else:
+        apdus = parse_ledger_live_log(Path(args.filepath))
+
+    if args.validate_first:
+        try:
+            apdus = iter(list(apdus))
+        except InvalidInputError as exc:
+            print(f"ledgercomm-send: error: {exc}", file=sys.stderr)
+            return 2
+
+    window: int = args.window or (1 if args.command == "stdin" and sys.stdin.isatty() else 8)
+
+    # dump the last APDUs on SIGUSR1 or before an uncaught exception
+    install_dump_handlers()
+
+    recorder: Optional[Recorder] = Recorder(args.record) if args.record else None
+
     transport = (
-        Transport(interface="hid", debug=True)
+        Transport(interface="hid", debug=args.debug, recorder=recorder)
         if args.hid
-        else Transport(interface="tcp", server=args.server, port=args.port, debug=True)
+        else Transport(
+            interface="tcp",
+            server=args.server,
+            port=args.port,
+            debug=args.debug,
+            recorder=recorder,
+        )
     )
 
-    if args.command == "file":
-        filepath: Path = Path(args.filepath)
+    output: Optional[TextIO] = None
+    if args.output:
+        output = open(args.output, "w", encoding="utf-8")  # pylint: disable=consider-using-with
+    elif not args.quiet:
+        output = sys.stdout
+
+    count: int = 0
+    errors: int = 0
+    status: int = 0
+    start: float = time.perf_counter()
+
+    try:
+        for result in exchange_script(transport, apdus, window, args.stop_on_error):
+            count += 1
+            if result.sw != 0x9000:
+                errors += 1
+                if args.stop_on_error:
+                    status = 1
 
-        for apdu in parse_file(filepath, args.startswith):  # type: str
-            if apdu:
-                transport.exchange_raw(re.sub(r"[^a-fA-F0-9]", "", apdu))
+            if output is not None:
+                output.write(
+                    json.dumps(
+                        {
+                            "line": result.line,
+                            "apdu": result.apdu.hex(),
+                            "sw": f"{result.sw:04x}",
+                            "rdata": result.rdata.hex(),
+                            "start_ms": round((result.start - start) * 1e3, 3),
+                            "latency_ms": round(result.latency * 1e3, 3),
+                        }
+                    )
+                    + "\n"
+                )
+    except InvalidInputError as exc:
+        print(f"ledgercomm-send: error: {exc}", file=sys.stderr)
+        status = 2
+    finally:
+        transport.close()
 
-    if args.command == "stdin":
-        apdu: str = input()
+        if recorder is not None:
+            recorder.close()
 
-        if args.startswith:
-            apdu = apdu.replace(args.startswith, "").strip()
+        if output is not None and output is not sys.stdout:
+            output.close()
 
-        if apdu:
-            transport.exchange_raw(re.sub(r"[^a-fA-F0-9]", "", apdu))
+    if not args.quiet:
+        elapsed: float = time.perf_counter() - start
+        print(
+            f"{count} APDU(s) exchanged in {elapsed:.3f}s ({count / elapsed:.0f}/s), "
+            f"{errors} with a status word other than 0x9000",
+            file=sys.stderr,
+        )
+
+    return status
+
+
+def run_corpus(args: argparse.Namespace) -> int:
+    """Run `ledgercomm-send corpus` and write its report."""
+    # imported here as the corpus module imports this one
+    from ledgercomm.cli import corpus  # pylint: disable=import-outside-toplevel
+
+    try:
+        scripts: List[Path] = corpus.find_scripts(args.paths, args.glob)
+        endpoints: List[Tuple[str, Dict[str, Any]]] = [
+            endpoint
+            for spec in args.endpoint
+            for endpoint in corpus.parse_endpoint(spec, args.timeout)
+        ]
+    except (OSError, ValueError) as exc:
+        print(f"ledgercomm-send: error: {exc}", file=sys.stderr)
+        return 2
+
+    report = corpus.run_corpus(
+        scripts,
+        endpoints,
+        condition=args.startswith,
+        strict=args.strict,
+        window=args.window or 8,
+        stop_on_error=args.stop_on_error,
+        debug=args.debug,
+        validate_first=args.validate_first,
+    )
 
-    if args.command == "log":
-        # TODO: implement Ledger Live log parser
-        raise NotImplementedError("Ledger Live log parser is not yet available!")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report.to_dict(), f, indent=2)
+    elif not args.quiet:
+        json.dump(report.to_dict(), sys.stdout, indent=2)
+        print()
 
-    transport.close()
+    if not args.quiet:
+        for endpoint, error in report.endpoint_errors.items():
+            print(f"ledgercomm-send: endpoint {endpoint} failed: {error}", file=sys.stderr)
+        print(
+            f"{len(report.results)} script(s) on {len(endpoints)} endpoint(s) in "
+            f"{report.seconds:.3f}s: {report.count('passed')} passed, "
+            f"{report.count('failed')} failed, {report.count('error')} error(s), "
+            f"{report.count('not run')} not run",
+            file=sys.stderr,
+        )
 
-    return 0
+    return 0 if report.passed else 1
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,357 @@
+"""ledgercomm.fake_device module."""
+
+import asyncio
+import contextlib
+import random
+import threading
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Tuple, Union
+
+from ledgercomm.interfaces.unix_socket import remove_socket
+from ledgercomm.log import LOG
+
+Handler = Callable[[bytes], Awaitable[Tuple[int, bytes]]]
+
+
+class EchoHandler:
+    """Handler answering each APDU with the APDU itself.
+
+    Parameters
+    ----------
+    sw : int
+        Status word of every response.
+
+    """
+
+    def __init__(self, sw: int = 0x9000) -> None:
+        """Init constructor of EchoHandler."""
+        self.sw: int = sw
+
+    async def __call__(self, apdu: bytes) -> Tuple[int, bytes]:
+        """Answer `apdu` with itself."""
+        return self.sw, apdu
+
+
+class ScriptedHandler:
+    """Handler answering APDUs with scripted replies.
+
+    The reply of an APDU is the one of the longest key of `replies`
+    which is a prefix of the APDU, e.g. `b"\\xe0\\x01"` matches every
+    APDU with CLA 0xE0 and INS 0x01.
+
+    Parameters
+    ----------
+    replies : Mapping[bytes, Tuple[int, bytes]]
+        Pairs (sw, rdata) by APDU prefix.
+    default_sw : int
+        Status word of APDUs without reply (default: 0x6D00, INS not supported).
+
+    """
+
+    def __init__(
+        self, replies: Mapping[bytes, Tuple[int, bytes]], default_sw: int = 0x6D00
+    ) -> None:
+        """Init constructor of ScriptedHandler."""
+        self.replies = dict(replies)
+        self.default_sw: int = default_sw
+        self._prefixes: List[bytes] = sorted(self.replies, key=len, reverse=True)
+
+    @classmethod
+    def from_file(cls, filepath: Union[str, Path], default_sw: int = 0x6D00) -> "ScriptedHandler":
+        """Load replies from a text file.
+
+        Each line holds an APDU prefix and its response (data then
+        status word) in hexadecimal, separated by whitespace. Empty
+        lines and lines starting with '#' are ignored.
+
+        Parameters
+        ----------
+        filepath : Union[str, Path]
+            Path of the script.
+        default_sw : int
+            Status word of APDUs without reply.
+
+        Returns
+        -------
+        ScriptedHandler
+
+        """
+        replies = {}
+
+        with open(filepath, "r", encoding="utf-8") as f:
+            for lineno, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                try:
+                    prefix, response = line.split()
+                    rapdu = bytes.fromhex(response)
+                    if len(rapdu) < 2:
+                        raise ValueError("response without status word")
+                    replies[bytes.fromhex(prefix)] = (
+                        int.from_bytes(rapdu[-2:], byteorder="big"),
+                        rapdu[:-2],
+                    )
+                except ValueError as exc:
+                    raise ValueError(f"{filepath}:{lineno}: invalid reply: {exc}") from exc
+
+        return cls(replies, default_sw=default_sw)
+
+    async def __call__(self, apdu: bytes) -> Tuple[int, bytes]:
+        """Answer `apdu` with the reply of its longest scripted prefix."""
+        for prefix in self._prefixes:
+            if apdu.startswith(prefix):
+                return self.replies[prefix]
+
+        return self.default_sw, b""
+
+
+class LatencyHandler:
+    """Handler delaying the responses of another handler.
+
+    Parameters
+    ----------
+    handler : Handler
+        Handler to delay.
+    delay : float
+        Delay in seconds added to each response.
+    jitter : float
+        Random delay in seconds added on top of `delay`, up to `jitter`.
+
+    """
+
+    def __init__(self, handler: Handler, delay: float, jitter: float = 0.0) -> None:
+        """Init constructor of LatencyHandler."""
+        self.handler: Handler = handler
+        self.delay: float = delay
+        self.jitter: float = jitter
+
+    async def __call__(self, apdu: bytes) -> Tuple[int, bytes]:
+        """Answer `apdu` with `self.handler` after the delay."""
+        await asyncio.sleep(self.delay + random.uniform(0, self.jitter))
+        return await self.handler(apdu)
+
+
+class FakeDevice:
+    """FakeDevice class, a stand-in for Speculos.
+
+    Asyncio server speaking the `TCPClient` protocol (4-byte length
+    then APDU, answered by 4-byte length, response data then 2-byte
+    status word) over TCP or a Unix socket, where APDUs are answered by
+    `handler`. Each connection is served by its own task so many
+    clients can run concurrently, and APDUs of a connection are answered
+    in order (which allows pipelining).
+
+    It runs either in the event loop of the caller with `start()` and
+    `stop()`, or in a background thread with `start_thread()` and
+    `stop_thread()` (or a `with` block).
+
+    Parameters
+    ----------
+    handler : Optional[Handler]
+        Async callable answering an APDU with a pair (sw, rdata),
+        `EchoHandler()` by default.
+    server : str
+        IP address to listen on.
+    port : int
+        Port to listen on, 0 for any free port.
+    path : Optional[str]
+        Path of a Unix socket to listen on instead of TCP. A socket left at
+        `path` by a previous server is replaced, anything else makes
+        `start()` fail.
+
+    Attributes
+    ----------
+    handler : Handler
+        Async callable answering APDUs.
+    server : str
+        IP address to listen on.
+    port : int
+        Port listened on, the actual one once started if 0 was given.
+    path : Optional[str]
+        Path of the Unix socket.
+    exchanges : int
+        Number of APDUs answered.
+
+    Examples
+    --------
+    >>> with FakeDevice(LatencyHandler(EchoHandler(), delay=0.001)) as device:
+    ...     transport = Transport(interface="tcp", server=device.server, port=device.port)
+
+    """
+
+    def __init__(
+        self,
+        handler: Optional[Handler] = None,
+        server: str = "127.0.0.1",
+        port: int = 0,
+        path: Optional[str] = None,
+    ) -> None:
+        """Init constructor of FakeDevice."""
+        self.handler: Handler = handler if handler is not None else EchoHandler()
+        self.server: str = server
+        self.port: int = port
+        self.path: Optional[str] = path
+        self.exchanges: int = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Dict[asyncio.StreamWriter, "asyncio.Task[Any]"] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "FakeDevice":
+        """Start the server in a background thread when entering `with` block."""
+        self.start_thread()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        """Stop the background server when leaving `with` block."""
+        self.stop_thread()
+
+    @property
+    def connections(self) -> int:
+        """Number of clients connected."""
+        return len(self._connections)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        assert task is not None
+        self._connections[writer] = task
+
+        try:
+            while True:
+                length: int = int.from_bytes(await reader.readexactly(4), byteorder="big")
+                apdu: bytes = await reader.readexactly(length)
+                sw, rdata = await self.handler(apdu)
+                self.exchanges += 1
+                writer.write(
+                    len(rdata).to_bytes(4, byteorder="big")
+                    + rdata
+                    + sw.to_bytes(2, byteorder="big")
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass  # client disconnected
+        finally:
+            self._connections.pop(writer, None)
+            writer.close()
+
+    async def start(self) -> None:
+        """Listen in the running event loop.
+
+        Returns
+        -------
+        None
+
+        """
+        if self._server is not None:
+            return
+
+        if self.path is not None:
+            # stale socket of a previous server, raises if `self.path` isn't a socket
+            remove_socket(self.path)
+            self._server = await asyncio.start_unix_server(self._serve, path=self.path)
+            LOG.info("Fake device listening on %s", self.path)
+        else:
+            self._server = await asyncio.start_server(
+                self._serve, host=self.server, port=self.port, backlog=1024
+            )
+            self.port = self._server.sockets[0].getsockname()[1]
+            LOG.info("Fake device listening on %s:%d", self.server, self.port)
+
+    async def serve_forever(self) -> None:
+        """Listen in the running event loop until cancelled.
+
+        Returns
+        -------
+        None
+
+        """
+        await self.start()
+        assert self._server is not None
+
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def stop(self) -> None:
+        """Stop listening and disconnect clients.
+
+        Returns
+        -------
+        None
+
+        """
+        if self._server is None:
+            return
+
+        self._server.close()
+        connections = list(self._connections.items())
+        for writer, _ in connections:
+            writer.close()
+        # handlers return once their connection is closed
+        await asyncio.gather(*(task for _, task in connections), return_exceptions=True)
+        await self._server.wait_closed()
+        self._server = None
+
+        if self.path is not None:
+            # replaced by someone else meanwhile, left as is
+            with contextlib.suppress(FileExistsError):
+                remove_socket(self.path)
+
+    def start_thread(self) -> None:
+        """Listen in an event loop run by a background thread.
+
+        Returns once the server is listening.
+
+        Returns
+        -------
+        None
+
+        """
+        if self._thread is not None:
+            return
+
+        loop = asyncio.new_event_loop()
+        started = threading.Event()
+        errors: List[BaseException] = []
+
+        def run() -> None:
+            asyncio.set_event_loop(loop)
+            try:
+                loop.run_until_complete(self.start())
+            except BaseException as exc:  # pylint: disable=broad-except
+                errors.append(exc)
+                return
+            finally:
+                started.set()
+            loop.run_forever()
+
+        self._loop = loop
+        self._thread = threading.Thread(target=run, name="ledgercomm-fake-device")
+        self._thread.daemon = True
+        self._thread.start()
+        started.wait()
+
+        if errors:
+            self._thread.join()
+            self._thread, self._loop = None, None
+            loop.close()
+            raise errors[0]
+
+    def stop_thread(self) -> None:
+        """Stop the server started with `start_thread()`.
+
+        Returns
+        -------
+        None
+
+        """
+        if self._thread is None or self._loop is None:
+            return
+
+        asyncio.run_coroutine_threadsafe(self.stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._thread, self._loop = None, None
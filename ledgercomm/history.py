@@ -0,0 +1,231 @@
+"""ledgercomm.history module."""
+
+import collections
+import signal
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Any, Deque, List, Optional, Sequence, TextIO, Tuple
+
+from ledgercomm.interfaces.comm import BytesLike
+
+# (timestamp, interface, status word or None if sent, data parts, data size)
+_Entry = Tuple[float, str, Optional[int], Sequence[BytesLike], int]
+
+
+class ApduHistory:
+    """ApduHistory class, ring buffer of the last APDUs and responses.
+
+    Interfaces record every APDU sent and response received as raw bytes,
+    hexadecimal is only formatted when the history is dumped, so keeping
+    it always on costs almost nothing. Only the first `prefix` bytes of
+    APDUs sent are kept, with their size, so large APDUs aren't copied.
+    Oldest entries are dropped once `maxlen` is reached.
+
+    Parameters
+    ----------
+    maxlen : int
+        Maximum number of entries kept, 0 to disable the history.
+    prefix : int
+        Number of bytes kept of each APDU sent.
+
+    Examples
+    --------
+    >>> try:
+    ...     transport.exchange(cla=0xE0, ins=0x01)
+    ... except Exception:
+    ...     HISTORY.dump()
+    ...     raise
+
+    """
+
+    def __init__(self, maxlen: int = 256, prefix: int = 32) -> None:
+        """Init constructor of ApduHistory."""
+        self.prefix: int = prefix
+        self._entries: Deque[_Entry] = collections.deque(maxlen=maxlen)
+
+    def __len__(self) -> int:
+        """Number of entries kept."""
+        return len(self._entries)
+
+    @property
+    def maxlen(self) -> int:
+        """Maximum number of entries kept."""
+        return self._entries.maxlen or 0
+
+    @maxlen.setter
+    def maxlen(self, maxlen: int) -> None:
+        self._entries = collections.deque(self._entries, maxlen=maxlen)
+
+    def sent(self, interface: str, parts: Sequence[BytesLike]) -> None:
+        """Record an APDU sent, given in one or several parts.
+
+        Parameters
+        ----------
+        interface : str
+            Name of the interface.
+        parts : Sequence[Union[bytes, bytearray, memoryview]]
+            Consecutive parts of the APDU, only their first `prefix` bytes
+            are copied.
+
+        Returns
+        -------
+        None
+
+        """
+        if len(parts) == 1 and type(parts[0]) is bytes and len(parts[0]) <= self.prefix:
+            self._entries.append((time.time(), interface, None, parts, len(parts[0])))
+            return
+
+        head = bytearray()
+        size: int = 0
+        for part in parts:
+            if len(head) < self.prefix:
+                head += part[: self.prefix - len(head)]
+            size += len(part)
+
+        self._entries.append((time.time(), interface, None, (bytes(head),), size))
+
+    def received(self, interface: str, sw: int, rdata: bytes) -> None:
+        """Record a response received.
+
+        Parameters
+        ----------
+        interface : str
+            Name of the interface.
+        sw : int
+            Status word of the response.
+        rdata : bytes
+            Response data.
+
+        Returns
+        -------
+        None
+
+        """
+        self._entries.append((time.time(), interface, sw, (rdata,), len(rdata)))
+
+    def received_view(self, interface: str, sw: int, rdata: memoryview) -> List[BytesLike]:
+        """Record a response whose data is still a view on a receive buffer.
+
+        The view isn't copied, the caller must replace it in the returned
+        parts by a copy (e.g. ``parts[0] = parts[0].tobytes()``) before
+        the buffer is written again.
+
+        Parameters
+        ----------
+        interface : str
+            Name of the interface.
+        sw : int
+            Status word of the response.
+        rdata : memoryview
+            Response data, as a view on the receive buffer.
+
+        Returns
+        -------
+        List[Union[bytes, bytearray, memoryview]]
+            Parts of the entry, holding `rdata` until it is copied.
+
+        """
+        parts: List[BytesLike] = [rdata]
+        self._entries.append((time.time(), interface, sw, parts, len(rdata)))
+
+        return parts
+
+    def lines(self) -> List[str]:
+        """Format entries, oldest first, as in debug logs.
+
+        Returns
+        -------
+        List[str]
+            One line per entry: time, interface, direction and hexadecimal,
+            followed by the size of APDUs longer than `prefix`.
+
+        """
+        lines: List[str] = []
+
+        for timestamp, interface, sw, parts, size in list(self._entries):
+            data: str = "".join(bytes(part).hex() for part in parts)
+            if size > len(data) // 2:
+                data += f"... ({size} bytes)"
+            when: str = datetime.fromtimestamp(timestamp).strftime("%H:%M:%S.%f")
+            if sw is None:
+                lines.append(f"{when} {interface} => {data}")
+            else:
+                lines.append(f"{when} {interface} <= {data} {sw:04x}")
+
+        return lines
+
+    def dump(self, file: Optional[TextIO] = None) -> None:
+        """Write entries to `file`.
+
+        Parameters
+        ----------
+        file : Optional[TextIO]
+            Destination of the dump, `sys.stderr` if None.
+
+        Returns
+        -------
+        None
+
+        """
+        out: TextIO = file if file is not None else sys.stderr
+        lines: List[str] = self.lines()
+
+        out.write(f"--- last {len(lines)} APDU(s) ---\n")
+        for line in lines:
+            out.write(line + "\n")
+        out.flush()
+
+    def clear(self) -> None:
+        """Drop all entries.
+
+        Returns
+        -------
+        None
+
+        """
+        self._entries.clear()
+
+
+HISTORY = ApduHistory()
+
+
+def install_dump_handlers(signum: Optional[int] = None, on_error: bool = True) -> None:
+    """Dump `HISTORY` on stderr when a signal is received or on uncaught exceptions.
+
+    Parameters
+    ----------
+    signum : Optional[int]
+        Signal dumping the history, SIGUSR1 if None and available.
+        Must be called from the main thread to install it.
+    on_error : bool
+        Whether the history is dumped before uncaught exceptions are
+        reported, in any thread.
+
+    Returns
+    -------
+    None
+
+    """
+    if signum is None:
+        signum = getattr(signal, "SIGUSR1", None)
+
+    if signum is not None:
+        signal.signal(signum, lambda *_: HISTORY.dump())
+
+    if on_error:
+        previous_excepthook = sys.excepthook
+        previous_threading_excepthook = threading.excepthook
+
+        def excepthook(*args: Any) -> None:
+            HISTORY.dump()
+            previous_excepthook(*args)
+
+        def threading_excepthook(args: Any) -> None:
+            HISTORY.dump()
+            previous_threading_excepthook(args)
+
+        sys.excepthook = excepthook
+        threading.excepthook = threading_excepthook
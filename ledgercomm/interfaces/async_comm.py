@@ -0,0 +1,176 @@
+"""ledgercomm.interfaces.async_comm module."""
+
+import asyncio
+import collections
+from abc import ABCMeta, abstractmethod
+from typing import Awaitable, Callable, Deque, Optional, Tuple
+
+
+class AsyncComm(metaclass=ABCMeta):
+    """Abstract class for asynchronous communication interface."""
+
+    @abstractmethod
+    async def open(self) -> None:
+        """Just open the interface."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def send(self, data: bytes) -> int:
+        """Allow to send raw bytes from the interface."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def recv(self) -> Tuple[int, bytes]:
+        """Allow to receive raw bytes from the interface."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def exchange(self, data: bytes) -> Tuple[int, bytes]:
+        """Allow to send and receive raw bytes from the interface."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def close(self) -> None:
+        """Just close the interface."""
+        raise NotImplementedError
+
+
+class ResponseStream:
+    """Responses of an interface handed out in the order commands were sent.
+
+    Each command written gets a future, queued in write order, resolved
+    with its response by a single reader task. A cancelled exchange (e.g.
+    timed out) cancels its future, so only its response is discarded when
+    it comes and the other callers still get their own, while the response
+    awaited by a cancelled `next()` is left to the next one.
+
+    Parameters
+    ----------
+    read_frame : Callable[[], Awaitable[Tuple[int, bytes]]]
+        Coroutine function reading exactly one response frame.
+
+    """
+
+    def __init__(self, read_frame: Callable[[], Awaitable[Tuple[int, bytes]]]) -> None:
+        """Init constructor of ResponseStream."""
+        self._read_frame = read_frame
+        self._task: Optional["asyncio.Future[None]"] = None
+        # futures of the responses owed, in write order
+        self._waiters: Deque["asyncio.Future[Tuple[int, bytes]]"] = collections.deque()
+        # futures of commands sent with `send()`, not claimed by `next()` yet
+        self._unclaimed: Deque["asyncio.Future[Tuple[int, bytes]]"] = collections.deque()
+
+    @property
+    def pending(self) -> int:
+        """Number of responses still expected from the interface."""
+        return len(self._waiters)
+
+    def expect(self, claimed: bool = False) -> "asyncio.Future[Tuple[int, bytes]]":
+        """Record that a command has been written and a response is owed.
+
+        Must be called in the order commands are written.
+
+        Parameters
+        ----------
+        claimed : bool
+            Whether the caller awaits the returned future itself (e.g. an
+            exchange), otherwise the response is returned by `next()`.
+
+        Returns
+        -------
+        asyncio.Future[Tuple[int, bytes]]
+            Future of the response, cancel it to discard the response.
+
+        """
+        waiter: "asyncio.Future[Tuple[int, bytes]]" = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        if not claimed:
+            self._unclaimed.append(waiter)
+
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._read_responses())
+
+        return waiter
+
+    def fail(self, waiter: "asyncio.Future[Tuple[int, bytes]]", exc: BaseException) -> None:
+        """Forget the response of a command whose write failed with `exc`.
+
+        `waiter` is failed with `exc` if claimed, otherwise cancelled as the
+        error is raised by the send.
+
+        Returns
+        -------
+        None
+
+        """
+        if waiter in self._waiters:
+            self._waiters.remove(waiter)
+
+        if waiter in self._unclaimed:
+            self._unclaimed.remove(waiter)
+            waiter.cancel()
+        elif not waiter.done():
+            waiter.set_exception(exc)
+
+        if not self._waiters and self._task is not None:
+            # no response owed, nothing is being read
+            self._task.cancel()
+            self._task = None
+
+    async def _read_responses(self) -> None:
+        try:
+            while self._waiters:
+                try:
+                    response: Tuple[int, bytes] = await self._read_frame()
+                except Exception as exc:  # pylint: disable=broad-except
+                    # the response of the oldest command can't be read
+                    waiter = self._waiters.popleft()
+                    if not waiter.done():
+                        waiter.set_exception(exc)
+                    continue
+
+                waiter = self._waiters.popleft()
+                # cancelled callers don't want their response anymore
+                if not waiter.done():
+                    waiter.set_result(response)
+        finally:
+            if self._task is asyncio.current_task():
+                self._task = None
+
+    async def next(self) -> Tuple[int, bytes]:
+        """Wait for the response of the oldest command sent with `expect()` and not claimed.
+
+        Without such a command, wait for the next response received. If
+        cancelled, the response is left to the next call.
+
+        Returns
+        -------
+        Tuple[int, bytes]
+            A pair (sw, rdata) containing the status word and response data.
+
+        """
+        waiter = self._unclaimed.popleft() if self._unclaimed else self.expect(claimed=True)
+
+        try:
+            return await asyncio.shield(waiter)
+        except asyncio.CancelledError:
+            if not waiter.cancelled():
+                self._unclaimed.appendleft(waiter)
+            raise
+
+    def cancel(self) -> None:
+        """Stop the frame reader and cancel responses owed, e.g. when the interface is closed.
+
+        Returns
+        -------
+        None
+
+        """
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+        for waiter in self._waiters:
+            waiter.cancel()
+        self._waiters.clear()
+        self._unclaimed.clear()
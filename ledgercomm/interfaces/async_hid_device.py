@@ -0,0 +1,183 @@
+"""ledgercomm.interfaces.async_hid_device module."""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from ledgercomm.history import HISTORY
+from ledgercomm.interfaces.async_comm import AsyncComm, ResponseStream
+from ledgercomm.interfaces.hid_device import DEFAULT_VENDOR_ID, HID
+from ledgercomm.interfaces.hid_framing import HIDFrameDecoder
+from ledgercomm.log import LOG
+
+
+class AsyncHID(AsyncComm):
+    """AsyncHID class.
+
+    Asyncio counterpart of `HID`. The device stays in non-blocking mode:
+    reports are polled every `poll_interval` seconds and writes are run
+    in the default executor, so the event loop is never blocked.
+
+    Parameters
+    ----------
+    vendor_id : int
+        Vendor ID of the device. Default to Ledger Vendor ID 0x2C97.
+    poll_interval : float
+        Delay in seconds between two reads when no report is available.
+
+    Attributes
+    ----------
+    hid : HID
+        Synchronous HID interface owning the device.
+    poll_interval : float
+        Delay in seconds between two reads when no report is available.
+
+    """
+
+    def __init__(self, vendor_id: int = DEFAULT_VENDOR_ID, poll_interval: float = 0.001) -> None:
+        """Init constructor of AsyncHID."""
+        self.hid: HID = HID(vendor_id=vendor_id)
+        self.poll_interval: float = poll_interval
+        self._decoder = HIDFrameDecoder()
+        self._responses = ResponseStream(self._read_frame)
+        # single thread writing reports, started when opened
+        self._writer: Optional[ThreadPoolExecutor] = None
+
+    async def open(self) -> None:
+        """Open connection to the HID device.
+
+        Returns
+        -------
+        None
+
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.hid.open)
+
+        if self._writer is None:
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ledgercomm-hid")
+
+    def _write(
+        self, data: bytes, claimed: bool
+    ) -> Tuple["asyncio.Future[int]", "asyncio.Future[Tuple[int, bytes]]"]:
+        """Start writing `data` and return the futures of the write and of its response."""
+        if not data:
+            raise ValueError("Can't send empty data!")
+
+        if self._writer is None:
+            raise ConnectionError("HID device is not opened!")
+
+        # a single writer thread keeps writes in the order of their responses
+        written = asyncio.get_running_loop().run_in_executor(self._writer, self.hid.send, data)
+        response = self._responses.expect(claimed)
+
+        def on_written(future: "asyncio.Future[int]") -> None:
+            exc: Optional[BaseException] = None if future.cancelled() else future.exception()
+            if exc is not None:
+                self._responses.fail(response, exc)
+
+        written.add_done_callback(on_written)
+
+        return written, response
+
+    async def send(self, data: bytes) -> int:
+        """Send `data` through the HID device.
+
+        Its response is returned by a later `recv()`.
+
+        Parameters
+        ----------
+        data : bytes
+            Bytes of data to send.
+
+        Returns
+        -------
+        int
+            Total length of data sent to the device.
+
+        """
+        written, _ = self._write(data, claimed=False)
+
+        # the write can't be interrupted once started, shield it so the
+        # response stays owed even if the caller is cancelled
+        return await asyncio.shield(written)
+
+    async def _read_report(self, timeout_ms: Optional[int] = None) -> bytes:
+        loop = asyncio.get_running_loop()
+        deadline: Optional[float] = (
+            loop.time() + timeout_ms / 1000 if timeout_ms is not None else None
+        )
+
+        while True:
+            report: bytes = bytes(self.hid.device.read(64 + 1))
+            if report:
+                return report
+            if deadline is not None and loop.time() > deadline:
+                raise TimeoutError("No HID report received in time!")
+            await asyncio.sleep(self.poll_interval)
+
+    async def _read_frame(self) -> Tuple[int, bytes]:
+        self._decoder.reset()
+        data_chunk: bytes = await self._read_report()
+
+        while not self._decoder.feed(data_chunk):
+            data_chunk = await self._read_report(timeout_ms=1000)
+
+        sw, rdata = self._decoder.response()
+
+        HISTORY.received("HID", sw, rdata)
+
+        if LOG.isEnabledFor(logging.DEBUG):
+            LOG.debug("<= %s %s", rdata.hex(), hex(sw)[2:])
+
+        return sw, rdata
+
+    async def recv(self) -> Tuple[int, bytes]:
+        """Receive the response of the oldest APDU sent with `send()`.
+
+        Returns
+        -------
+        Tuple[int, bytes]
+            A pair (sw, rdata) containing the status word and response data.
+
+        """
+        return await self._responses.next()
+
+    async def exchange(self, data: bytes) -> Tuple[int, bytes]:
+        """Exchange (send + receive) with the HID device.
+
+        Concurrent exchanges each get their own response. If cancelled,
+        the response is discarded when it comes.
+
+        Parameters
+        ----------
+        data : bytes
+            Bytes with `data` to send.
+
+        Returns
+        -------
+        Tuple[int, bytes]
+            A pair (sw, rdata) containing the status word and response data.
+
+        """
+        _, response = self._write(data, claimed=True)
+
+        return await response
+
+    async def close(self) -> None:
+        """Close connection to the HID device.
+
+        Returns
+        -------
+        None
+
+        """
+        self._responses.cancel()
+
+        if self._writer is not None:
+            # writes already started end before the device is closed
+            await asyncio.get_running_loop().run_in_executor(None, self._writer.shutdown)
+            self._writer = None
+
+        self.hid.close()
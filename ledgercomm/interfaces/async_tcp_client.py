@@ -0,0 +1,168 @@
+"""ledgercomm.interfaces.async_tcp_client module."""
+
+import asyncio
+import logging
+from typing import Optional, Tuple
+
+from ledgercomm.history import HISTORY
+from ledgercomm.interfaces.async_comm import AsyncComm, ResponseStream
+from ledgercomm.log import LOG
+
+
+class AsyncTCPClient(AsyncComm):
+    """AsyncTCPClient class.
+
+    Asyncio streams counterpart of `TCPClient`, mainly used to drive
+    many Speculos emulators from a single event loop.
+
+    Parameters
+    ----------
+    server : str
+        IP address of the TCP server.
+    port : int
+        Port of the TCP server.
+
+    Attributes
+    ----------
+    server : str
+        IP address of the TCP server.
+    port : int
+        Port of the TCP server.
+    reader : Optional[asyncio.StreamReader]
+        Stream to read responses from the server.
+    writer : Optional[asyncio.StreamWriter]
+        Stream to write APDUs to the server.
+
+    """
+
+    def __init__(self, server: str, port: int) -> None:
+        """Init constructor of AsyncTCPClient."""
+        self.server: str = server
+        self.port: int = port
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self._responses = ResponseStream(self._read_frame)
+
+    async def open(self) -> None:
+        """Open connection to TCP socket with `self.server` and `self.port`.
+
+        Returns
+        -------
+        None
+
+        """
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.server, self.port)
+
+    def _write(self, data: bytes, claimed: bool) -> "asyncio.Future[Tuple[int, bytes]]":
+        """Write `data` to the stream buffer and return the future of its response."""
+        if not data:
+            raise ValueError("Can't send empty data!")
+
+        if self.writer is None:
+            raise ConnectionError("TCP connection is not opened!")
+
+        HISTORY.sent(type(self).__name__, (data,))
+
+        if LOG.isEnabledFor(logging.DEBUG):
+            LOG.debug("=> %s", data.hex())
+
+        self.writer.write(int.to_bytes(len(data), 4, byteorder="big") + data)
+
+        return self._responses.expect(claimed)
+
+    async def send(self, data: bytes) -> int:
+        """Send `data` through the TCP stream `self.writer`.
+
+        Its response is returned by a later `recv()`.
+
+        Parameters
+        ----------
+        data : bytes
+            Bytes of data to send.
+
+        Returns
+        -------
+        int
+            Total length of data sent through TCP socket.
+
+        """
+        self._write(data, claimed=False)
+        assert self.writer is not None
+        await self.writer.drain()
+
+        return 4 + len(data)
+
+    async def _read_frame(self) -> Tuple[int, bytes]:
+        assert self.reader is not None
+
+        length: int = int.from_bytes(await self.reader.readexactly(4), byteorder="big")
+        rdata: bytes = await self.reader.readexactly(length)
+        sw: int = int.from_bytes(await self.reader.readexactly(2), byteorder="big")
+
+        HISTORY.received(type(self).__name__, sw, rdata)
+
+        if LOG.isEnabledFor(logging.DEBUG):
+            LOG.debug("<= %s %s", rdata.hex(), hex(sw)[2:])
+
+        return sw, rdata
+
+    async def recv(self) -> Tuple[int, bytes]:
+        """Receive the response of the oldest APDU sent with `send()`.
+
+        Returns
+        -------
+        Tuple[int, bytes]
+            A pair (sw, rdata) containing the status word and response data.
+
+        """
+        if self.reader is None:
+            raise ConnectionError("TCP connection is not opened!")
+
+        return await self._responses.next()
+
+    async def exchange(self, data: bytes) -> Tuple[int, bytes]:
+        """Exchange (send + receive) with the TCP server.
+
+        Concurrent exchanges each get their own response. If cancelled,
+        the response is discarded when it comes.
+
+        Parameters
+        ----------
+        data : bytes
+            Bytes with `data` to send.
+
+        Returns
+        -------
+        Tuple[int, bytes]
+            A pair (sw, rdata) containing the status word and response data.
+
+        """
+        response = self._write(data, claimed=True)
+
+        try:
+            assert self.writer is not None
+            await self.writer.drain()
+        except BaseException:
+            response.cancel()
+            raise
+
+        return await response
+
+    async def close(self) -> None:
+        """Close connection to the TCP server.
+
+        Returns
+        -------
+        None
+
+        """
+        self._responses.cancel()
+
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
+            self.reader, self.writer = None, None
@@ -0,0 +1,66 @@
+"""ledgercomm.interfaces.broker_client module."""
+
+import os
+from typing import Optional
+
+from ledgercomm.interfaces.unix_socket import UnixClient
+
+BROKER_SOCKET_NAME = "ledgercomm-broker.sock"
+
+
+def default_broker_path() -> str:
+    """Path of the broker socket in the runtime directory of the user.
+
+    The runtime directory `$XDG_RUNTIME_DIR` is only accessible to its
+    user, unlike a shared directory such as /tmp where anyone could
+    create the socket first and impersonate the broker.
+
+    Returns
+    -------
+    str
+        "$XDG_RUNTIME_DIR/ledgercomm-broker.sock".
+
+    Raises
+    ------
+    ValueError
+        If `$XDG_RUNTIME_DIR` isn't set, the path must then be given explicitly.
+
+    """
+    runtime_dir: Optional[str] = os.environ.get("XDG_RUNTIME_DIR")
+
+    if not runtime_dir:
+        raise ValueError("XDG_RUNTIME_DIR is not set, give the path of the broker socket!")
+
+    return os.path.join(runtime_dir, BROKER_SOCKET_NAME)
+
+
+class BrokerClient(UnixClient):
+    """BrokerClient class.
+
+    Mainly used to share a device owned by a `ledgercomm.broker.Broker`
+    between processes. It speaks the same protocol as `TCPClient` over
+    the Unix socket of the broker.
+
+    Parameters
+    ----------
+    path : Optional[str]
+        Path of the Unix socket of the broker, `default_broker_path()` if None.
+    buffer_size : int
+        Initial size in bytes of the receive buffer, grown if a response doesn't fit.
+    timeout : Optional[float]
+        Timeout in seconds of socket operations, None to block forever.
+
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        buffer_size: int = 4096,
+        timeout: Optional[float] = None,
+    ) -> None:
+        """Init constructor of BrokerClient."""
+        super().__init__(
+            path=path if path is not None else default_broker_path(),
+            buffer_size=buffer_size,
+            timeout=timeout,
+        )
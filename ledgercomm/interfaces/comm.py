@@ -1,11 +1,22 @@
 """ledgercomm.comm module."""
 
 from abc import ABCMeta, abstractmethod
-from typing import Tuple
+from typing import Sequence, Tuple, Union
+
+BytesLike = Union[bytes, bytearray, memoryview]
 
 
 class Comm(metaclass=ABCMeta):
-    """Abstract class for communication interface."""
+    """Abstract class for communication interface.
+
+    Attributes
+    ----------
+    pipelining : bool
+        Whether several APDUs can be sent before reading their responses.
+
+    """
+
+    pipelining: bool = False
 
     @abstractmethod
     def open(self) -> None:
@@ -13,17 +24,25 @@ class Comm(metaclass=ABCMeta):
         raise NotImplementedError
 
     @abstractmethod
-    def send(self, data: bytes) -> int:
+    def send(self, data: BytesLike) -> int:
         """Allow to send raw bytes from the interface."""
         raise NotImplementedError
 
+    def send_parts(self, *parts: BytesLike) -> int:
+        """Allow to send one raw APDU given in several parts (e.g. header and data)."""
+        return self.send(b"".join(parts))
+
+    def send_many(self, data: Sequence[BytesLike]) -> int:
+        """Allow to send several raw APDUs, one after the other."""
+        return sum(self.send(apdu) for apdu in data)
+
     @abstractmethod
     def recv(self) -> Tuple[int, bytes]:
         """Allow to receive raw bytes from the interface."""
         raise NotImplementedError
 
     @abstractmethod
-    def exchange(self, data: bytes) -> Tuple[int, bytes]:
+    def exchange(self, data: BytesLike) -> Tuple[int, bytes]:
         """Allow to send and receive raw bytes from the interface."""
         raise NotImplementedError
 
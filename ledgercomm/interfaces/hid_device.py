@@ -1,5 +1,7 @@
 """ledgercomm.interfaces.hid_device module."""
 
+import logging
+import time
 from typing import Any, List, Mapping, Optional, Tuple
 
 try:
@@ -7,7 +9,11 @@ try:
 except ImportError:
     hid = None
 
-from ledgercomm.interfaces.comm import Comm
+from ledgercomm import tracing
+from ledgercomm.history import HISTORY
+from ledgercomm.interfaces.comm import BytesLike, Comm
+from ledgercomm.interfaces.hid_framing import HIDFrameDecoder, HIDFrameEncoder
+from ledgercomm.interfaces.hid_reader import HIDReader, OverflowPolicy
 from ledgercomm.log import LOG
 
 DEFAULT_VENDOR_ID = 0x2C97
@@ -39,6 +45,19 @@ class HID(Comm):
     ----------
     vendor_id: int
         Vendor ID of the device. Default to Ledger Vendor ID 0x2C97.
+    path : Optional[bytes]
+        Path of the HID device (see `HID.enumerate_devices()`), picked
+        automatically when opened if None.
+    reader_thread : bool
+        Whether reports are drained by a dedicated `HIDReader` thread
+        instead of being read when receiving a response.
+    queue_size : int
+        Maximum number of reports queued by the reader thread.
+    overflow : str
+        Policy of the reader thread when its queue is full, see `HIDReader`.
+    timeout : Optional[float]
+        Deadline in seconds to receive a whole response with the reader
+        thread, None to wait forever.
 
     Attributes
     ----------
@@ -46,20 +65,40 @@ class HID(Comm):
         HID device connection.
     path : Optional[bytes]
         Path of the HID device.
+    reader : Optional[HIDReader]
+        Reader thread if `reader_thread` is enabled and the device is opened.
+    timeout : Optional[float]
+        Deadline in seconds to receive a whole response with the reader thread.
     __opened : bool
         Whether the connection to the HID device is opened or not.
 
     """
 
-    def __init__(self, vendor_id: int = DEFAULT_VENDOR_ID) -> None:
+    def __init__(
+        self,
+        vendor_id: int = DEFAULT_VENDOR_ID,
+        path: Optional[bytes] = None,
+        reader_thread: bool = False,
+        queue_size: int = 64,
+        overflow: OverflowPolicy = "block",
+        timeout: Optional[float] = None,
+    ) -> None:
         """Init constructor of HID."""
         if hid is None:
             raise HIDAPINotInstalledError()
 
         self.device = hid.device()
-        self.path: Optional[bytes] = None
+        self.path: Optional[bytes] = path
         self.__opened: bool = False
         self.vendor_id: int = vendor_id
+        self.reader: Optional[HIDReader] = (
+            HIDReader(self.device, queue_size=queue_size, overflow=overflow)
+            if reader_thread
+            else None
+        )
+        self.timeout: Optional[float] = timeout
+        self._encoder = HIDFrameEncoder()
+        self._decoder = HIDFrameDecoder()
 
     def open(self) -> None:
         """Open connection to the HID device.
@@ -70,19 +109,33 @@ class HID(Comm):
 
         """
         if not self.__opened:
-            if not self.path:
-                self.path = HID._decide_device_path(self.vendor_id)
-            self.device.open_path(self.path)
+            if self.path:
+                self.device.open_path(self.path)
+            else:
+                try:
+                    path: bytes = HID._decide_device_path(self.vendor_id)
+                    self.device.open_path(path)
+                except (OSError, CannotFindDeviceError):
+                    # a device may have been plugged or unplugged since the cache
+                    # was refreshed, enumerate again
+                    path = HID._decide_device_path(self.vendor_id, max_age=0)
+                    self.device.open_path(path)
+                self.path = path
             self.device.set_nonblocking(True)
+            if self.reader is not None:
+                self.reader.start()
             self.__opened = True
 
     @staticmethod
-    def _decide_device_path(vendor_id: int = DEFAULT_VENDOR_ID) -> bytes:
-        if hid is None:
-            raise HIDAPINotInstalledError()
+    def _decide_device_path(
+        vendor_id: int = DEFAULT_VENDOR_ID, max_age: Optional[float] = None
+    ) -> bytes:
+        # imported here as hid_discovery imports this module
+        from ledgercomm.interfaces.hid_discovery import (  # pylint: disable=import-outside-toplevel
+            get_discovery,
+        )
 
-        devices: List[Mapping[str, Any]] = list(hid.enumerate(vendor_id, 0))
-        LOG.debug("hid.enumerate(), devices: %s", devices)
+        devices: List[Mapping[str, Any]] = get_discovery(vendor_id).entries(max_age)
 
         devices = [device for device in devices if device.get("interface_number") == 0]
         if len(devices) == 1:
@@ -117,6 +170,9 @@ class HID(Comm):
     def enumerate_devices(vendor_id: int = DEFAULT_VENDOR_ID) -> List[bytes]:
         """Enumerate HID devices to find Nano S/X.
 
+        Devices are always enumerated again, which also refreshes the cache
+        of `get_discovery(vendor_id)`, see `HID.cached_devices()` to avoid it.
+
         Parameters
         ----------
         vendor_id: int
@@ -128,30 +184,51 @@ class HID(Comm):
             List of paths to HID devices which should be Nano S or Nano X.
 
         """
-        if hid is None:
-            raise HIDAPINotInstalledError()
-
-        devices: List[bytes] = []
+        # imported here as hid_discovery imports this module
+        from ledgercomm.interfaces.hid_discovery import (  # pylint: disable=import-outside-toplevel
+            get_discovery,
+        )
 
-        for hid_device in hid.enumerate(vendor_id, 0):
-            if (
-                hid_device.get("interface_number") == 0
-                or
-                # MacOS specific
-                hid_device.get("usage_page") == MACOS_USAGE_PAGE
-            ):
-                devices.append(hid_device["path"])
+        devices: List[bytes] = get_discovery(vendor_id).paths(max_age=0)
 
         assert len(devices) != 0, f"Can't find Ledger device with vendor_id {hex(vendor_id)}"
 
         return devices
 
-    def send(self, data: bytes) -> int:
+    @staticmethod
+    def cached_devices(
+        vendor_id: int = DEFAULT_VENDOR_ID, max_age: Optional[float] = None
+    ) -> List[bytes]:
+        """Paths of the Nano S/X connected, from the cache of `get_discovery(vendor_id)`.
+
+        Parameters
+        ----------
+        vendor_id: int
+            Vendor ID of the device. Default to Ledger Vendor ID 0x2C97.
+        max_age : Optional[float]
+            Enumerate devices again if the cache is older than `max_age`
+            seconds, `HIDDiscovery.max_age` if None.
+
+        Returns
+        -------
+        List[bytes]
+            List of paths to HID devices which should be Nano S or Nano X,
+            empty if none is connected.
+
+        """
+        # imported here as hid_discovery imports this module
+        from ledgercomm.interfaces.hid_discovery import (  # pylint: disable=import-outside-toplevel
+            get_discovery,
+        )
+
+        return get_discovery(vendor_id).paths(max_age)
+
+    def send(self, data: BytesLike) -> int:
         """Send `data` through HID device `self.device`.
 
         Parameters
         ----------
-        data : bytes
+        data : Union[bytes, bytearray, memoryview]
             Bytes of data to send.
 
         Returns
@@ -160,32 +237,51 @@ class HID(Comm):
             Total length of data sent to the device.
 
         """
-        if not data:
+        return self.send_parts(data)
+
+    def send_parts(self, *parts: BytesLike) -> int:
+        """Send one APDU made of `parts` through HID device `self.device`.
+
+        Each 64-byte report is filled in place from `parts`, which are never
+        concatenated.
+
+        Parameters
+        ----------
+        *parts : Union[bytes, bytearray, memoryview]
+            Consecutive parts of the APDU (e.g. header then command data).
+
+        Returns
+        -------
+        int
+            Total length of data sent to the device.
+
+        """
+        data_len: int = sum(len(part) for part in parts)
+
+        if not data_len:
             raise ValueError("Can't send empty data!")
 
-        LOG.debug("=> %s", data.hex())
+        HISTORY.sent(type(self).__name__, parts)
 
-        data = int.to_bytes(len(data), 2, byteorder="big") + data
-        offset: int = 0
-        seq_idx: int = 0
-        length: int = 0
+        if LOG.isEnabledFor(logging.DEBUG):
+            LOG.debug("=> %s", "".join(part.hex() for part in parts))
 
-        while offset < len(data):
-            # Header: channel (0x0101), tag (0x05), sequence index
-            header: bytes = b"\x01\x01\x05" + seq_idx.to_bytes(2, byteorder="big")
-            data_chunk: bytes = header + data[offset : offset + 64 - len(header)]
+        length: int = 0
 
-            self.device.write(b"\x00" + data_chunk)
-            length += len(data_chunk) + 1
-            offset += 64 - len(header)
-            seq_idx += 1
+        with tracing.span("hid.send"):
+            for report in self._encoder.encode(*parts):
+                with tracing.span("hid.write"):
+                    self.device.write(report)
+                length += len(report)
 
         return length
 
     def recv(self) -> Tuple[int, bytes]:
         """Receive data through HID device `self.device`.
 
-        Blocking IO.
+        Blocking IO, bounded by `self.timeout` with the reader thread. If
+        receiving fails, reports left of the response are discarded and
+        leftovers arriving later are skipped by the next call.
 
         Returns
         -------
@@ -193,35 +289,84 @@ class HID(Comm):
             A pair (sw, rdata) containing the status word and response data.
 
         """
-        seq_idx: int = 0
-        self.device.set_nonblocking(False)
-        data_chunk: bytes = bytes(self.device.read(64 + 1))
-        self.device.set_nonblocking(True)
+        self._decoder.reset()
 
-        assert data_chunk[:2] == b"\x01\x01"
-        assert data_chunk[2] == 5
-        assert data_chunk[3:5] == seq_idx.to_bytes(2, byteorder="big")
+        try:
+            if self.reader is not None:
+                self._recv_from_reader(self.reader)
+            else:
+                self._recv_from_device()
+        except Exception:
+            # reports left of this response would be taken for the next one
+            self._discard_pending()
+            raise
 
-        data_len: int = int.from_bytes(data_chunk[5:7], byteorder="big")
-        data: bytes = data_chunk[7:]
+        sw, rdata = self._decoder.response()
 
-        while len(data) < data_len:
-            read_bytes = bytes(self.device.read(64 + 1, timeout_ms=1000))
-            data += read_bytes[5:]
+        HISTORY.received(type(self).__name__, sw, rdata)
 
-        sw: int = int.from_bytes(data[data_len - 2 : data_len], byteorder="big")
-        rdata: bytes = data[: data_len - 2]
-
-        LOG.debug("<= %s %s", rdata.hex(), hex(sw)[2:])
+        if LOG.isEnabledFor(logging.DEBUG):
+            LOG.debug("<= %s %s", rdata.hex(), hex(sw)[2:])
 
         return sw, rdata
 
-    def exchange(self, data: bytes) -> Tuple[int, bytes]:
+    @staticmethod
+    def _first_report(report: bytes) -> bool:
+        """Whether `report` starts a response, others are leftovers of an aborted one."""
+        return report[3:5] == b"\x00\x00"
+
+    def _discard_pending(self) -> None:
+        self._decoder.reset()
+
+        if self.reader is not None:
+            self.reader.clear()
+            return
+
+        try:
+            while self.device.read(64 + 1):  # non-blocking, empty once drained
+                pass
+        except OSError:
+            pass
+
+    def _recv_from_device(self) -> None:
+        with tracing.span("hid.recv.wait"):
+            self.device.set_nonblocking(False)
+            try:
+                data_chunk: bytes = bytes(self.device.read(64 + 1))
+                while not HID._first_report(data_chunk):
+                    data_chunk = bytes(self.device.read(64 + 1))
+            finally:
+                self.device.set_nonblocking(True)
+
+        with tracing.span("hid.recv.reassembly"):
+            while not self._decoder.feed(data_chunk):
+                data_chunk = b""
+                while not data_chunk:  # empty on timeout
+                    data_chunk = bytes(self.device.read(64 + 1, timeout_ms=1000))
+
+    def _recv_from_reader(self, reader: HIDReader) -> None:
+        deadline: Optional[float] = (
+            time.monotonic() + self.timeout if self.timeout is not None else None
+        )
+
+        def remaining() -> Optional[float]:
+            return deadline - time.monotonic() if deadline is not None else None
+
+        with tracing.span("hid.recv.wait"):
+            report: bytes = reader.get(remaining())
+            while not HID._first_report(report):
+                report = reader.get(remaining())
+
+        with tracing.span("hid.recv.reassembly"):
+            while not self._decoder.feed(report):
+                report = reader.get(remaining())
+
+    def exchange(self, data: BytesLike) -> Tuple[int, bytes]:
         """Exchange (send + receive) with `self.device`.
 
         Parameters
         ----------
-        data : bytes
+        data : Union[bytes, bytearray, memoryview]
             Bytes with `data` to send.
 
         Returns
@@ -243,5 +388,7 @@ class HID(Comm):
 
         """
         if self.__opened:
+            if self.reader is not None:
+                self.reader.stop()
             self.device.close()
             self.__opened = False
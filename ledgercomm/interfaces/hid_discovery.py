@@ -0,0 +1,411 @@
+"""ledgercomm.interfaces.hid_discovery module.
+
+Cached discovery of Ledger HID devices.
+
+`hid.enumerate()` walks every USB device of the host, which is slow on
+hosts with many of them. `HIDDiscovery` keeps the devices of one vendor
+ID in cache, refreshed when older than `max_age` or continuously by a
+watcher thread, which also notifies subscribers when devices arrive or
+leave. The watcher polls `hid.enumerate()` every `interval` seconds, or
+waits for hidraw events of udev on Linux if pyudev is installed.
+"""
+
+import sys
+import threading
+import time
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Literal, Mapping, NamedTuple, Optional
+
+from ledgercomm.interfaces import hid_device
+from ledgercomm.interfaces.hid_device import (
+    DEFAULT_VENDOR_ID,
+    MACOS_USAGE_PAGE,
+    CannotFindDeviceError,
+    HIDAPINotInstalledError,
+)
+from ledgercomm.log import LOG
+
+Backend = Literal["auto", "poll", "udev"]
+
+
+class DeviceEvent(NamedTuple):
+    """Arrival or departure of a Ledger HID device.
+
+    Attributes
+    ----------
+    kind : str
+        Either "added" or "removed".
+    path : bytes
+        Path of the HID device.
+    info : Mapping[str, Any]
+        Entry of the device returned by `hid.enumerate()`.
+
+    """
+
+    kind: str
+    path: bytes
+    info: Mapping[str, Any]
+
+
+def is_ledger_interface(info: Mapping[str, Any]) -> bool:
+    """Whether the HID interface `info` is the one to exchange APDUs with."""
+    return (
+        info.get("interface_number") == 0
+        or
+        # MacOS specific
+        info.get("usage_page") == MACOS_USAGE_PAGE
+    )
+
+
+class HIDDiscovery:
+    """HIDDiscovery class, cache of HID devices refreshed in background.
+
+    Parameters
+    ----------
+    vendor_id : int
+        Vendor ID of the devices. Default to Ledger Vendor ID 0x2C97.
+    max_age : float
+        Age in seconds after which the cache is refreshed when read, if
+        the watcher isn't running.
+    interval : float
+        Period in seconds of the refreshes of the watcher.
+    backend : str
+        How the watcher detects changes: "poll" refreshes every `interval`,
+        "udev" refreshes on hidraw events (and every `interval` anyway),
+        "auto" uses udev if available.
+    hid_module : Optional[ModuleType]
+        Module providing `enumerate(vendor_id, product_id)`, hidapi if None.
+
+    Attributes
+    ----------
+    vendor_id : int
+        Vendor ID of the devices.
+    max_age : float
+        Age in seconds after which the cache is refreshed when read.
+    interval : float
+        Period in seconds of the refreshes of the watcher.
+    backend : str
+        How the watcher detects changes.
+    enumerations : int
+        Number of calls to `hid.enumerate()`.
+
+    Examples
+    --------
+    >>> discovery = HIDDiscovery()
+    >>> discovery.subscribe(lambda event: print(event.kind, event.path))
+    >>> discovery.start()
+    >>> path = discovery.wait_for_device(timeout=30)
+
+    """
+
+    def __init__(
+        self,
+        vendor_id: int = DEFAULT_VENDOR_ID,
+        max_age: float = 2.0,
+        interval: float = 1.0,
+        backend: Backend = "auto",
+        hid_module: Optional[ModuleType] = None,
+    ) -> None:
+        """Init constructor of HIDDiscovery."""
+        if backend not in ("auto", "poll", "udev"):
+            raise ValueError(f"Unknown backend '{backend}'!")
+
+        self.vendor_id: int = vendor_id
+        self.max_age: float = max_age
+        self.interval: float = interval
+        self.backend: Backend = backend
+        self.enumerations: int = 0
+        self._hid: Optional[ModuleType] = hid_module
+        # devices by path, in the order of `hid.enumerate()`
+        self._devices: Dict[bytes, Mapping[str, Any]] = {}
+        self._refreshed_at: Optional[float] = None
+        self._subscribers: List[Callable[[DeviceEvent], Any]] = []
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        # refreshes are serialized so that events are in order
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "HIDDiscovery":
+        """Start the watcher when entering `with` block."""
+        self.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        """Stop the watcher when leaving `with` block."""
+        self.stop()
+
+    @property
+    def watching(self) -> bool:
+        """Whether the watcher keeps the cache up to date."""
+        return self._watcher is not None and self._watcher.is_alive()
+
+    def _enumerate(self) -> List[Mapping[str, Any]]:
+        module: Optional[ModuleType] = self._hid if self._hid is not None else hid_device.hid
+        if module is None:
+            raise HIDAPINotInstalledError()
+
+        self.enumerations += 1
+
+        return list(module.enumerate(self.vendor_id, 0))
+
+    def refresh(self) -> List[DeviceEvent]:
+        """Enumerate devices now and notify subscribers of changes.
+
+        Returns
+        -------
+        List[DeviceEvent]
+            Ledger devices which arrived or left since the last refresh.
+
+        """
+        with self._refresh_lock:
+            entries: List[Mapping[str, Any]] = self._enumerate()
+            LOG.debug("hid.enumerate(), devices: %s", entries)
+            devices: Dict[bytes, Mapping[str, Any]] = {info["path"]: info for info in entries}
+
+            with self._lock:
+                previous, self._devices = self._devices, devices
+                self._refreshed_at = time.monotonic()
+                events: List[DeviceEvent] = [
+                    DeviceEvent("removed", path, info)
+                    for path, info in previous.items()
+                    if path not in devices and is_ledger_interface(info)
+                ] + [
+                    DeviceEvent("added", path, info)
+                    for path, info in devices.items()
+                    if path not in previous and is_ledger_interface(info)
+                ]
+                if events:
+                    self._changed.notify_all()
+                subscribers = list(self._subscribers)
+
+            for event in events:
+                LOG.debug("HID device %s: %s", event.kind, event.path)
+                for callback in subscribers:
+                    try:
+                        callback(event)
+                    except Exception:  # pylint: disable=broad-except
+                        LOG.exception("HID discovery subscriber failed on %s", event)
+
+        return events
+
+    def entries(self, max_age: Optional[float] = None) -> List[Mapping[str, Any]]:
+        """Devices of `self.vendor_id` as returned by `hid.enumerate()`, from cache.
+
+        Parameters
+        ----------
+        max_age : Optional[float]
+            Refresh the cache if older than `max_age` seconds, `self.max_age`
+            if None. Ignored while the watcher is running, unless 0.
+
+        Returns
+        -------
+        List[Mapping[str, Any]]
+            Entries of every HID interface of the devices.
+
+        """
+        max_age = self.max_age if max_age is None else max_age
+
+        with self._lock:
+            refreshed_at: Optional[float] = self._refreshed_at
+            fresh: bool = refreshed_at is not None and (
+                (self.watching and max_age > 0) or time.monotonic() - refreshed_at < max_age
+            )
+            if fresh:
+                return list(self._devices.values())
+
+        self.refresh()
+
+        with self._lock:
+            return list(self._devices.values())
+
+    def paths(self, max_age: Optional[float] = None) -> List[bytes]:
+        """Paths of the Ledger devices connected, from cache.
+
+        Parameters
+        ----------
+        max_age : Optional[float]
+            Refresh the cache if older than `max_age` seconds, see `entries()`.
+
+        Returns
+        -------
+        List[bytes]
+            Paths of the HID interfaces to exchange APDUs with.
+
+        """
+        return [info["path"] for info in self.entries(max_age) if is_ledger_interface(info)]
+
+    def subscribe(self, callback: Callable[[DeviceEvent], Any], replay: bool = False) -> None:
+        """Call `callback` with each `DeviceEvent`, from the thread refreshing the cache.
+
+        Parameters
+        ----------
+        callback : Callable[[DeviceEvent], Any]
+            Function called when a device arrives or leaves.
+        replay : bool
+            Whether `callback` is first called with an "added" event for
+            each device already in cache.
+
+        Returns
+        -------
+        None
+
+        """
+        with self._refresh_lock:
+            with self._lock:
+                self._subscribers.append(callback)
+                devices = list(self._devices.items()) if replay else []
+
+            for path, info in devices:
+                if is_ledger_interface(info):
+                    callback(DeviceEvent("added", path, info))
+
+    def unsubscribe(self, callback: Callable[[DeviceEvent], Any]) -> None:
+        """Stop calling `callback`, if subscribed.
+
+        Returns
+        -------
+        None
+
+        """
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def wait_for_device(
+        self, timeout: Optional[float] = None, path: Optional[bytes] = None
+    ) -> bytes:
+        """Wait until a Ledger device, or the one at `path`, is connected.
+
+        Without watcher, devices are enumerated every `self.interval` seconds.
+
+        Parameters
+        ----------
+        timeout : Optional[float]
+            Maximum time to wait in seconds, None to wait forever.
+        path : Optional[bytes]
+            Path of the device to wait for, any Ledger device if None.
+
+        Returns
+        -------
+        bytes
+            Path of the device connected.
+
+        Raises
+        ------
+        CannotFindDeviceError
+            If no device is connected before `timeout`.
+
+        """
+        deadline: Optional[float] = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            paths: List[bytes] = self.paths()
+            if path is None and paths:
+                return paths[0]
+            if path is not None and path in paths:
+                return path
+
+            remaining: Optional[float] = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise CannotFindDeviceError(self.vendor_id)
+
+            wait: float = self.interval if remaining is None else min(self.interval, remaining)
+            if self.watching:
+                with self._changed:
+                    self._changed.wait(wait)
+            else:
+                time.sleep(wait)
+                self.refresh()
+
+    def _udev_monitor(self) -> Any:
+        if self.backend == "poll" or (
+            self.backend == "auto" and not sys.platform.startswith("linux")
+        ):
+            return None
+
+        try:
+            import pyudev  # pylint: disable=import-outside-toplevel
+        except ImportError:
+            if self.backend == "udev":
+                raise
+            return None
+
+        monitor = pyudev.Monitor.from_netlink(pyudev.Context())
+        monitor.filter_by(subsystem="hidraw")
+        monitor.start()
+
+        return monitor
+
+    def _watch(self, monitor: Any) -> None:
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception:  # pylint: disable=broad-except
+                LOG.exception("HID discovery refresh failed")
+
+            if monitor is None:
+                self._stop.wait(self.interval)
+            elif monitor.poll(timeout=self.interval) is not None:
+                # several events come at once when a device is plugged
+                while monitor.poll(timeout=0) is not None:
+                    pass
+
+    def start(self) -> None:
+        """Start the watcher thread, refreshing the cache until `stop()`.
+
+        Returns
+        -------
+        None
+
+        """
+        if self.watching:
+            return
+
+        monitor: Any = self._udev_monitor()
+        self._stop.clear()
+        self._watcher = threading.Thread(
+            target=self._watch, args=(monitor,), name="ledgercomm-hid-discovery", daemon=True
+        )
+        self._watcher.start()
+
+    def stop(self) -> None:
+        """Stop the watcher thread.
+
+        Returns
+        -------
+        None
+
+        """
+        self._stop.set()
+
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+
+_discoveries: Dict[int, HIDDiscovery] = {}
+_discoveries_lock = threading.Lock()
+
+
+def get_discovery(vendor_id: int = DEFAULT_VENDOR_ID) -> HIDDiscovery:
+    """Discovery of `vendor_id` devices shared in the process, used by `HID`.
+
+    Parameters
+    ----------
+    vendor_id : int
+        Vendor ID of the devices. Default to Ledger Vendor ID 0x2C97.
+
+    Returns
+    -------
+    HIDDiscovery
+        Shared discovery, start its watcher to keep it up to date.
+
+    """
+    with _discoveries_lock:
+        discovery: Optional[HIDDiscovery] = _discoveries.get(vendor_id)
+        if discovery is None:
+            discovery = _discoveries[vendor_id] = HIDDiscovery(vendor_id)
+
+    return discovery
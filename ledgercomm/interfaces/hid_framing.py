@@ -0,0 +1,225 @@
+"""ledgercomm.interfaces.hid_framing module.
+
+Framing of APDUs into HID reports, as done by Ledger devices. Each report
+of 64 bytes starts with a 5-byte header: channel (2 bytes), tag (1 byte)
+and sequence index (2 bytes). The first report then holds the length of
+the APDU (2 bytes) and the APDU is spread on as many reports as needed.
+
+This module doesn't depend on hidapi.
+"""
+
+from typing import Iterator, Optional, Tuple
+
+from ledgercomm.interfaces.comm import BytesLike
+
+HID_CHANNEL = 0x0101
+HID_TAG = 0x05
+HID_PACKET_SIZE = 64
+HID_HEADER_SIZE = 5
+
+
+class HIDFramingError(Exception):
+    """Custom error to be raised when a HID report is malformed or out of sequence."""
+
+
+class HIDFrameEncoder:
+    """HIDFrameEncoder class.
+
+    Split APDUs into HID reports written in a single preallocated buffer.
+
+    Parameters
+    ----------
+    channel : int
+        Channel of the HID reports (2 bytes).
+    packet_size : int
+        Size of a HID report, without report ID.
+    report_id : Optional[int]
+        Report ID (1 byte) prepended to each report if not None, as
+        expected by hidapi write.
+
+    """
+
+    def __init__(
+        self,
+        channel: int = HID_CHANNEL,
+        packet_size: int = HID_PACKET_SIZE,
+        report_id: Optional[int] = 0,
+    ) -> None:
+        """Init constructor of HIDFrameEncoder."""
+        prefix: bytes = bytes([report_id]) if report_id is not None else b""
+        self._report: bytearray = bytearray(
+            prefix + channel.to_bytes(2, byteorder="big") + bytes([HID_TAG])
+        ) + bytearray(packet_size - 3)
+        self._report_view: memoryview = memoryview(self._report)
+        # offset of the sequence index then of the payload in a report
+        self._seq_offset: int = len(prefix) + 3
+        self._data_offset: int = self._seq_offset + 2
+
+    def encode(self, *parts: BytesLike) -> Iterator[memoryview]:
+        """Yield the HID reports of the APDU made of `parts`.
+
+        Parameters
+        ----------
+        *parts : Union[bytes, bytearray, memoryview]
+            Consecutive parts of the APDU (e.g. header then command data).
+
+        Yields
+        ------
+        memoryview
+            Report to write, only valid until the next one is yielded. The
+            last report isn't padded.
+
+        """
+        data_len: int = sum(len(part) for part in parts)
+
+        if data_len > 0xFFFF:
+            raise HIDFramingError(f"APDU too long for HID framing: {data_len} bytes!")
+
+        report: bytearray = self._report
+        report_size: int = len(report)
+        offset: int = self._data_offset
+        seq_idx: int = 0
+        report[self._seq_offset : offset] = b"\x00\x00"
+
+        for part in (data_len.to_bytes(2, byteorder="big"), *parts):
+            view: memoryview = memoryview(part).cast("B")
+            while view:
+                size: int = min(len(view), report_size - offset)
+                report[offset : offset + size] = view[:size]
+                view = view[size:]
+                offset += size
+
+                if offset == report_size:
+                    yield self._report_view
+                    seq_idx += 1
+                    report[self._seq_offset : self._data_offset] = seq_idx.to_bytes(
+                        2, byteorder="big"
+                    )
+                    offset = self._data_offset
+
+        if offset > self._data_offset:
+            yield self._report_view[:offset]
+
+
+class HIDFrameDecoder:
+    """HIDFrameDecoder class.
+
+    Reassemble an APDU response from HID reports into a reusable buffer,
+    checking channel, tag and sequence index of each report.
+
+    Parameters
+    ----------
+    channel : int
+        Expected channel of the HID reports (2 bytes).
+    buffer_size : int
+        Initial size of the reassembly buffer, grown if a response doesn't fit.
+
+    Attributes
+    ----------
+    channel : int
+        Expected channel of the HID reports (2 bytes).
+
+    """
+
+    def __init__(self, channel: int = HID_CHANNEL, buffer_size: int = 1024) -> None:
+        """Init constructor of HIDFrameDecoder."""
+        self.channel: int = channel
+        self._header: bytes = channel.to_bytes(2, byteorder="big") + bytes([HID_TAG])
+        self._buffer: bytearray = bytearray(buffer_size)
+        self._view: memoryview = memoryview(self._buffer)
+        self._seq_idx: int = 0
+        self._data_len: int = -1
+        self._offset: int = 0
+
+    def reset(self) -> None:
+        """Forget the response being reassembled.
+
+        Returns
+        -------
+        None
+
+        """
+        self._seq_idx = 0
+        self._data_len = -1
+        self._offset = 0
+
+    @property
+    def complete(self) -> bool:
+        """Whether the whole response has been received."""
+        return self._offset == self._data_len
+
+    def feed(self, report: BytesLike) -> bool:
+        """Add the next HID `report` (without report ID) to the response.
+
+        Parameters
+        ----------
+        report : Union[bytes, bytearray, memoryview]
+            HID report read from the device.
+
+        Returns
+        -------
+        bool
+            Whether the whole response has been received.
+
+        """
+        view: memoryview = memoryview(report).cast("B")
+
+        if self.complete:
+            raise HIDFramingError("Response already complete, call reset() first!")
+
+        if len(view) < HID_HEADER_SIZE or view[:3] != self._header:
+            raise HIDFramingError(f"Unexpected HID report header: {view[:3].hex()}")
+
+        seq_idx: int = int.from_bytes(view[3:5], byteorder="big")
+        if seq_idx != self._seq_idx:
+            raise HIDFramingError(f"Unexpected sequence index {seq_idx}, expected {self._seq_idx}")
+        self._seq_idx += 1
+
+        payload: memoryview = view[HID_HEADER_SIZE:]
+
+        if self._data_len < 0:
+            if len(payload) < 2:
+                raise HIDFramingError("First HID report too short!")
+            self._data_len = int.from_bytes(payload[:2], byteorder="big")
+            payload = payload[2:]
+            if self._data_len > len(self._buffer):
+                self._buffer = bytearray(self._data_len)
+                self._view = memoryview(self._buffer)
+
+        size: int = min(len(payload), self._data_len - self._offset)
+        self._buffer[self._offset : self._offset + size] = payload[:size]
+        self._offset += size
+
+        return self.complete
+
+    def data(self) -> memoryview:
+        """Get the response reassembled.
+
+        Returns
+        -------
+        memoryview
+            View on the response, only valid until the next `reset()`.
+
+        """
+        if not self.complete:
+            raise HIDFramingError("Response is not complete!")
+
+        return self._view[: self._data_len]
+
+    def response(self) -> Tuple[int, bytes]:
+        """Split the response reassembled in status word and response data.
+
+        Returns
+        -------
+        Tuple[int, bytes]
+            A pair (sw, rdata) containing the status word and response data.
+
+        """
+        data: memoryview = self.data()
+
+        if len(data) < 2:
+            raise HIDFramingError("Response too short to contain a status word!")
+
+        sw: int = int.from_bytes(data[-2:], byteorder="big")
+
+        return sw, data[:-2].tobytes()
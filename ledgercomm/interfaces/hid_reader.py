@@ -0,0 +1,188 @@
+"""ledgercomm.interfaces.hid_reader module."""
+
+import collections
+import threading
+import time
+from typing import Any, Deque, Literal, Optional
+
+OverflowPolicy = Literal["block", "drop_oldest", "drop_newest"]
+
+
+class HIDReaderOverflowError(Exception):
+    """Custom error to be raised when HID reports have been dropped by `HIDReader`."""
+
+    def __init__(self, dropped: int):
+        """Init constructor of HIDReaderOverflowError."""
+        super().__init__(f"{dropped} HID report(s) dropped, reader queue is full")
+
+
+class HIDReader:
+    """HIDReader class.
+
+    Dedicated thread continuously draining HID reports of a device into
+    a bounded queue, so receiving a response only waits on that queue.
+
+    Parameters
+    ----------
+    device : hid.device
+        Opened HID device to read reports from.
+    queue_size : int
+        Maximum number of reports kept in the queue.
+    overflow : str
+        What to do when the queue is full: "block" stops reading the device
+        until there is room, "drop_oldest" and "drop_newest" drop a report.
+        Dropped reports are reported by the next `get()`.
+    poll_timeout_ms : int
+        Timeout of each read on the device, i.e. the maximum delay for the
+        thread to notice it has to stop.
+
+    Attributes
+    ----------
+    dropped : int
+        Number of reports dropped since the last `get()`.
+
+    """
+
+    def __init__(
+        self,
+        device: Any,
+        queue_size: int = 64,
+        overflow: OverflowPolicy = "block",
+        poll_timeout_ms: int = 100,
+    ) -> None:
+        """Init constructor of HIDReader."""
+        if overflow not in ("block", "drop_oldest", "drop_newest"):
+            raise ValueError(f"Unknown overflow policy '{overflow}'!")
+
+        self.device = device
+        self.queue_size: int = queue_size
+        self.overflow: OverflowPolicy = overflow
+        self.poll_timeout_ms: int = poll_timeout_ms
+        self.dropped: int = 0
+        self._reports: Deque[bytes] = collections.deque()
+        self._cond = threading.Condition()
+        self._error: Optional[BaseException] = None
+        self._running: bool = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the reader thread.
+
+        Returns
+        -------
+        None
+
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        with self._cond:
+            # nothing of a previous session is kept, even if its thread failed
+            self._reports.clear()
+            self._error = None
+            self.dropped = 0
+            self._running = True
+
+        self._thread = threading.Thread(target=self._run, name="ledgercomm-hid-reader")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the reader thread, wait for it to terminate and drop reports queued.
+
+        Returns
+        -------
+        None
+
+        """
+        if self._thread is not None:
+            with self._cond:
+                self._running = False
+                self._cond.notify_all()
+            self._thread.join()
+            self._thread = None
+
+        with self._cond:
+            self._reports.clear()
+            self._error = None
+            self.dropped = 0
+
+    def _run(self) -> None:
+        try:
+            while self._running:
+                report: bytes = bytes(self.device.read(64 + 1, timeout_ms=self.poll_timeout_ms))
+                if report:
+                    self._put(report)
+        except Exception as exc:  # pylint: disable=broad-except
+            with self._cond:
+                self._error = exc
+                self._cond.notify_all()
+
+    def _put(self, report: bytes) -> None:
+        with self._cond:
+            if len(self._reports) >= self.queue_size:
+                if self.overflow == "block":
+                    self._cond.wait_for(
+                        lambda: len(self._reports) < self.queue_size or not self._running
+                    )
+                    if not self._running:
+                        return
+                elif self.overflow == "drop_oldest":
+                    self._reports.popleft()
+                    self.dropped += 1
+                else:
+                    self.dropped += 1
+                    return
+            self._reports.append(report)
+            self._cond.notify_all()
+
+    def get(self, timeout: Optional[float] = None) -> bytes:
+        """Wait for the next HID report.
+
+        Parameters
+        ----------
+        timeout : Optional[float]
+            Maximum time to wait in seconds, None to wait forever.
+
+        Returns
+        -------
+        bytes
+            HID report read from the device (without report ID).
+
+        """
+        deadline: Optional[float] = time.monotonic() + timeout if timeout is not None else None
+
+        with self._cond:
+            if self.dropped:
+                dropped, self.dropped = self.dropped, 0
+                raise HIDReaderOverflowError(dropped)
+
+            while not self._reports:
+                if self._error is not None:
+                    raise self._error
+                if not self._running:
+                    raise ConnectionError("HID reader is stopped!")
+                remaining: Optional[float] = (
+                    deadline - time.monotonic() if deadline is not None else None
+                )
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError("No HID report received in time!")
+                self._cond.wait(remaining)
+
+            report: bytes = self._reports.popleft()
+            self._cond.notify_all()
+
+            return report
+
+    def clear(self) -> None:
+        """Drop all reports queued, e.g. leftovers of an aborted exchange.
+
+        Returns
+        -------
+        None
+
+        """
+        with self._cond:
+            self._reports.clear()
+            self.dropped = 0
+            self._cond.notify_all()
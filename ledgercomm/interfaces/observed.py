@@ -0,0 +1,137 @@
+"""ledgercomm.interfaces.observed module."""
+
+import collections
+import time
+from abc import abstractmethod
+from typing import Any, Callable, Deque, Sequence, Tuple, TypeVar
+
+from ledgercomm.interfaces.comm import BytesLike, Comm
+
+T = TypeVar("T")
+
+
+class ObservedComm(Comm):
+    """Abstract class observing exchanges of another interface.
+
+    APDUs sent are timestamped and `_observe()` is called with each of
+    them once its response is received, which also works with pipelining.
+    Subclasses are only used when observation is enabled, so an interface
+    which isn't observed pays nothing. An APDU is only accounted once the
+    observed interface sent it, all APDUs in flight are forgotten when it
+    raises `OSError` as their responses are lost, and any other error of a
+    receive forgets the oldest one.
+
+    Subclasses which only need the CLA and INS of APDUs set `whole_apdu`
+    to False, so APDUs sent in several parts (e.g. by `BulkEncoder`) are
+    neither joined nor copied.
+
+    Parameters
+    ----------
+    com : Comm
+        Communication interface to observe.
+
+    Attributes
+    ----------
+    com : Comm
+        Communication interface observed.
+
+    """
+
+    # whether `_observe()` needs the whole APDU, else only its first 2 bytes
+    whole_apdu: bool = True
+
+    def __init__(self, com: Comm) -> None:
+        """Init constructor of ObservedComm."""
+        self.com: Comm = com
+        self.pipelining = com.pipelining
+        # APDUs sent waiting for their response, with their size and the time they were sent
+        self._sent: Deque[Tuple[bytes, int, float]] = collections.deque()
+
+    @abstractmethod
+    def _observe(
+        self, apdu: bytes, size: int, sw: int, rdata: bytes, start: float, end: float
+    ) -> None:
+        """Observe an exchange of an APDU of `size` bytes.
+
+        `apdu` is only the first 2 bytes of the APDU if `whole_apdu` is
+        False, `start` and `end` are given by `time.perf_counter()`.
+        """
+        raise NotImplementedError
+
+    def _keep(self, parts: Sequence[BytesLike]) -> bytes:
+        """APDU given in `parts` as kept for `_observe()`."""
+        if self.whole_apdu:
+            return b"".join(parts)
+
+        head = bytearray()
+        for part in parts:
+            head += part[: 2 - len(head)]
+            if len(head) == 2:
+                break
+
+        return bytes(head)
+
+    def _forget_on_error(self, operation: Callable[..., T], *args: Any) -> T:
+        try:
+            return operation(*args)
+        except OSError:
+            self._sent.clear()
+            raise
+
+    def open(self) -> None:
+        """Open the observed interface."""
+        self.com.open()
+
+    def send(self, data: BytesLike) -> int:
+        """Send `data` through the observed interface."""
+        start: float = time.perf_counter()
+        sent: int = self._forget_on_error(self.com.send, data)
+        self._sent.append((self._keep((data,)), len(data), start))
+
+        return sent
+
+    def send_parts(self, *parts: BytesLike) -> int:
+        """Send one APDU given in several parts through the observed interface."""
+        start: float = time.perf_counter()
+        sent: int = self._forget_on_error(self.com.send_parts, *parts)
+        self._sent.append((self._keep(parts), sum(len(part) for part in parts), start))
+
+        return sent
+
+    def send_many(self, data: Sequence[BytesLike]) -> int:
+        """Send several APDUs through the observed interface."""
+        start: float = time.perf_counter()
+        sent: int = self._forget_on_error(self.com.send_many, data)
+        self._sent.extend((self._keep((apdu,)), len(apdu), start) for apdu in data)
+
+        return sent
+
+    def recv(self) -> Tuple[int, bytes]:
+        """Receive a response from the observed interface and observe the exchange."""
+        try:
+            sw, rdata = self._forget_on_error(self.com.recv)
+        except Exception:
+            # the response of the oldest APDU is consumed by the failed receive
+            if self._sent:
+                self._sent.popleft()
+            raise
+        end: float = time.perf_counter()
+
+        if self._sent:
+            apdu, size, start = self._sent.popleft()
+            self._observe(apdu, size, sw, rdata, start, end)
+
+        return sw, rdata
+
+    def exchange(self, data: BytesLike) -> Tuple[int, bytes]:
+        """Exchange `data` with the observed interface and observe it."""
+        start: float = time.perf_counter()
+        sw, rdata = self._forget_on_error(self.com.exchange, data)
+        self._observe(self._keep((data,)), len(data), sw, rdata, start, time.perf_counter())
+
+        return sw, rdata
+
+    def close(self) -> None:
+        """Close the observed interface."""
+        self._sent.clear()
+        self.com.close()
@@ -0,0 +1,183 @@
+"""ledgercomm.interfaces.registry module.
+
+Registry of the communication interfaces `Transport` can open by name.
+
+Interfaces are registered as "module:attribute" strings and only imported
+the first time they are used, so selecting "tcp" never imports hidapi.
+Third-party packages add their own `Comm` implementations with an entry
+point in the "ledgercomm.interfaces" group, e.g. in `setup.cfg`:
+
+    [options.entry_points]
+    ledgercomm.interfaces =
+        serial = my_package.serial_comm:SerialComm
+"""
+
+import importlib
+import threading
+from typing import Callable, Dict, List, Union
+
+from ledgercomm.interfaces.comm import Comm
+
+ENTRY_POINT_GROUP = "ledgercomm.interfaces"
+
+CommFactory = Callable[..., Comm]
+
+# interfaces shipped with ledgercomm
+BUILTIN_INTERFACES: Dict[str, str] = {
+    "hid": "ledgercomm.interfaces.hid_device:HID",
+    "tcp": "ledgercomm.interfaces.tcp_client:TCPClient",
+    "broker": "ledgercomm.interfaces.broker_client:BrokerClient",
+    "unix": "ledgercomm.interfaces.unix_socket:UnixClient",
+    "replay": "ledgercomm.interfaces.replay:ReplayComm",
+}
+
+_registry: Dict[str, Union[str, CommFactory]] = dict(BUILTIN_INTERFACES)
+_entry_points_loaded: bool = False
+_lock = threading.Lock()
+
+
+def _load(spec: str) -> CommFactory:
+    module_name, _, attribute = spec.partition(":")
+    obj = importlib.import_module(module_name)
+
+    for name in filter(None, attribute.split(".")):
+        obj = getattr(obj, name)
+
+    return obj  # type: ignore
+
+
+def _load_entry_points() -> None:
+    global _entry_points_loaded  # pylint: disable=global-statement
+
+    if _entry_points_loaded:
+        return
+
+    # imported here as it is slow to import and only needed for plugins
+    from importlib.metadata import entry_points  # pylint: disable=import-outside-toplevel
+
+    eps = entry_points()
+    group = (
+        eps.select(group=ENTRY_POINT_GROUP)  # type: ignore  # Python >= 3.10
+        if hasattr(eps, "select")
+        else eps.get(ENTRY_POINT_GROUP, [])  # type: ignore
+    )
+
+    with _lock:
+        for ep in group:
+            # interfaces registered explicitly take precedence
+            _registry.setdefault(ep.name.lower(), ep.value)
+        _entry_points_loaded = True
+
+
+def register_interface(name: str, factory: Union[str, CommFactory], replace: bool = False) -> None:
+    """Register the communication interface `name`.
+
+    Parameters
+    ----------
+    name : str
+        Name of the interface, case insensitive, as given to `Transport(interface=...)`.
+    factory : Union[str, Callable[..., Comm]]
+        `Comm` subclass or function returning a `Comm`, called with the
+        extra keyword arguments of `Transport`, or its "module:attribute"
+        path to import it on first use.
+    replace : bool
+        Whether an interface already registered as `name` can be replaced.
+
+    Returns
+    -------
+    None
+
+    Raises
+    ------
+    ValueError
+        If `name` is already registered and `replace` is False.
+
+    Examples
+    --------
+    >>> register_interface("serial", "my_package.serial_comm:SerialComm")
+    >>> transport = Transport(interface="serial", device="/dev/ttyACM0")
+
+    """
+    with _lock:
+        if not replace and name.lower() in _registry:
+            raise ValueError(f"Interface '{name}' is already registered!")
+        _registry[name.lower()] = factory
+
+
+def unregister_interface(name: str) -> None:
+    """Remove the communication interface `name` from the registry.
+
+    Parameters
+    ----------
+    name : str
+        Name of the interface, case insensitive.
+
+    Returns
+    -------
+    None
+
+    Raises
+    ------
+    KeyError
+        If no interface is registered as `name`.
+
+    """
+    with _lock:
+        try:
+            del _registry[name.lower()]
+        except KeyError as exc:
+            raise KeyError(f"Unknown interface '{name}'!") from exc
+
+
+def get_interface(name: str) -> CommFactory:
+    """Factory of the communication interface `name`, imported if needed.
+
+    Entry points are only looked up if `name` isn't registered yet.
+
+    Parameters
+    ----------
+    name : str
+        Name of the interface, case insensitive.
+
+    Returns
+    -------
+    Callable[..., Comm]
+        `Comm` subclass or function returning a `Comm`.
+
+    Raises
+    ------
+    KeyError
+        If no interface is registered as `name`.
+
+    """
+    key: str = name.lower()
+
+    if key not in _registry:
+        _load_entry_points()
+
+    try:
+        factory: Union[str, CommFactory] = _registry[key]
+    except KeyError as exc:
+        raise KeyError(f"Unknown interface '{name}'!") from exc
+
+    if isinstance(factory, str):
+        factory = _load(factory)
+        with _lock:
+            _registry[key] = factory
+
+    return factory
+
+
+def available_interfaces() -> List[str]:
+    """Names of the communication interfaces registered, entry points included.
+
+    Returns
+    -------
+    List[str]
+        Sorted names of interfaces, none of them is imported.
+
+    """
+    _load_entry_points()
+
+    with _lock:
+        return sorted(_registry)
@@ -0,0 +1,167 @@
+"""ledgercomm.interfaces.replay module."""
+
+import collections
+import time
+from pathlib import Path
+from typing import Deque, Literal, Optional, Tuple, Union
+
+from ledgercomm.capture import Capture, CaptureRecord
+from ledgercomm.interfaces.comm import BytesLike, Comm
+from ledgercomm.log import LOG
+
+
+class ReplayMismatchError(Exception):
+    """Custom error to be raised when an APDU doesn't match the capture replayed."""
+
+
+class ReplayComm(Comm):
+    """ReplayComm class, serving responses recorded in a capture.
+
+    APDUs must be sent in the order they were recorded and are answered
+    with the recorded responses, without device. It is selected with
+    `Transport(interface="replay", capture=...)`.
+
+    Parameters
+    ----------
+    capture : Union[str, Path, Capture]
+        Capture file (or already opened capture) to replay.
+    timing : str
+        Either "fast" to answer as fast as possible or "original" to
+        answer with the delays of the recording.
+    strict : bool
+        Whether an APDU different from the recorded one raises
+        `ReplayMismatchError` instead of being answered anyway.
+
+    Attributes
+    ----------
+    capture : Capture
+        Capture replayed.
+    timing : str
+        Either "fast" or "original".
+    strict : bool
+        Whether APDUs must match the recorded ones.
+    position : int
+        Index of the next exchange to replay.
+
+    """
+
+    pipelining = True
+
+    def __init__(
+        self,
+        capture: Union[str, Path, Capture],
+        timing: Literal["fast", "original"] = "fast",
+        strict: bool = True,
+    ) -> None:
+        """Init constructor of ReplayComm."""
+        if timing not in ("fast", "original"):
+            raise ValueError(f"Unknown timing '{timing}'!")
+
+        self.capture: Capture = capture if isinstance(capture, Capture) else Capture(capture)
+        self.timing: str = timing
+        self.strict: bool = strict
+        self.position: int = 0
+        self._pending: Deque[CaptureRecord] = collections.deque()
+        # time.monotonic() matching the start of the first exchange replayed
+        self._origin: Optional[float] = None
+
+    def open(self) -> None:
+        """Rewind to the first exchange of the capture.
+
+        Returns
+        -------
+        None
+
+        """
+        self.position = 0
+        self._pending.clear()
+        self._origin = None
+
+    def send(self, data: BytesLike) -> int:
+        """Match `data` with the next exchange of the capture.
+
+        Parameters
+        ----------
+        data : Union[bytes, bytearray, memoryview]
+            APDU sent.
+
+        Returns
+        -------
+        int
+            Length of `data`.
+
+        """
+        if self.position >= len(self.capture):
+            raise ReplayMismatchError(
+                f"No more exchanges in {self.capture.path} for APDU {bytes(data).hex()}"
+            )
+
+        record: CaptureRecord = self.capture[self.position]
+
+        if record.apdu != data:
+            if self.strict:
+                raise ReplayMismatchError(
+                    f"APDU {bytes(data).hex()} doesn't match exchange #{self.position} "
+                    f"of {self.capture.path}: {record.apdu.hex()}"
+                )
+            LOG.warning("Replayed APDU %s instead of %s", bytes(data).hex(), record.apdu.hex())
+
+        if self._origin is None:
+            self._origin = time.monotonic() - record.start
+
+        self.position += 1
+        self._pending.append(record)
+
+        return len(data)
+
+    def recv(self) -> Tuple[int, bytes]:
+        """Receive the recorded response of the oldest APDU sent.
+
+        Returns
+        -------
+        Tuple[int, bytes]
+            A pair (sw, rdata) for the status word (2 bytes represented
+            as int) and the response data (variable length).
+
+        """
+        if not self._pending:
+            raise ReplayMismatchError("No APDU sent to receive a response for!")
+
+        record: CaptureRecord = self._pending.popleft()
+
+        if self.timing == "original" and self._origin is not None:
+            delay: float = self._origin + record.start + record.duration - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+        return record.sw, record.rdata
+
+    def exchange(self, data: BytesLike) -> Tuple[int, bytes]:
+        """Send `data` and receive its recorded response.
+
+        Parameters
+        ----------
+        data : Union[bytes, bytearray, memoryview]
+            APDU sent.
+
+        Returns
+        -------
+        Tuple[int, bytes]
+            A pair (sw, rdata) for the status word (2 bytes represented
+            as int) and the response data (variable length).
+
+        """
+        self.send(data)
+
+        return self.recv()
+
+    def close(self) -> None:
+        """Close the capture.
+
+        Returns
+        -------
+        None
+
+        """
+        self._pending.clear()
+        self.capture.close()
@@ -1,11 +1,17 @@
 """ledgercomm.interfaces.tcp_client module."""
 
+import logging
 import socket
-from typing import Tuple
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
 
-from ledgercomm.interfaces.comm import Comm
+from ledgercomm import tracing
+from ledgercomm.history import HISTORY
+from ledgercomm.interfaces.comm import BytesLike, Comm
 from ledgercomm.log import LOG
 
+# maximum number of buffers given to a single sendmsg() call
+IOV_MAX = 1024
+
 
 class TCPClient(Comm):
     """TCPClient class.
@@ -18,6 +24,10 @@ class TCPClient(Comm):
         IP address of the TCP server.
     port : int
         Port of the TCP server.
+    buffer_size : int
+        Initial size in bytes of the receive buffer, grown if a response doesn't fit.
+    timeout : Optional[float]
+        Timeout in seconds of socket operations, None to block forever.
 
     Attributes
     ----------
@@ -27,17 +37,91 @@ class TCPClient(Comm):
         Port of the TCP server.
     socket : socket.socket
         TCP socket to communicate with the server.
+    buffer_size : int
+        Current size in bytes of the receive buffer.
     __opened : bool
         Whether the TCP socket is opened or not.
 
     """
 
-    def __init__(self, server: str, port: int) -> None:
+    pipelining: bool = True
+    family: int = socket.AF_INET
+
+    def __init__(
+        self, server: str, port: int, buffer_size: int = 4096, timeout: Optional[float] = None
+    ) -> None:
         """Init constructor of TCPClient."""
         self.server: str = server
         self.port: int = port
-        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket = socket.socket(self.family, socket.SOCK_STREAM)
+        self.socket.settimeout(timeout)
         self.__opened: bool = False
+        self._buffer: bytearray = bytearray(buffer_size)
+        self._view: memoryview = memoryview(self._buffer)
+        # received bytes not consumed yet are in self._buffer[self._start : self._end]
+        self._start: int = 0
+        self._end: int = 0
+        # history entries of recv_view() still holding a view on self._buffer
+        self._lent: List[List[BytesLike]] = []
+
+    @property
+    def buffer_size(self) -> int:
+        """Size in bytes of the receive buffer."""
+        return len(self._buffer)
+
+    @buffer_size.setter
+    def buffer_size(self, size: int) -> None:
+        self._resize(size)
+
+    def _resize(self, size: int) -> None:
+        pending: int = self._end - self._start
+
+        if size < pending:
+            raise ValueError(f"Buffer size {size} is too small for {pending} pending bytes!")
+
+        # a new buffer is allocated since memoryview returned by recv_view()
+        # are still exported on the current one
+        buffer: bytearray = bytearray(size)
+        buffer[:pending] = self._view[self._start : self._end]
+        self._buffer, self._view = buffer, memoryview(buffer)
+        self._start, self._end = 0, pending
+
+    def _read_exact(self, size: int) -> memoryview:
+        """Read exactly `size` bytes from `self.socket`, looping on short reads.
+
+        The returned view is only valid until the next read.
+
+        """
+        if self._end - self._start < size:
+            self._copy_lent()
+
+            if self._start + size > len(self._buffer):
+                if size > len(self._buffer):
+                    self._resize(max(size, 2 * len(self._buffer)))
+                else:
+                    # move pending bytes at the beginning of the buffer
+                    pending: int = self._end - self._start
+                    self._view[:pending] = self._view[self._start : self._end]
+                    self._start, self._end = 0, pending
+
+            while self._end - self._start < size:
+                n: int = self.socket.recv_into(self._view[self._end :])
+                if n == 0:
+                    raise ConnectionError("Connection closed by the TCP server!")
+                self._end += n
+
+        view: memoryview = self._view[self._start : self._start + size]
+        self._start += size
+        if self._start == self._end:
+            self._start = self._end = 0
+
+        return view
+
+    def _copy_lent(self) -> None:
+        """Copy response data of the history still viewed on `self._buffer`, before writing it."""
+        for parts in self._lent:
+            parts[0] = bytes(parts[0])
+        self._lent.clear()
 
     def open(self) -> None:
         """Open connection to TCP socket with `self.server` and `self.port`.
@@ -48,15 +132,35 @@ class TCPClient(Comm):
 
         """
         if not self.__opened:
-            self.socket.connect((self.server, self.port))
+            self.socket.connect(self._address())
             self.__opened = True
 
-    def send(self, data: bytes) -> int:
+    def _address(self) -> Any:
+        """Address of the server for `socket.connect`."""
+        return (self.server, self.port)
+
+    def _send_all(self, buffers: List[memoryview]) -> None:
+        """Write all `buffers` with vectored IO, looping on partial writes."""
+        if not hasattr(self.socket, "sendmsg"):  # e.g. Windows
+            self.socket.sendall(b"".join(buffers))
+            return
+
+        i: int = 0
+        while i < len(buffers):
+            sent: int = self.socket.sendmsg(buffers[i : i + IOV_MAX])
+            # skip buffers fully written then trim the partially written one
+            while i < len(buffers) and sent >= len(buffers[i]):
+                sent -= len(buffers[i])
+                i += 1
+            if sent:
+                buffers[i] = buffers[i][sent:]
+
+    def send(self, data: BytesLike) -> int:
         """Send `data` through TCP socket `self.socket`.
 
         Parameters
         ----------
-        data : bytes
+        data : Union[bytes, bytearray, memoryview]
             Bytes of data to send.
 
         Returns
@@ -65,13 +169,107 @@ class TCPClient(Comm):
             Total length of data sent through TCP socket.
 
         """
-        if not data:
-            raise ValueError("Can't send empty data!")
+        return self.send_parts(data)
+
+    def send_parts(self, *parts: BytesLike) -> int:
+        """Send one APDU made of `parts` through TCP socket `self.socket`.
+
+        The length prefix and `parts` are written with vectored IO, without
+        being concatenated first.
+
+        Parameters
+        ----------
+        *parts : Union[bytes, bytearray, memoryview]
+            Consecutive parts of the APDU (e.g. header then command data).
+
+        Returns
+        -------
+        int
+            Total length of data sent through TCP socket.
+
+        """
+        return self._send_frames([parts])
+
+    def send_many(self, data: Sequence[BytesLike]) -> int:
+        """Send several APDUs back-to-back through TCP socket `self.socket`.
+
+        All length-prefixed frames are written with vectored IO, without
+        being concatenated first.
+
+        Parameters
+        ----------
+        data : Sequence[Union[bytes, bytearray, memoryview]]
+            APDUs to send, in order.
+
+        Returns
+        -------
+        int
+            Total length of data sent through TCP socket.
+
+        """
+        return self._send_frames((apdu,) for apdu in data)
+
+    def _send_frames(self, frames: Iterable[Sequence[BytesLike]]) -> int:
+        """Write each APDU of `frames`, given as a sequence of parts, with its length prefix."""
+        buffers: List[memoryview] = []
+        debug: bool = LOG.isEnabledFor(logging.DEBUG)
+
+        with tracing.span("tcp.frame"):
+            for parts in frames:
+                length: int = sum(len(part) for part in parts)
+
+                if not length:
+                    raise ValueError("Can't send empty data!")
+
+                HISTORY.sent(type(self).__name__, parts)
+
+                if debug:
+                    LOG.debug("=> %s", "".join(part.hex() for part in parts))
+
+                buffers.append(memoryview(int.to_bytes(length, 4, byteorder="big")))
+                buffers.extend(memoryview(part).cast("B") for part in parts if len(part))
+
+        total: int = sum(len(buffer) for buffer in buffers)
+
+        with tracing.span("tcp.write"):
+            self._send_all(buffers)
+
+        return total
 
-        LOG.debug("=> %s", data.hex())
-        data_len: bytes = int.to_bytes(len(data), 4, byteorder="big")
+    def _recv_frame(self) -> Tuple[int, memoryview]:
+        with tracing.span("tcp.recv.wait"):
+            length: int = int.from_bytes(self._read_exact(4), byteorder="big")
 
-        return self.socket.send(data_len + data)
+        with tracing.span("tcp.recv.body"):
+            frame: memoryview = self._read_exact(length + 2)
+
+        return int.from_bytes(frame[length:], byteorder="big"), frame[:length]
+
+    @staticmethod
+    def _log_received(sw: int, rdata: BytesLike) -> None:
+        if LOG.isEnabledFor(logging.DEBUG):
+            LOG.debug("<= %s %s", rdata.hex(), hex(sw)[2:])
+
+    def recv_view(self) -> Tuple[int, memoryview]:
+        """Receive data through TCP socket `self.socket` without copy.
+
+        Blocking IO.
+
+        Returns
+        -------
+        Tuple[int, memoryview]
+            A pair (sw, rdata) containing the status word and response data.
+            `rdata` is a view on the receive buffer, only valid until the
+            next call to `recv` or `recv_view`. It is recorded in `HISTORY`
+            as is, and only copied once the buffer is about to be written.
+
+        """
+        sw, rdata = self._recv_frame()
+
+        self._lent.append(HISTORY.received_view(type(self).__name__, sw, rdata))
+        self._log_received(sw, rdata)
+
+        return sw, rdata
 
     def recv(self) -> Tuple[int, bytes]:
         """Receive data through TCP socket `self.socket`.
@@ -84,20 +282,20 @@ class TCPClient(Comm):
             A pair (sw, rdata) containing the status word and response data.
 
         """
-        length: int = int.from_bytes(self.socket.recv(4), byteorder="big")
-        rdata: bytes = self.socket.recv(length)
-        sw: int = int.from_bytes(self.socket.recv(2), byteorder="big")
+        sw, view = self._recv_frame()
+        rdata: bytes = view.tobytes()
 
-        LOG.debug("<= %s %s", rdata.hex(), hex(sw)[2:])
+        HISTORY.received(type(self).__name__, sw, rdata)
+        self._log_received(sw, rdata)
 
         return sw, rdata
 
-    def exchange(self, data: bytes) -> Tuple[int, bytes]:
+    def exchange(self, data: BytesLike) -> Tuple[int, bytes]:
         """Exchange (send + receive) with `self.socket`.
 
         Parameters
         ----------
-        data : bytes
+        data : Union[bytes, bytearray, memoryview]
             Bytes with `data` to send.
 
         Returns
@@ -118,6 +316,6 @@ class TCPClient(Comm):
         None
 
         """
-        if self.__opened:
-            self.socket.close()
-            self.__opened = False
+        # closed even if not connected, e.g. after open() failed
+        self.socket.close()
+        self.__opened = False
@@ -0,0 +1,120 @@
+"""ledgercomm.interfaces.unix_socket module."""
+
+import os
+import socket
+import stat
+from typing import Any, Optional
+
+from ledgercomm.interfaces.tcp_client import TCPClient
+
+
+def remove_socket(path: str) -> bool:
+    """Remove the Unix socket at `path`, e.g. left by a server which crashed.
+
+    Parameters
+    ----------
+    path : str
+        Path of the Unix socket.
+
+    Returns
+    -------
+    bool
+        Whether a socket was removed, False if nothing exists at `path`.
+
+    Raises
+    ------
+    FileExistsError
+        If `path` exists but isn't a socket, which is never removed.
+
+    """
+    try:
+        mode: int = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return False
+
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(f"{path} exists and isn't a socket, refusing to remove it!")
+
+    os.unlink(path)
+
+    return True
+
+
+class UnixClient(TCPClient):
+    """UnixClient class.
+
+    Same protocol as `TCPClient` (4-byte length prefix) over a Unix
+    domain socket, which avoids the TCP loopback overhead for co-located
+    emulators, stand-in devices or brokers. It either connects to the
+    server listening on `path` or uses `sock`, an already connected
+    socket (e.g. one end of `socket.socketpair()`).
+
+    Parameters
+    ----------
+    path : Optional[str]
+        Path of the Unix socket of the server.
+    sock : Optional[socket.socket]
+        Connected socket to use instead of connecting to `path`.
+    buffer_size : int
+        Initial size in bytes of the receive buffer, grown if a response doesn't fit.
+    timeout : Optional[float]
+        Timeout in seconds of socket operations, None to block forever.
+
+    Attributes
+    ----------
+    path : Optional[str]
+        Path of the Unix socket of the server, None if `sock` is given.
+
+    """
+
+    family: int = getattr(socket, "AF_UNIX", -1)
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        sock: Optional[socket.socket] = None,
+        buffer_size: int = 4096,
+        timeout: Optional[float] = None,
+    ) -> None:
+        """Init constructor of UnixClient."""
+        if self.family == -1:
+            raise OSError("Unix sockets are not supported on this platform")
+
+        if (path is None) == (sock is None):
+            raise ValueError("Either 'path' or 'sock' must be given!")
+
+        super().__init__(server=path or "", port=0, buffer_size=buffer_size, timeout=timeout)
+        self.path: Optional[str] = path
+
+        if sock is not None:
+            self.socket.close()
+            self.socket = sock
+            self.socket.settimeout(timeout)
+
+    def _address(self) -> Any:
+        """Address of the server for `socket.connect`."""
+        return self.path
+
+    def open(self) -> None:
+        """Connect to `self.path`, nothing to do with an already connected socket.
+
+        Returns
+        -------
+        None
+
+        """
+        if self.path is not None:
+            super().open()
+
+    def close(self) -> None:
+        """Close the Unix socket.
+
+        Returns
+        -------
+        None
+
+        """
+        if self.path is not None:
+            super().close()
+        else:
+            self.socket.close()
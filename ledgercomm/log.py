@@ -1,5 +1,43 @@
 """ledgercomm.log module."""
 
 import logging
+import threading
+from typing import Optional
 
 LOG = logging.getLogger("ledgercomm")
+
+_console_handler: Optional[logging.Handler] = None
+_lock = threading.Lock()
+
+
+def enable_debug_logs() -> None:
+    """Set `LOG` level to DEBUG and print records on the console.
+
+    The console handler is added once per process, whatever the number
+    of calls (e.g. one per `Transport(debug=True)`).
+
+    Returns
+    -------
+    None
+
+    """
+    global _console_handler  # pylint: disable=global-statement
+
+    LOG.setLevel(logging.DEBUG)
+
+    with _lock:
+        if _console_handler is not None:
+            return
+
+        # create console handler and set level to debug
+        _console_handler = logging.StreamHandler()
+        _console_handler.setLevel(logging.DEBUG)
+
+        # create formatter
+        formatter = logging.Formatter("%(name)s - %(levelname)s - %(message)s")
+
+        # add formatter to handler
+        _console_handler.setFormatter(formatter)
+
+        # add handler to logger
+        LOG.addHandler(_console_handler)
@@ -0,0 +1,322 @@
+"""ledgercomm.metrics module."""
+
+import bisect
+import threading
+from abc import ABCMeta, abstractmethod
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from ledgercomm.interfaces.comm import Comm
+from ledgercomm.interfaces.observed import ObservedComm
+
+# upper bounds in seconds of latency histogram buckets, from fast TCP to slow user confirmation
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+class ExchangeSample(NamedTuple):
+    """Measures of one exchange.
+
+    Attributes
+    ----------
+    interface : str
+        Name of the interface, e.g. "hid" or "tcp".
+    cla : int
+        Instruction class of the APDU, -1 if the APDU is empty.
+    ins : int
+        Instruction code of the APDU, -1 if the APDU is shorter.
+    sw : int
+        Status word of the response.
+    duration : float
+        Time between sending the APDU and receiving its response, in seconds.
+    bytes_sent : int
+        Length of the APDU.
+    bytes_received : int
+        Length of the response, status word included.
+
+    """
+
+    interface: str
+    cla: int
+    ins: int
+    sw: int
+    duration: float
+    bytes_sent: int
+    bytes_received: int
+
+
+class MetricsSink(metaclass=ABCMeta):
+    """Abstract class for destinations of exchange metrics."""
+
+    @abstractmethod
+    def observe(self, sample: ExchangeSample) -> None:
+        """Collect the measures of one exchange."""
+        raise NotImplementedError
+
+
+class CallbackSink(MetricsSink):
+    """Sink calling `callback` with each `ExchangeSample`.
+
+    Parameters
+    ----------
+    callback : Callable[[ExchangeSample], Any]
+        Function called after each exchange, from the thread doing it.
+
+    """
+
+    def __init__(self, callback: Callable[[ExchangeSample], Any]) -> None:
+        """Init constructor of CallbackSink."""
+        self.callback: Callable[[ExchangeSample], Any] = callback
+
+    def observe(self, sample: ExchangeSample) -> None:
+        """Call `self.callback` with `sample`."""
+        self.callback(sample)
+
+
+class _Histogram:
+    """Latency histogram, counting exchanges in each bucket."""
+
+    __slots__ = ("counts", "count", "sum")
+
+    def __init__(self, size: int) -> None:
+        self.counts: List[int] = [0] * size  # last one for +Inf
+        self.count: int = 0
+        self.sum: float = 0.0
+
+
+class InMemorySink(MetricsSink):
+    """Sink aggregating counters and latency histograms in memory.
+
+    Exchanges are counted by interface, CLA, INS and status word, and
+    their latency is aggregated in histograms by interface, CLA and INS.
+
+    Parameters
+    ----------
+    buckets : Sequence[float]
+        Upper bounds in seconds of the latency histogram buckets.
+
+    Attributes
+    ----------
+    buckets : Tuple[float, ...]
+        Upper bounds in seconds of the latency histogram buckets.
+
+    Examples
+    --------
+    >>> metrics = InMemorySink()
+    >>> transport = Transport(interface="hid", metrics=metrics)
+    >>> sw, rdata = transport.exchange(cla=0xE0, ins=0x01)
+    >>> metrics.snapshot()["exchanges"]
+    {('hid', 224, 1, 36864): 1}
+
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        """Init constructor of InMemorySink."""
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets))
+        self._exchanges: Dict[Tuple[str, int, int, int], int] = {}
+        self._latencies: Dict[Tuple[str, int, int], _Histogram] = {}
+        self._bytes_sent: Dict[str, int] = {}
+        self._bytes_received: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, sample: ExchangeSample) -> None:
+        """Aggregate `sample`."""
+        interface, cla, ins, sw = sample.interface, sample.cla, sample.ins, sample.sw
+        bucket: int = bisect.bisect_left(self.buckets, sample.duration)
+
+        with self._lock:
+            key = (interface, cla, ins, sw)
+            self._exchanges[key] = self._exchanges.get(key, 0) + 1
+
+            histogram: Optional[_Histogram] = self._latencies.get(key[:3])
+            if histogram is None:
+                histogram = self._latencies[key[:3]] = _Histogram(len(self.buckets) + 1)
+            histogram.counts[bucket] += 1
+            histogram.count += 1
+            histogram.sum += sample.duration
+
+            self._bytes_sent[interface] = self._bytes_sent.get(interface, 0) + sample.bytes_sent
+            self._bytes_received[interface] = (
+                self._bytes_received.get(interface, 0) + sample.bytes_received
+            )
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Copy of the metrics.
+
+        Returns
+        -------
+        Dict[str, Any]
+            Number of exchanges by (interface, cla, ins, sw), latency
+            histograms by (interface, cla, ins) with the count of each
+            bucket (not cumulative, last one for +Inf), count and sum of
+            latencies, and bytes sent and received by interface.
+
+        """
+        with self._lock:
+            return {
+                "exchanges": dict(self._exchanges),
+                "latency": {
+                    key: {"buckets": list(h.counts), "count": h.count, "sum": h.sum}
+                    for key, h in self._latencies.items()
+                },
+                "bytes_sent": dict(self._bytes_sent),
+                "bytes_received": dict(self._bytes_received),
+            }
+
+    def reset(self) -> None:
+        """Clear all metrics.
+
+        Returns
+        -------
+        None
+
+        """
+        with self._lock:
+            self._exchanges.clear()
+            self._latencies.clear()
+            self._bytes_sent.clear()
+            self._bytes_received.clear()
+
+
+class PrometheusSink(InMemorySink):
+    """Sink aggregating metrics in memory, exported in Prometheus text format.
+
+    `render()` is meant to be served on the `/metrics` endpoint of an
+    application, e.g. by `prometheus_client` custom collectors or any
+    HTTP framework.
+
+    Parameters
+    ----------
+    buckets : Sequence[float]
+        Upper bounds in seconds of the latency histogram buckets.
+    prefix : str
+        Prefix of metric names.
+
+    """
+
+    def __init__(
+        self, buckets: Sequence[float] = DEFAULT_BUCKETS, prefix: str = "ledgercomm"
+    ) -> None:
+        """Init constructor of PrometheusSink."""
+        super().__init__(buckets)
+        self.prefix: str = prefix
+
+    @staticmethod
+    def _byte(value: int) -> str:
+        return f"0x{value:02x}" if value >= 0 else ""
+
+    def render(self) -> str:
+        """Export metrics in Prometheus text exposition format.
+
+        Returns
+        -------
+        str
+            Counters of exchanges, latency histograms and byte counters.
+
+        """
+        snapshot: Dict[str, Any] = self.snapshot()
+        p: str = self.prefix
+        lines: List[str] = [
+            f"# HELP {p}_exchanges_total Exchanges by interface, CLA, INS and status word.",
+            f"# TYPE {p}_exchanges_total counter",
+        ]
+
+        for (interface, cla, ins, sw), count in sorted(snapshot["exchanges"].items()):
+            lines.append(
+                f'{p}_exchanges_total{{interface="{interface}",cla="{self._byte(cla)}",'
+                f'ins="{self._byte(ins)}",sw="0x{sw:04x}"}} {count}'
+            )
+
+        lines += [
+            f"# HELP {p}_exchange_duration_seconds Latency of exchanges.",
+            f"# TYPE {p}_exchange_duration_seconds histogram",
+        ]
+
+        for (interface, cla, ins), histogram in sorted(snapshot["latency"].items()):
+            labels: str = f'interface="{interface}",cla="{self._byte(cla)}",ins="{self._byte(ins)}"'
+            cumulative: int = 0
+            for bound, count in zip(self.buckets + (float("inf"),), histogram["buckets"]):
+                cumulative += count
+                le: str = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(
+                    f'{p}_exchange_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}'
+                )
+            lines.append(f"{p}_exchange_duration_seconds_sum{{{labels}}} {histogram['sum']!r}")
+            lines.append(f"{p}_exchange_duration_seconds_count{{{labels}}} {histogram['count']}")
+
+        for name, description in (
+            ("bytes_sent", "Bytes of APDUs sent."),
+            ("bytes_received", "Bytes of responses received, status words included."),
+        ):
+            lines += [
+                f"# HELP {p}_{name}_total {description}",
+                f"# TYPE {p}_{name}_total counter",
+            ]
+            for interface, count in sorted(snapshot[name].items()):
+                lines.append(f'{p}_{name}_total{{interface="{interface}"}} {count}')
+
+        return "\n".join(lines) + "\n"
+
+
+class MeteredComm(ObservedComm):
+    """MeteredComm class, measuring exchanges of another interface.
+
+    Used by `Transport(metrics=...)`.
+
+    Parameters
+    ----------
+    com : Comm
+        Communication interface to measure.
+    sink : MetricsSink
+        Destination of the measures.
+    interface : str
+        Name of the interface in measures.
+
+    Attributes
+    ----------
+    com : Comm
+        Communication interface measured.
+    sink : MetricsSink
+        Destination of the measures.
+    interface : str
+        Name of the interface in measures.
+
+    """
+
+    # only CLA and INS are measured
+    whole_apdu = False
+
+    def __init__(self, com: Comm, sink: MetricsSink, interface: str) -> None:
+        """Init constructor of MeteredComm."""
+        super().__init__(com)
+        self.sink: MetricsSink = sink
+        self.interface: str = interface
+
+    def _observe(
+        self, apdu: bytes, size: int, sw: int, rdata: bytes, start: float, end: float
+    ) -> None:
+        self.sink.observe(
+            ExchangeSample(
+                self.interface,
+                apdu[0] if apdu else -1,
+                apdu[1] if len(apdu) > 1 else -1,
+                sw,
+                end - start,
+                size,
+                len(rdata) + 2,
+            )
+        )
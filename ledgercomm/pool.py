@@ -0,0 +1,347 @@
+"""ledgercomm.pool module."""
+
+import enum
+import itertools
+import threading
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    Hashable,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from ledgercomm.interfaces.comm import BytesLike
+from ledgercomm.interfaces.hid_device import DEFAULT_VENDOR_ID, HID
+from ledgercomm.interfaces.hid_discovery import DeviceEvent, HIDDiscovery
+from ledgercomm.log import LOG
+from ledgercomm.transport import Transport
+
+T = TypeVar("T")
+
+Strategy = Literal["round_robin", "least_loaded", "affinity"]
+
+
+class DevicePool:
+    """DevicePool class to dispatch work across several devices.
+
+    Each transport gets its own worker thread, so every device runs one
+    job at a time while all devices work in parallel. Jobs are assigned
+    to a device when submitted, according to `strategy`:
+
+    - "round_robin": devices are used in turn,
+    - "least_loaded": device with the fewest pending jobs,
+    - "affinity": jobs with the same `key` always go to the same device
+      (least loaded one for jobs without key).
+
+    Parameters
+    ----------
+    transports : Sequence[Transport]
+        Opened transports, one per device.
+    strategy : str
+        Either "round_robin", "least_loaded" or "affinity".
+
+    Attributes
+    ----------
+    transports : List[Transport]
+        Transports of the pool.
+    strategy : str
+        Scheduling strategy of the pool.
+
+    Examples
+    --------
+    >>> with DevicePool.from_hid(strategy="least_loaded") as pool:
+    ...     futures = [pool.exchange_raw("E001000000") for _ in range(100)]
+    ...     responses = [future.result() for future in futures]
+
+    """
+
+    def __init__(self, transports: Sequence[Transport], strategy: Strategy = "round_robin") -> None:
+        """Init constructor of DevicePool."""
+        if not transports:
+            raise ValueError("DevicePool needs at least one transport!")
+
+        if strategy not in ("round_robin", "least_loaded", "affinity"):
+            raise ValueError(f"Unknown strategy '{strategy}'!")
+
+        self.transports: List[Transport] = list(transports)
+        self.strategy: Strategy = strategy
+        self._executors: List[ThreadPoolExecutor] = [
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"ledgercomm-pool-{i}")
+            for i in range(len(self.transports))
+        ]
+        self._loads: List[int] = [0] * len(self.transports)
+        self._lock = threading.Lock()
+        self._next: Iterator[int] = itertools.cycle(range(len(self.transports)))
+        self._followed: List[Tuple[HIDDiscovery, Callable[[DeviceEvent], Any]]] = []
+        # HID paths of the devices in the pool, `transport.com` may be wrapped
+        self._paths: Set[bytes] = set()
+
+    @classmethod
+    def from_hid(
+        cls,
+        paths: Optional[Sequence[bytes]] = None,
+        vendor_id: int = DEFAULT_VENDOR_ID,
+        strategy: Strategy = "round_robin",
+        **kwargs: Any,
+    ) -> "DevicePool":
+        """Open a HID transport for each device path.
+
+        Parameters
+        ----------
+        paths : Optional[Sequence[bytes]]
+            Paths of the HID devices, all Ledger devices found if None.
+        vendor_id : int
+            Vendor ID of the devices. Default to Ledger Vendor ID 0x2C97.
+        strategy : str
+            Either "round_robin", "least_loaded" or "affinity".
+        **kwargs : Any
+            Extra keyword arguments of `Transport`.
+
+        Returns
+        -------
+        DevicePool
+            Pool with one transport per device.
+
+        """
+        if paths is None:
+            paths = HID.enumerate_devices(vendor_id)
+
+        transports: List[Transport] = []
+
+        try:
+            for path in paths:
+                transports.append(
+                    Transport(interface="hid", vendor_id=vendor_id, path=path, **kwargs)
+                )
+        except Exception:
+            for transport in transports:
+                transport.close()
+            raise
+
+        pool: "DevicePool" = cls(transports, strategy=strategy)
+        pool._paths.update(paths)
+
+        return pool
+
+    def add_transport(self, transport: Transport) -> int:
+        """Add the device of `transport` to the pool, with its own worker thread.
+
+        With the "affinity" strategy, keys may then go to another device.
+
+        Parameters
+        ----------
+        transport : Transport
+            Opened transport of the new device.
+
+        Returns
+        -------
+        int
+            Index of the device in the pool.
+
+        """
+        with self._lock:
+            index: int = len(self.transports)
+            self._executors.append(
+                ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"ledgercomm-pool-{index}")
+            )
+            self._loads.append(0)
+            self.transports.append(transport)
+            self._next = itertools.cycle(range(len(self.transports)))
+
+        return index
+
+    def follow(self, discovery: HIDDiscovery, **kwargs: Any) -> None:
+        """Add a HID transport to the pool for each device arriving in `discovery`.
+
+        Devices are added as soon as the watcher of `discovery` sees them,
+        until the pool is closed. Devices which leave stay in the pool and
+        their jobs fail. Devices opened by `from_hid` or already added by
+        `follow` are not added twice.
+
+        Parameters
+        ----------
+        discovery : HIDDiscovery
+            Discovery of the devices, whose watcher should be running.
+        **kwargs : Any
+            Extra keyword arguments of `Transport`.
+
+        Returns
+        -------
+        None
+
+        """
+
+        def on_event(event: DeviceEvent) -> None:
+            if event.kind != "added":
+                return
+
+            with self._lock:
+                if event.path in self._paths:
+                    return
+                # claimed before opening, so concurrent events don't open it twice
+                self._paths.add(event.path)
+
+            try:
+                transport = Transport(
+                    interface="hid", vendor_id=discovery.vendor_id, path=event.path, **kwargs
+                )
+            except Exception as exc:  # pylint: disable=broad-except
+                LOG.warning("Can't add HID device %s to the pool: %s", event.path, exc)
+                with self._lock:
+                    self._paths.discard(event.path)
+                return
+
+            self.add_transport(transport)
+
+        discovery.subscribe(on_event, replay=True)
+        self._followed.append((discovery, on_event))
+
+    def __enter__(self) -> "DevicePool":
+        """Enter `with` block."""
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        """Close the pool when leaving `with` block."""
+        self.close()
+
+    def __len__(self) -> int:
+        """Number of devices in the pool."""
+        return len(self.transports)
+
+    @property
+    def loads(self) -> List[int]:
+        """Number of pending jobs (queued or running) of each device."""
+        with self._lock:
+            return list(self._loads)
+
+    def _pick(self, key: Optional[Hashable]) -> int:
+        if self.strategy == "round_robin":
+            return next(self._next)
+
+        if self.strategy == "affinity" and key is not None:
+            # crc32 of the repr is stable across runs, unlike hash() of str
+            return zlib.crc32(repr(key).encode()) % len(self.transports)
+
+        return min(range(len(self._loads)), key=self._loads.__getitem__)
+
+    def _done(self, index: int) -> None:
+        with self._lock:
+            self._loads[index] -= 1
+
+    def submit(self, fn: Callable[[Transport], T], key: Optional[Hashable] = None) -> "Future[T]":
+        """Schedule `fn(transport)` on one of the devices.
+
+        Parameters
+        ----------
+        fn : Callable[[Transport], T]
+            Job to run, called with the transport of the device picked.
+        key : Optional[Hashable]
+            Affinity key, only used with the "affinity" strategy.
+
+        Returns
+        -------
+        Future[T]
+            Future of the result of `fn`.
+
+        """
+        with self._lock:
+            index: int = self._pick(key)
+            self._loads[index] += 1
+
+        transport: Transport = self.transports[index]
+
+        try:
+            future: "Future[T]" = self._executors[index].submit(fn, transport)
+        except Exception:
+            self._done(index)
+            raise
+
+        future.add_done_callback(lambda _: self._done(index))
+
+        return future
+
+    def exchange(
+        self,
+        cla: int,
+        ins: Union[int, enum.IntEnum],
+        p1: int = 0,
+        p2: int = 0,
+        option: Optional[int] = None,
+        cdata: BytesLike = b"",
+        key: Optional[Hashable] = None,
+    ) -> "Future[Tuple[int, bytes]]":
+        """Schedule `Transport.exchange` on one of the devices.
+
+        Parameters
+        ----------
+        cla : int
+            Instruction class: CLA (1 byte)
+        ins : Union[int, IntEnum]
+            Instruction code: INS (1 byte)
+        p1 : int
+            Instruction parameter: P1 (1 byte).
+        p2 : int
+            Instruction parameter: P2 (1 byte).
+        option : Optional[int]
+            Optional parameter: Opt (1 byte).
+        cdata : Union[bytes, bytearray, memoryview]
+            Command data (variable length).
+        key : Optional[Hashable]
+            Affinity key, only used with the "affinity" strategy.
+
+        Returns
+        -------
+        Future[Tuple[int, bytes]]
+            Future of the pair (sw, rdata).
+
+        """
+        return self.submit(
+            lambda transport: transport.exchange(cla, ins, p1, p2, option, cdata), key=key
+        )
+
+    def exchange_raw(
+        self, apdu: Union[str, BytesLike], key: Optional[Hashable] = None
+    ) -> "Future[Tuple[int, bytes]]":
+        """Schedule `Transport.exchange_raw` on one of the devices.
+
+        Parameters
+        ----------
+        apdu : Union[str, bytes, bytearray, memoryview]
+            Hexstring or bytes within APDU to send.
+        key : Optional[Hashable]
+            Affinity key, only used with the "affinity" strategy.
+
+        Returns
+        -------
+        Future[Tuple[int, bytes]]
+            Future of the pair (sw, rdata).
+
+        """
+        return self.submit(lambda transport: transport.exchange_raw(apdu), key=key)
+
+    def close(self) -> None:
+        """Wait for pending jobs then close all transports.
+
+        Returns
+        -------
+        None
+
+        """
+        for discovery, callback in self._followed:
+            discovery.unsubscribe(callback)
+
+        for executor in self._executors:
+            executor.shutdown(wait=True)
+
+        for transport in self.transports:
+            transport.close()
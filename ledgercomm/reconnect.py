@@ -0,0 +1,556 @@
+"""ledgercomm.reconnect module.
+
+Resilient interfaces surviving restarts of Speculos or unplugged devices.
+
+`ReconnectingComm` builds its interface with a factory and, when an
+operation fails with `OSError`, drops the broken connection and builds a
+new one in a background thread, waiting between attempts with jittered
+exponential backoff. APDUs in flight are sent again on the new connection
+only if all of them are registered as idempotent in the `ReconnectPolicy`,
+otherwise `ConnectionLostError` is raised as a device may have executed a
+command whose response is lost.
+"""
+
+import collections
+import enum
+import random
+import threading
+import time
+from typing import Any, Callable, Deque, Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from ledgercomm.interfaces.comm import BytesLike, Comm
+from ledgercomm.log import LOG
+
+
+class ConnectionLostError(ConnectionError):
+    """Custom error to be raised when APDUs in flight can't be recovered."""
+
+
+class ConnectionState(enum.Enum):
+    """State of the connection of a `ReconnectingComm`."""
+
+    DISCONNECTED = "disconnected"
+    CONNECTING = "connecting"
+    CONNECTED = "connected"
+    RECONNECTING = "reconnecting"
+    CLOSED = "closed"
+
+
+class ConnectionEvent(NamedTuple):
+    """Change of state of a `ReconnectingComm`.
+
+    Attributes
+    ----------
+    state : ConnectionState
+        New state of the connection.
+    attempts : int
+        Number of connection attempts made so far in this cycle.
+    error : Optional[BaseException]
+        Error which broke the connection, or of the last failed attempt.
+    downtime : float
+        Seconds without connection, when connected again.
+
+    """
+
+    state: ConnectionState
+    attempts: int
+    error: Optional[BaseException]
+    downtime: float
+
+
+class ReconnectPolicy:
+    """ReconnectPolicy class, how a `ReconnectingComm` reconnects and retries.
+
+    The delay before attempt n + 1 is `initial_delay * multiplier ** (n - 1)`
+    bounded by `max_delay`, of which a random part up to `jitter` is removed
+    so that clients of a restarted server don't reconnect all at once.
+    APDUs are retried only if their (CLA, INS) pair has been registered.
+
+    Parameters
+    ----------
+    initial_delay : float
+        Delay in seconds after the first failed attempt.
+    max_delay : float
+        Maximum delay in seconds between attempts.
+    multiplier : float
+        Growth factor of the delay after each failed attempt.
+    jitter : float
+        Fraction of the delay drawn at random, in [0, 1].
+    max_attempts : Optional[int]
+        Give up after this number of attempts, None to try forever.
+    retries : int
+        Maximum number of times APDUs of one operation are sent again.
+
+    Attributes
+    ----------
+    initial_delay : float
+        Delay in seconds after the first failed attempt.
+    max_delay : float
+        Maximum delay in seconds between attempts.
+    multiplier : float
+        Growth factor of the delay after each failed attempt.
+    jitter : float
+        Fraction of the delay drawn at random.
+    max_attempts : Optional[int]
+        Give up after this number of attempts.
+    retries : int
+        Maximum number of times APDUs of one operation are sent again.
+
+    Examples
+    --------
+    >>> policy = ReconnectPolicy(initial_delay=0.1, max_delay=5.0)
+    >>> policy.register(cla=0xE0, ins=0x01)  # get version
+    >>> transport = Transport(interface="tcp", reconnect=policy)
+
+    """
+
+    def __init__(
+        self,
+        initial_delay: float = 0.1,
+        max_delay: float = 10.0,
+        multiplier: float = 2.0,
+        jitter: float = 0.5,
+        max_attempts: Optional[int] = None,
+        retries: int = 2,
+    ) -> None:
+        """Init constructor of ReconnectPolicy."""
+        if not 0 <= jitter <= 1:
+            raise ValueError(f"Jitter must be between 0 and 1, not {jitter}!")
+
+        if max_attempts is not None and max_attempts < 1:
+            raise ValueError(f"Maximum attempts must be at least 1, not {max_attempts}!")
+
+        self.initial_delay: float = initial_delay
+        self.max_delay: float = max_delay
+        self.multiplier: float = multiplier
+        self.jitter: float = jitter
+        self.max_attempts: Optional[int] = max_attempts
+        self.retries: int = retries
+        self._commands: Set[Tuple[int, int]] = set()
+        self._lock = threading.Lock()
+
+    def register(self, cla: int, ins: int) -> None:
+        """Retry APDUs with `cla` and `ins` after a reconnection.
+
+        Returns
+        -------
+        None
+
+        """
+        with self._lock:
+            self._commands.add((cla, int(ins)))
+
+    def unregister(self, cla: int, ins: int) -> None:
+        """Stop retrying APDUs with `cla` and `ins`.
+
+        Returns
+        -------
+        None
+
+        """
+        with self._lock:
+            self._commands.discard((cla, int(ins)))
+
+    def retryable(self, apdu: BytesLike) -> bool:
+        """Whether `apdu` belongs to a registered command.
+
+        Parameters
+        ----------
+        apdu : Union[bytes, bytearray, memoryview]
+            Raw APDU.
+
+        Returns
+        -------
+        bool
+            True if `apdu` can be sent again on a new connection.
+
+        """
+        return len(apdu) >= 2 and (apdu[0], apdu[1]) in self._commands
+
+    def delay(self, attempt: int) -> float:
+        """Delay in seconds before the attempt following `attempt`.
+
+        Parameters
+        ----------
+        attempt : int
+            Number of the failed attempt, from 1.
+
+        Returns
+        -------
+        float
+            Jittered delay in seconds.
+
+        """
+        delay: float = min(self.max_delay, self.initial_delay * self.multiplier ** (attempt - 1))
+
+        return delay * (1 - self.jitter * random.random())
+
+
+class ReconnectingComm(Comm):
+    """ReconnectingComm class, interface reconnected when its connection breaks.
+
+    Used by `Transport(reconnect=...)`. A broken connection is detected by
+    the `OSError` of an operation (e.g. reset by the server, HID read error
+    or timeout); operations wait for the reconnection, which runs in a
+    background thread. Callbacks given to `subscribe()` are called with
+    each `ConnectionEvent`.
+
+    Parameters
+    ----------
+    factory : Callable[[], Comm]
+        Function returning a new interface, not opened yet.
+    policy : ReconnectPolicy
+        Backoff between attempts and APDUs which can be retried.
+
+    Attributes
+    ----------
+    policy : ReconnectPolicy
+        Backoff between attempts and APDUs which can be retried.
+    state : ConnectionState
+        Current state of the connection.
+    connections : int
+        Number of successful connections.
+    disconnections : int
+        Number of connections broken.
+    attempts : int
+        Number of connection attempts.
+    retries : int
+        Number of operations whose APDUs in flight were sent again.
+    failures : int
+        Number of `ConnectionLostError` raised.
+    downtime : float
+        Total seconds without connection since the first one, ongoing outage excluded.
+    last_downtime : float
+        Seconds without connection of the last outage.
+
+    """
+
+    def __init__(self, factory: Callable[[], Comm], policy: ReconnectPolicy) -> None:
+        """Init constructor of ReconnectingComm."""
+        self.policy: ReconnectPolicy = policy
+        self.state: ConnectionState = ConnectionState.DISCONNECTED
+        self.connections: int = 0
+        self.disconnections: int = 0
+        self.attempts: int = 0
+        self.retries: int = 0
+        self.failures: int = 0
+        self.downtime: float = 0.0
+        self.last_downtime: float = 0.0
+        self._factory: Callable[[], Comm] = factory
+        self._com: Optional[Comm] = None
+        self._error: Optional[BaseException] = None
+        self._down_since: Optional[float] = None
+        # raw APDUs waiting for their response, the first `_written` ones sent on `_com`
+        self._in_flight: Deque[bytes] = collections.deque()
+        self._written: int = 0
+        self._subscribers: List[Callable[[ConnectionEvent], Any]] = []
+        self._cond = threading.Condition()
+        self._closing = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(self, callback: Callable[[ConnectionEvent], Any]) -> None:
+        """Call `callback` with each `ConnectionEvent`.
+
+        Callbacks are called from the thread changing the state, mostly the
+        reconnection thread, and must not wait for the connection.
+
+        Returns
+        -------
+        None
+
+        """
+        with self._cond:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[ConnectionEvent], Any]) -> None:
+        """Stop calling `callback`, if subscribed.
+
+        Returns
+        -------
+        None
+
+        """
+        with self._cond:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def _transition(
+        self,
+        state: ConnectionState,
+        attempts: int = 0,
+        error: Optional[BaseException] = None,
+        downtime: float = 0.0,
+    ) -> Tuple[ConnectionEvent, List[Callable[[ConnectionEvent], Any]]]:
+        """Change state, with `self._cond` held, and return the event to notify."""
+        self.state = state
+        self._cond.notify_all()
+
+        return ConnectionEvent(state, attempts, error, downtime), list(self._subscribers)
+
+    @staticmethod
+    def _notify(
+        event: ConnectionEvent, subscribers: Sequence[Callable[[ConnectionEvent], Any]]
+    ) -> None:
+        LOG.debug("Connection %s", event.state.value)
+        for callback in subscribers:
+            try:
+                callback(event)
+            except Exception:  # pylint: disable=broad-except
+                LOG.exception("Connection subscriber failed on %s", event)
+
+    def _start(self) -> Tuple[ConnectionEvent, List[Callable[[ConnectionEvent], Any]]]:
+        """Start a reconnection cycle, with `self._cond` held."""
+        notification = self._transition(
+            ConnectionState.RECONNECTING if self.connections else ConnectionState.CONNECTING,
+            error=self._error,
+        )
+        self._thread = threading.Thread(
+            target=self._reconnect, name="ledgercomm-reconnect", daemon=True
+        )
+        self._thread.start()
+
+        return notification
+
+    def _reconnect(self) -> None:
+        attempts: int = 0
+        com: Optional[Comm] = None
+
+        while not self._closing.is_set():
+            attempts += 1
+            self.attempts += 1
+            com = None
+            try:
+                com = self._factory()
+                com.open()
+            except Exception as exc:  # pylint: disable=broad-except
+                # e.g. connection refused or device not found yet
+                LOG.debug("Connection attempt %d failed: %s", attempts, exc)
+                if com is not None:
+                    com.close()
+
+                if self.policy.max_attempts is not None and attempts >= self.policy.max_attempts:
+                    with self._cond:
+                        self._error = exc
+                        notification = self._transition(ConnectionState.DISCONNECTED, attempts, exc)
+                    LOG.warning("Giving up connection after %d attempts: %s", attempts, exc)
+                    self._notify(*notification)
+                    return
+
+                self._closing.wait(self.policy.delay(attempts))
+                continue
+
+            with self._cond:
+                if self._closing.is_set():
+                    break
+
+                downtime: float = 0.0
+                if self._down_since is not None:
+                    downtime = time.monotonic() - self._down_since
+                    self.downtime += downtime
+                    self.last_downtime = downtime
+                    self._down_since = None
+                    LOG.info("Reconnected after %.3f s and %d attempts", downtime, attempts)
+
+                self._com = com
+                self._written = 0
+                self._error = None
+                self.pipelining = com.pipelining
+                self.connections += 1
+                notification = self._transition(ConnectionState.CONNECTED, attempts, None, downtime)
+
+            self._notify(*notification)
+            return
+
+        if com is not None:
+            com.close()
+
+    def _acquire(self) -> Comm:
+        """Current interface, waiting for the connection if needed."""
+        waited: bool = False
+
+        while True:
+            with self._cond:
+                if self._com is not None:
+                    return self._com
+
+                if self.state == ConnectionState.CLOSED:
+                    raise ConnectionLostError("Connection is closed!")
+
+                notification = None
+                if self.state == ConnectionState.DISCONNECTED:
+                    if waited:
+                        # the cycle waited for gave up
+                        raise ConnectionLostError(f"Can't connect: {self._error}")
+                    notification = self._start()
+                else:
+                    self._cond.wait()
+                waited = True
+
+            if notification is not None:
+                self._notify(*notification)
+
+    def _lost(self, com: Comm, exc: BaseException) -> None:
+        """Drop the broken interface `com` and start reconnecting."""
+        notification = None
+
+        with self._cond:
+            if self._com is com:
+                LOG.warning("Connection lost: %s", exc)
+                self._com = None
+                self._error = exc
+                self._down_since = time.monotonic()
+                self.disconnections += 1
+                if not self._closing.is_set():
+                    notification = self._start()
+
+        try:
+            com.close()
+        except OSError:
+            pass
+
+        if notification is not None:
+            self._notify(*notification)
+
+    def _run(self, operation: Callable[[Comm], Any]) -> Any:
+        """Run `operation` on the interface, recovering APDUs in flight if allowed."""
+        retries: int = 0
+
+        while True:
+            com: Comm = self._acquire()
+            try:
+                return operation(com)
+            except OSError as exc:
+                self._lost(com, exc)
+                self._written = 0
+
+                if (
+                    retries < self.policy.retries
+                    and self._in_flight
+                    and all(self.policy.retryable(apdu) for apdu in self._in_flight)
+                ):
+                    retries += 1
+                    self.retries += 1
+                    continue
+
+                lost: int = len(self._in_flight)
+                self._in_flight.clear()
+                self.failures += 1
+
+                raise ConnectionLostError(
+                    f"Connection lost with {lost} APDU(s) in flight: {exc}"
+                ) from exc
+
+    def _flush(self, com: Comm) -> int:
+        """Send APDUs in flight not sent yet on `com`."""
+        if self._written == len(self._in_flight):
+            return 0
+
+        pending: List[bytes] = list(self._in_flight)[self._written :]
+        length: int = com.send(pending[0]) if len(pending) == 1 else com.send_many(pending)
+        self._written = len(self._in_flight)
+
+        return length
+
+    def _recv(self, com: Comm) -> Tuple[int, bytes]:
+        self._flush(com)
+        response: Tuple[int, bytes] = com.recv()
+
+        if self._in_flight:
+            self._in_flight.popleft()
+            self._written -= 1
+
+        return response
+
+    def open(self) -> None:
+        """Connect, waiting until connected or the policy gives up.
+
+        Returns
+        -------
+        None
+
+        Raises
+        ------
+        ConnectionLostError
+            If no connection could be made within `policy.max_attempts`.
+
+        """
+        self._acquire()
+
+    def send(self, data: BytesLike) -> int:
+        """Send `data` on the current connection."""
+        self._in_flight.append(bytes(data))
+        return self._run(self._flush)
+
+    def send_parts(self, *parts: BytesLike) -> int:
+        """Send one APDU given in several parts on the current connection."""
+        self._in_flight.append(b"".join(parts))
+        return self._run(self._flush)
+
+    def send_many(self, data: Sequence[BytesLike]) -> int:
+        """Send several APDUs on the current connection."""
+        self._in_flight.extend(bytes(apdu) for apdu in data)
+        return self._run(self._flush)
+
+    def recv(self) -> Tuple[int, bytes]:
+        """Receive the response of the oldest APDU in flight."""
+        return self._run(self._recv)
+
+    def exchange(self, data: BytesLike) -> Tuple[int, bytes]:
+        """Send `data` and receive its response."""
+        self.send(data)
+        return self.recv()
+
+    def stats(self) -> Dict[str, Any]:
+        """Statistics of the connection.
+
+        Returns
+        -------
+        Dict[str, Any]
+            State, counters and downtimes (in seconds, ongoing outage included).
+
+        """
+        with self._cond:
+            down_since: Optional[float] = self._down_since
+            ongoing: float = time.monotonic() - down_since if down_since is not None else 0.0
+
+            return {
+                "state": self.state.value,
+                "connections": self.connections,
+                "disconnections": self.disconnections,
+                "attempts": self.attempts,
+                "retries": self.retries,
+                "failures": self.failures,
+                "downtime": self.downtime + ongoing,
+                "last_downtime": ongoing if down_since is not None else self.last_downtime,
+            }
+
+    def close(self) -> None:
+        """Stop reconnecting and close the current connection.
+
+        Returns
+        -------
+        None
+
+        """
+        self._closing.set()
+
+        with self._cond:
+            com: Optional[Comm] = self._com
+            self._com = None
+            thread: Optional[threading.Thread] = self._thread
+            notification = (
+                self._transition(ConnectionState.CLOSED)
+                if self.state != ConnectionState.CLOSED
+                else None
+            )
+
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+        if com is not None:
+            com.close()
+
+        self._in_flight.clear()
+
+        if notification is not None:
+            self._notify(*notification)
@@ -0,0 +1,266 @@
+"""ledgercomm.scheduler module."""
+
+import enum
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar, Union
+
+from ledgercomm.interfaces.comm import BytesLike
+from ledgercomm.transport import Transport
+
+T = TypeVar("T")
+
+
+class Priority(enum.IntEnum):
+    """Priority of a job, lowest value first."""
+
+    INTERACTIVE = 0
+    NORMAL = 5
+    BULK = 10
+
+
+class DeadlineExpiredError(TimeoutError):
+    """Custom error to be raised when a job is dropped because its deadline expired."""
+
+    def __init__(self):
+        """Init constructor of DeadlineExpiredError."""
+        super().__init__("Deadline expired before the exchange could start")
+
+
+class _Job:
+    """Job queued in `ScheduledTransport`."""
+
+    def __init__(self, fn: Callable[[Transport], Any], deadline: Optional[float]) -> None:
+        self.fn = fn
+        self.deadline: Optional[float] = deadline
+        self.future: Future = Future()
+
+
+class ScheduledTransport:
+    """ScheduledTransport class to share a `Transport` between threads.
+
+    Jobs are run one at a time by a dedicated thread, so an exchange is
+    never interleaved with another one on the interface. The queue is
+    ordered by priority then by submission order: interactive requests
+    jump ahead of bulk jobs. A job whose deadline has expired when it
+    should start is dropped with `DeadlineExpiredError`.
+
+    Parameters
+    ----------
+    transport : Transport
+        Opened transport to share.
+
+    Attributes
+    ----------
+    transport : Transport
+        Shared transport.
+    executed : int
+        Number of jobs run.
+    expired : int
+        Number of jobs dropped because their deadline expired.
+    max_depth : int
+        Highest number of jobs queued at once.
+
+    Examples
+    --------
+    >>> scheduled = ScheduledTransport(Transport(interface="hid"))
+    >>> sw, rdata = scheduled.exchange(cla=0xE0, ins=0x01, priority=Priority.INTERACTIVE)
+    >>> future = scheduled.submit(lambda t: t.exchange_many(apdus), priority=Priority.BULK)
+
+    """
+
+    def __init__(self, transport: Transport) -> None:
+        """Init constructor of ScheduledTransport."""
+        self.transport: Transport = transport
+        self.executed: int = 0
+        self.expired: int = 0
+        self.max_depth: int = 0
+        self._queue: List[Tuple[int, int, _Job]] = []
+        self._depths: Dict[int, int] = {}
+        self._seq: Iterator[int] = itertools.count()
+        self._cond = threading.Condition()
+        self._closed: bool = False
+        self._thread = threading.Thread(target=self._run, name="ledgercomm-scheduler")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def __enter__(self) -> "ScheduledTransport":
+        """Enter `with` block."""
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        """Close the scheduler and its transport when leaving `with` block."""
+        self.close()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                priority, _, job = heapq.heappop(self._queue)
+                self._depths[priority] -= 1
+
+            if not job.future.set_running_or_notify_cancel():
+                continue
+
+            if job.deadline is not None and time.monotonic() > job.deadline:
+                self.expired += 1
+                job.future.set_exception(DeadlineExpiredError())
+                continue
+
+            try:
+                result = job.fn(self.transport)
+            except BaseException as exc:  # pylint: disable=broad-except
+                job.future.set_exception(exc)
+            else:
+                job.future.set_result(result)
+            finally:
+                self.executed += 1
+
+    def submit(
+        self,
+        fn: Callable[[Transport], T],
+        priority: int = Priority.NORMAL,
+        timeout: Optional[float] = None,
+    ) -> "Future[T]":
+        """Queue `fn(transport)` to run atomically on the shared transport.
+
+        Parameters
+        ----------
+        fn : Callable[[Transport], T]
+            Job to run, called with the shared transport.
+        priority : int
+            Priority of the job, lowest first (see `Priority`).
+        timeout : Optional[float]
+            Delay in seconds for the job to start before being dropped,
+            None to wait as long as needed.
+
+        Returns
+        -------
+        Future[T]
+            Future of the result of `fn`.
+
+        """
+        job = _Job(fn, time.monotonic() + timeout if timeout is not None else None)
+
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("ScheduledTransport is closed!")
+            heapq.heappush(self._queue, (int(priority), next(self._seq), job))
+            self._depths[int(priority)] = self._depths.get(int(priority), 0) + 1
+            self.max_depth = max(self.max_depth, len(self._queue))
+            self._cond.notify()
+
+        return job.future
+
+    def exchange(
+        self,
+        cla: int,
+        ins: Union[int, enum.IntEnum],
+        p1: int = 0,
+        p2: int = 0,
+        option: Optional[int] = None,
+        cdata: BytesLike = b"",
+        priority: int = Priority.NORMAL,
+        timeout: Optional[float] = None,
+    ) -> Tuple[int, bytes]:
+        """Send structured APDUs and wait to receive data, once scheduled.
+
+        Parameters
+        ----------
+        cla : int
+            Instruction class: CLA (1 byte)
+        ins : Union[int, IntEnum]
+            Instruction code: INS (1 byte)
+        p1 : int
+            Instruction parameter: P1 (1 byte).
+        p2 : int
+            Instruction parameter: P2 (1 byte).
+        option : Optional[int]
+            Optional parameter: Opt (1 byte).
+        cdata : Union[bytes, bytearray, memoryview]
+            Command data (variable length).
+        priority : int
+            Priority of the exchange, lowest first (see `Priority`).
+        timeout : Optional[float]
+            Delay in seconds for the exchange to start before being dropped.
+
+        Returns
+        -------
+        Tuple[int, bytes]
+            A pair (sw, rdata) for the status word (2 bytes represented
+            as int) and the response data (bytes of variable length).
+
+        """
+        return self.submit(
+            lambda transport: transport.exchange(cla, ins, p1, p2, option, cdata),
+            priority=priority,
+            timeout=timeout,
+        ).result()
+
+    def exchange_raw(
+        self,
+        apdu: Union[str, BytesLike],
+        priority: int = Priority.NORMAL,
+        timeout: Optional[float] = None,
+    ) -> Tuple[int, bytes]:
+        """Send raw bytes `apdu` and wait to receive data, once scheduled.
+
+        Parameters
+        ----------
+        apdu : Union[str, bytes, bytearray, memoryview]
+            Hexstring or bytes within APDU to send.
+        priority : int
+            Priority of the exchange, lowest first (see `Priority`).
+        timeout : Optional[float]
+            Delay in seconds for the exchange to start before being dropped.
+
+        Returns
+        -------
+        Tuple[int, bytes]
+            A pair (sw, rdata) for the status word (2 bytes represented
+            as int) and the response (bytes of variable length).
+
+        """
+        return self.submit(
+            lambda transport: transport.exchange_raw(apdu), priority=priority, timeout=timeout
+        ).result()
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue statistics.
+
+        Returns
+        -------
+        Dict[str, Any]
+            Current queue depth (total and by priority), highest depth,
+            number of jobs run and dropped.
+
+        """
+        with self._cond:
+            return {
+                "depth": len(self._queue),
+                "depth_by_priority": {p: n for p, n in self._depths.items() if n},
+                "max_depth": self.max_depth,
+                "executed": self.executed,
+                "expired": self.expired,
+            }
+
+    def close(self) -> None:
+        """Run the jobs already queued, then close the transport.
+
+        Returns
+        -------
+        None
+
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+
+        self._thread.join()
+        self.transport.close()
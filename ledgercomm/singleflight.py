@@ -0,0 +1,151 @@
+"""ledgercomm.singleflight module."""
+
+import threading
+from typing import Callable, Dict, Optional, Set, Tuple
+
+from ledgercomm.interfaces.comm import BytesLike
+
+
+class _Call:
+    """Exchange in flight, shared by its leader and followers."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.response: Optional[Tuple[int, bytes]] = None
+        self.error: Optional[BaseException] = None
+        self.followers: int = 0
+
+
+class SingleFlight:
+    """SingleFlight class, coalescing concurrent identical APDUs.
+
+    While an APDU of a registered (CLA, INS) pair is in flight, threads
+    asking for the same raw APDU wait for it and get its response (or
+    error) instead of sending it again.
+
+    Attributes
+    ----------
+    leaders : int
+        Number of APDUs actually exchanged.
+    followers : int
+        Number of APDUs answered with the response of an identical APDU in flight.
+
+    Examples
+    --------
+    >>> single_flight = SingleFlight()
+    >>> single_flight.register(cla=0xE0, ins=0x02)  # get public key
+    >>> transport = Transport(interface="hid", single_flight=single_flight)
+
+    """
+
+    def __init__(self) -> None:
+        """Init constructor of SingleFlight."""
+        self.leaders: int = 0
+        self.followers: int = 0
+        self._commands: Set[Tuple[int, int]] = set()
+        self._calls: Dict[bytes, _Call] = {}
+        self._lock = threading.Lock()
+
+    def register(self, cla: int, ins: int) -> None:
+        """Coalesce APDUs with `cla` and `ins`.
+
+        Returns
+        -------
+        None
+
+        """
+        with self._lock:
+            self._commands.add((cla, int(ins)))
+
+    def unregister(self, cla: int, ins: int) -> None:
+        """Stop coalescing APDUs with `cla` and `ins`.
+
+        Returns
+        -------
+        None
+
+        """
+        with self._lock:
+            self._commands.discard((cla, int(ins)))
+
+    def coalescable(self, apdu: BytesLike) -> bool:
+        """Whether `apdu` belongs to a registered command.
+
+        Parameters
+        ----------
+        apdu : Union[bytes, bytearray, memoryview]
+            Raw APDU.
+
+        Returns
+        -------
+        bool
+            True if identical `apdu` in flight are coalesced.
+
+        """
+        return len(apdu) >= 2 and (apdu[0], apdu[1]) in self._commands
+
+    def do(self, apdu: BytesLike, exchange: Callable[[], Tuple[int, bytes]]) -> Tuple[int, bytes]:
+        """Call `exchange` unless an identical `apdu` is in flight.
+
+        Parameters
+        ----------
+        apdu : Union[bytes, bytearray, memoryview]
+            Raw APDU, key of the exchange.
+        exchange : Callable[[], Tuple[int, bytes]]
+            Actually exchange `apdu`.
+
+        Returns
+        -------
+        Tuple[int, bytes]
+            The pair (sw, rdata), shared by all callers of the same flight.
+
+        """
+        key: bytes = bytes(apdu)
+
+        with self._lock:
+            call: Optional[_Call] = self._calls.get(key)
+            leader: bool = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                call.followers += 1
+                self.followers += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            assert call.response is not None
+            return call.response
+
+        try:
+            call.response = exchange()
+            return call.response
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    @property
+    def in_flight(self) -> int:
+        """Number of distinct APDUs in flight."""
+        return len(self._calls)
+
+    def stats(self) -> Dict[str, int]:
+        """Coalescing counters.
+
+        Returns
+        -------
+        Dict[str, int]
+            Leaders, followers and distinct APDUs currently in flight.
+
+        """
+        return {
+            "leaders": self.leaders,
+            "followers": self.followers,
+            "in_flight": self.in_flight,
+        }
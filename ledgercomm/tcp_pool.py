@@ -0,0 +1,392 @@
+"""ledgercomm.tcp_pool module."""
+
+import enum
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar, Union
+
+from ledgercomm.interfaces.comm import BytesLike
+from ledgercomm.interfaces.tcp_client import TCPClient
+from ledgercomm.log import LOG
+from ledgercomm.transport import Transport
+
+T = TypeVar("T")
+
+
+class NoHealthyEndpointError(ConnectionError):
+    """Custom error to be raised when every endpoint of a `TCPPool` is ejected."""
+
+    def __init__(self):
+        """Init constructor of NoHealthyEndpointError."""
+        super().__init__("No healthy TCP endpoint available!")
+
+
+class Endpoint:
+    """Endpoint class, a TCP server of a `TCPPool` with its connection and statistics.
+
+    Parameters
+    ----------
+    server : str
+        IP address of the TCP server.
+    port : int
+        Port of the TCP server.
+
+    Attributes
+    ----------
+    server : str
+        IP address of the TCP server.
+    port : int
+        Port of the TCP server.
+    client : Optional[TCPClient]
+        Persistent connection, None while ejected.
+    ejected_at : Optional[float]
+        Monotonic time of the ejection, None if healthy.
+    exchanges : int
+        Number of successful exchanges.
+    failures : int
+        Number of failed exchanges or connections.
+    ejections : int
+        Number of times the endpoint has been ejected.
+    latency : float
+        Exponential moving average of the exchange latency in seconds.
+    last_latency : float
+        Latency of the last successful exchange in seconds.
+    total_latency : float
+        Sum of latencies of all successful exchanges in seconds.
+
+    """
+
+    def __init__(self, server: str, port: int) -> None:
+        """Init constructor of Endpoint."""
+        self.server: str = server
+        self.port: int = port
+        self.client: Optional[TCPClient] = None
+        self.ejected_at: Optional[float] = None
+        self.exchanges: int = 0
+        self.failures: int = 0
+        self.ejections: int = 0
+        self.latency: float = 0.0
+        self.last_latency: float = 0.0
+        self.total_latency: float = 0.0
+
+    def __str__(self) -> str:
+        """Endpoint as "server:port"."""
+        return f"{self.server}:{self.port}"
+
+    @property
+    def healthy(self) -> bool:
+        """Whether the endpoint is in the pool rotation."""
+        return self.ejected_at is None
+
+    def record(self, latency: float, alpha: float) -> None:
+        """Account a successful exchange which took `latency` seconds.
+
+        Returns
+        -------
+        None
+
+        """
+        self.latency = (
+            latency if not self.exchanges else alpha * latency + (1 - alpha) * self.latency
+        )
+        self.exchanges += 1
+        self.last_latency = latency
+        self.total_latency += latency
+
+    def stats(self) -> Dict[str, Any]:
+        """Statistics of the endpoint.
+
+        Returns
+        -------
+        Dict[str, Any]
+            Health, counters and latencies (in seconds) of the endpoint.
+
+        """
+        return {
+            "healthy": self.healthy,
+            "exchanges": self.exchanges,
+            "failures": self.failures,
+            "ejections": self.ejections,
+            "latency": self.latency,
+            "last_latency": self.last_latency,
+            "mean_latency": self.total_latency / self.exchanges if self.exchanges else 0.0,
+        }
+
+
+class TCPPool:
+    """TCPPool class to balance APDUs across several TCP servers (e.g. Speculos).
+
+    Each endpoint keeps a persistent `TCPClient` and runs one exchange at a
+    time. An exchange goes to the idle healthy endpoint with the lowest
+    latency, waiting for one if they are all busy. An endpoint whose
+    connection fails is ejected from the rotation and the error is raised
+    to the caller; reconnection is then attempted once `reconnect_interval`
+    seconds have elapsed, when an endpoint is needed or on `health_check()`.
+
+    Parameters
+    ----------
+    endpoints : Sequence[Tuple[str, int]]
+        Pairs (server, port) of the TCP servers.
+    reconnect_interval : float
+        Minimum delay in seconds before reconnecting an ejected endpoint.
+    timeout : Optional[float]
+        Timeout in seconds of socket operations, None to block forever.
+    alpha : float
+        Smoothing factor of the latency moving average, in ]0, 1].
+
+    Attributes
+    ----------
+    endpoints : List[Endpoint]
+        Endpoints of the pool.
+    reconnect_interval : float
+        Minimum delay in seconds before reconnecting an ejected endpoint.
+    timeout : Optional[float]
+        Timeout in seconds of socket operations.
+
+    Examples
+    --------
+    >>> pool = TCPPool([("127.0.0.1", 9999), ("127.0.0.1", 10000)])
+    >>> sw, rdata = pool.exchange(cla=0xE0, ins=0x01)
+    >>> pool.stats()["127.0.0.1:9999"]["mean_latency"]
+
+    """
+
+    def __init__(
+        self,
+        endpoints: Sequence[Tuple[str, int]],
+        reconnect_interval: float = 1.0,
+        timeout: Optional[float] = None,
+        alpha: float = 0.2,
+    ) -> None:
+        """Init constructor of TCPPool."""
+        if not endpoints:
+            raise ValueError("TCPPool needs at least one endpoint!")
+
+        self.endpoints: List[Endpoint] = [Endpoint(server, port) for server, port in endpoints]
+        self.reconnect_interval: float = reconnect_interval
+        self.timeout: Optional[float] = timeout
+        self._alpha: float = alpha
+        self._idle: List[Endpoint] = list(self.endpoints)
+        self._cond = threading.Condition()
+        self._closed: bool = False
+
+        for endpoint in self.endpoints:
+            self._connect(endpoint)
+
+    def __enter__(self) -> "TCPPool":
+        """Enter `with` block."""
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        """Close the pool when leaving `with` block."""
+        self.close()
+
+    def _connect(self, endpoint: Endpoint) -> bool:
+        client = TCPClient(server=endpoint.server, port=endpoint.port, timeout=self.timeout)
+
+        try:
+            client.open()
+        except OSError as exc:
+            client.close()
+            self._eject(endpoint, exc)
+            return False
+
+        if not endpoint.healthy:
+            LOG.info("TCP endpoint %s reconnected", endpoint)
+        endpoint.client = client
+        endpoint.ejected_at = None
+
+        return True
+
+    def _eject(self, endpoint: Endpoint, exc: BaseException) -> None:
+        if endpoint.client is not None:
+            endpoint.client.close()
+            endpoint.client = None
+
+        endpoint.failures += 1
+        if endpoint.healthy:
+            endpoint.ejections += 1
+            LOG.warning("TCP endpoint %s ejected: %s", endpoint, exc)
+        endpoint.ejected_at = time.monotonic()
+
+    def _due(self, endpoint: Endpoint) -> bool:
+        return (
+            endpoint.ejected_at is not None
+            and time.monotonic() - endpoint.ejected_at >= self.reconnect_interval
+        )
+
+    def _acquire(self) -> Endpoint:
+        # endpoints which failed to reconnect during this call
+        tried: List[Endpoint] = []
+
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise ConnectionError("TCPPool is closed!")
+
+                    healthy = [endpoint for endpoint in self._idle if endpoint.healthy]
+                    if healthy:
+                        endpoint = min(healthy, key=lambda e: e.latency)
+                        self._idle.remove(endpoint)
+                        return endpoint
+
+                    due = [e for e in self._idle if self._due(e) and e not in tried]
+                    if due:
+                        endpoint = due[0]
+                        self._idle.remove(endpoint)
+                        break
+
+                    if len(self._idle) == len(self.endpoints):
+                        # nothing busy, nothing will be released
+                        raise NoHealthyEndpointError()
+
+                    self._cond.wait()
+
+            # reconnect outside of the lock, the endpoint is reserved meanwhile
+            if self._connect(endpoint):
+                return endpoint
+
+            tried.append(endpoint)
+            self._release(endpoint)
+
+    def _release(self, endpoint: Endpoint) -> None:
+        with self._cond:
+            self._idle.append(endpoint)
+            self._cond.notify()
+
+    def run(self, fn: Callable[[TCPClient], T]) -> T:
+        """Run `fn` with the client of an idle healthy endpoint.
+
+        Parameters
+        ----------
+        fn : Callable[[TCPClient], T]
+            Job to run, called with the client of the endpoint picked.
+
+        Returns
+        -------
+        T
+            Result of `fn`.
+
+        """
+        endpoint: Endpoint = self._acquire()
+
+        try:
+            assert endpoint.client is not None
+            start: float = time.perf_counter()
+            result: T = fn(endpoint.client)
+            endpoint.record(time.perf_counter() - start, self._alpha)
+            return result
+        except OSError as exc:
+            self._eject(endpoint, exc)
+            raise
+        finally:
+            self._release(endpoint)
+
+    def exchange(
+        self,
+        cla: int,
+        ins: Union[int, enum.IntEnum],
+        p1: int = 0,
+        p2: int = 0,
+        option: Optional[int] = None,
+        cdata: BytesLike = b"",
+    ) -> Tuple[int, bytes]:
+        """Send structured APDUs and wait to receive data from one endpoint.
+
+        Parameters
+        ----------
+        cla : int
+            Instruction class: CLA (1 byte)
+        ins : Union[int, IntEnum]
+            Instruction code: INS (1 byte)
+        p1 : int
+            Instruction parameter: P1 (1 byte).
+        p2 : int
+            Instruction parameter: P2 (1 byte).
+        option : Optional[int]
+            Optional parameter: Opt (1 byte).
+        cdata : Union[bytes, bytearray, memoryview]
+            Command data (variable length).
+
+        Returns
+        -------
+        Tuple[int, bytes]
+            A pair (sw, rdata) for the status word (2 bytes represented
+            as int) and the response data (bytes of variable length).
+
+        """
+        header: bytes = Transport.apdu_header(cla, ins, p1, p2, option, len(cdata))
+
+        def _exchange(client: TCPClient) -> Tuple[int, bytes]:
+            client.send_parts(header, cdata)
+            return client.recv()
+
+        return self.run(_exchange)
+
+    def exchange_raw(self, apdu: Union[str, BytesLike]) -> Tuple[int, bytes]:
+        """Send raw bytes `apdu` and wait to receive data from one endpoint.
+
+        Parameters
+        ----------
+        apdu : Union[str, bytes, bytearray, memoryview]
+            Hexstring or bytes within APDU to send.
+
+        Returns
+        -------
+        Tuple[int, bytes]
+            A pair (sw, rdata) for the status word (2 bytes represented
+            as int) and the response (bytes of variable length).
+
+        """
+        data: BytesLike = bytes.fromhex(apdu) if isinstance(apdu, str) else apdu
+
+        return self.run(lambda client: client.exchange(data))
+
+    def health_check(self) -> Dict[str, bool]:
+        """Reconnect idle ejected endpoints whose `reconnect_interval` has elapsed.
+
+        Returns
+        -------
+        Dict[str, bool]
+            Health of each endpoint, by "server:port".
+
+        """
+        with self._cond:
+            due: List[Endpoint] = [endpoint for endpoint in self._idle if self._due(endpoint)]
+            for endpoint in due:
+                self._idle.remove(endpoint)
+
+        for endpoint in due:
+            self._connect(endpoint)
+            self._release(endpoint)
+
+        return {str(endpoint): endpoint.healthy for endpoint in self.endpoints}
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Statistics of each endpoint.
+
+        Returns
+        -------
+        Dict[str, Dict[str, Any]]
+            Health, counters and latencies (in seconds), by "server:port".
+
+        """
+        return {str(endpoint): endpoint.stats() for endpoint in self.endpoints}
+
+    def close(self) -> None:
+        """Close connections of all endpoints.
+
+        Returns
+        -------
+        None
+
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+        for endpoint in self.endpoints:
+            if endpoint.client is not None:
+                endpoint.client.close()
+                endpoint.client = None
@@ -0,0 +1,244 @@
+"""ledgercomm.tracing module.
+
+Optional spans around the stages of an exchange (framing, writes,
+waiting for the first response frame, reassembly), exported in Chrome
+trace-event format to be opened in chrome://tracing or Perfetto.
+
+Spans are recorded only after `enable_tracing()`, `span()` returns a
+shared no-op context manager otherwise.
+"""
+
+import collections
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Deque, Dict, List, NamedTuple, Optional, Union
+
+
+class SpanRecord(NamedTuple):
+    """Span recorded by a `Tracer`.
+
+    Attributes
+    ----------
+    name : str
+        Name of the stage, e.g. "hid.write".
+    start : int
+        Start of the span as given by `time.perf_counter_ns()`.
+    end : int
+        End of the span as given by `time.perf_counter_ns()`.
+    tid : int
+        Identifier of the thread of the span.
+    args : Optional[Dict[str, Any]]
+        Extra information on the span.
+
+    """
+
+    name: str
+    start: int
+    end: int
+    tid: int
+    args: Optional[Dict[str, Any]]
+
+
+class _Span:
+    """Context manager recording a span in `tracer`."""
+
+    __slots__ = ("tracer", "name", "args", "start")
+
+    def __init__(self, tracer: "Tracer", name: str, args: Optional[Dict[str, Any]]) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.start: int = 0
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.tracer.spans.append(
+            SpanRecord(
+                self.name, self.start, time.perf_counter_ns(), threading.get_ident(), self.args
+            )
+        )
+
+
+class _NullSpan:
+    """Context manager doing nothing, used when tracing is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """Tracer class collecting spans in memory.
+
+    Parameters
+    ----------
+    max_spans : int
+        Maximum number of spans kept, the oldest ones are dropped first.
+
+    Attributes
+    ----------
+    spans : Deque[SpanRecord]
+        Spans recorded, in the order they ended.
+
+    Examples
+    --------
+    >>> tracer = enable_tracing()
+    >>> transport.exchange(cla=0xE0, ins=0x01)
+    >>> tracer.export_chrome("exchange.json")
+
+    """
+
+    def __init__(self, max_spans: int = 100_000) -> None:
+        """Init constructor of Tracer."""
+        self.spans: Deque[SpanRecord] = collections.deque(maxlen=max_spans)
+
+    def span(self, name: str, args: Optional[Dict[str, Any]] = None) -> _Span:
+        """Context manager recording the span `name`.
+
+        Parameters
+        ----------
+        name : str
+            Name of the stage.
+        args : Optional[Dict[str, Any]]
+            Extra information on the span.
+
+        Returns
+        -------
+        _Span
+            Context manager recording the span when it exits.
+
+        """
+        return _Span(self, name, args)
+
+    def clear(self) -> None:
+        """Drop all spans recorded.
+
+        Returns
+        -------
+        None
+
+        """
+        self.spans.clear()
+
+    def chrome_events(self) -> List[Dict[str, Any]]:
+        """Spans as Chrome trace events ("complete" events in microseconds).
+
+        Returns
+        -------
+        List[Dict[str, Any]]
+            One event by span.
+
+        """
+        pid: int = os.getpid()
+        events: List[Dict[str, Any]] = []
+
+        for span in list(self.spans):
+            event: Dict[str, Any] = {
+                "name": span.name,
+                "cat": span.name.split(".", 1)[0],
+                "ph": "X",
+                "ts": span.start / 1000,
+                "dur": (span.end - span.start) / 1000,
+                "pid": pid,
+                "tid": span.tid,
+            }
+            if span.args:
+                event["args"] = span.args
+            events.append(event)
+
+        return events
+
+    def export_chrome(self, path: Union[str, Path]) -> None:
+        """Write spans in Chrome trace-event JSON format.
+
+        Parameters
+        ----------
+        path : Union[str, Path]
+            Path of the JSON file.
+
+        Returns
+        -------
+        None
+
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.chrome_events(), "displayTimeUnit": "ns"}, f)
+
+
+_tracer: Optional[Tracer] = None
+
+
+def enable_tracing(tracer: Optional[Tracer] = None) -> Tracer:
+    """Record spans of exchanges in `tracer` (a new one if None) in every thread.
+
+    Parameters
+    ----------
+    tracer : Optional[Tracer]
+        Tracer to record spans in.
+
+    Returns
+    -------
+    Tracer
+        Tracer recording spans.
+
+    """
+    global _tracer  # pylint: disable=global-statement
+
+    _tracer = tracer if tracer is not None else Tracer()
+
+    return _tracer
+
+
+def disable_tracing() -> None:
+    """Stop recording spans.
+
+    Returns
+    -------
+    None
+
+    """
+    global _tracer  # pylint: disable=global-statement
+
+    _tracer = None
+
+
+def get_tracer() -> Optional[Tracer]:
+    """Tracer recording spans, None if tracing is disabled."""
+    return _tracer
+
+
+def span(name: str, args: Optional[Dict[str, Any]] = None) -> Union[_Span, _NullSpan]:
+    """Context manager recording the span `name` if tracing is enabled.
+
+    Parameters
+    ----------
+    name : str
+        Name of the stage.
+    args : Optional[Dict[str, Any]]
+        Extra information on the span.
+
+    Returns
+    -------
+    Union[_Span, _NullSpan]
+        Context manager recording the span, or doing nothing.
+
+    """
+    tracer: Optional[Tracer] = _tracer
+
+    if tracer is None:
+        return _NULL_SPAN
+
+    return _Span(tracer, name, args)
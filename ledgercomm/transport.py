@@ -1,13 +1,33 @@
 """ledgercomm.transport module."""
 
 import enum
-import logging
-import struct
-from typing import Union, Tuple, Optional, Literal, cast
-
-from ledgercomm.interfaces.tcp_client import TCPClient
-from ledgercomm.interfaces.hid_device import HID
-from ledgercomm.log import LOG
+import functools
+import threading
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from ledgercomm import tracing
+from ledgercomm.apdu import HEADER, HEADER_WITH_OPTION, ApduTemplate
+from ledgercomm.interfaces.comm import BytesLike, Comm
+from ledgercomm.interfaces.registry import get_interface
+from ledgercomm.log import enable_debug_logs
+
+if TYPE_CHECKING:
+    # optional features, imported only when enabled
+    from ledgercomm.cache import ResponseCache
+    from ledgercomm.capture import Recorder
+    from ledgercomm.metrics import MetricsSink
+    from ledgercomm.reconnect import ReconnectingComm, ReconnectPolicy
+    from ledgercomm.singleflight import SingleFlight
 
 
 class TransportType(enum.Enum):
@@ -15,6 +35,60 @@ class TransportType(enum.Enum):
 
     HID = 1
     TCP = 2
+    BROKER = 3
+    UNIX = 4
+    REPLAY = 5
+
+
+class _ExchangeLock:
+    """Lock serializing the exchanges of a `Transport` between threads.
+
+    An iteration of `Transport.exchange_iter()` doesn't hold the lock
+    across yields, it marks the transport as owned by its thread instead:
+    other threads wait until it ends and that thread can't exchange
+    anything else meanwhile as responses in flight would be mixed up.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._idle = threading.Condition(self._lock)
+        # identifier of the thread iterating exchange_iter(), if any
+        self.owner: Optional[int] = None
+
+    def _wait_idle(self) -> None:
+        """Wait for the iteration of another thread to end, with `self._lock` held."""
+        while self.owner is not None:
+            if self.owner == threading.get_ident():
+                raise RuntimeError("Can't exchange until exchange_iter() ends!")
+            self._idle.wait()
+
+    def __enter__(self) -> None:
+        self._lock.acquire()
+        try:
+            self._wait_idle()
+        except BaseException:
+            self._lock.release()
+            raise
+
+    def __exit__(self, *args: Any) -> None:
+        self._lock.release()
+
+    def begin_iteration(self) -> None:
+        """Mark the transport as owned by the current thread until `end_iteration()`."""
+        with self._lock:
+            self._wait_idle()
+            self.owner = threading.get_ident()
+
+    def check_owner(self) -> None:
+        """Raise `RuntimeError` if the current thread doesn't own the iteration."""
+        if self.owner != threading.get_ident():
+            raise RuntimeError("exchange_iter() must be resumed by the thread which started it!")
+
+    def end_iteration(self) -> None:
+        """Let other threads exchange again, from any thread (e.g. garbage collection)."""
+        with self._lock:
+            self.owner = None
+            self._idle.notify_all()
 
 
 class Transport:
@@ -26,56 +100,115 @@ class Transport:
     Parameters
     ----------
     interface : str
-        Either "hid" or "tcp" for the underlying communication interface.
+        Either "hid", "tcp", "unix", "broker", "replay" or the name of an
+        interface in `ledgercomm.interfaces.registry` for the underlying
+        communication interface. Only the module of the selected interface
+        is imported.
     server : str
         IP address of the TCP server if interface is "tcp".
     port : int
         Port of the TCP server if interface is "tcp".
     debug : bool
         Whether you want debug logs or not.
+    cache : Optional[ResponseCache]
+        Cache of responses to idempotent APDUs used by `exchange` and
+        `exchange_raw`, None to disable caching.
+    single_flight : Optional[SingleFlight]
+        Coalescing of concurrent identical APDUs used by `exchange` and
+        `exchange_raw`, None to disable it.
+    recorder : Optional[Recorder]
+        Recorder of every exchange through `self.com`, None to disable recording.
+    metrics : Optional[MetricsSink]
+        Destination of measures of every exchange through `self.com`
+        (latency, status word, bytes), None to disable metrics.
+    reconnect : Optional[ReconnectPolicy]
+        Reconnect with backoff when the connection breaks (e.g. Speculos
+        restarted, device unplugged) and retry the idempotent APDUs of the
+        policy, None to raise on broken connections.
+    **kwargs : Any
+        Extra keyword arguments of the interface constructor, e.g.
+        `reader_thread=True` for HID, `buffer_size=...` for TCP,
+        `path=...` or `sock=...` for Unix sockets, `capture=...` for replay.
+
+    Exchanges are serialized by a lock, so a transport can be shared
+    between threads: `exchange()`, `exchange_raw()`, `exchange_template()`
+    and whole iterations of `exchange_iter()` run one at a time, while
+    threads coalesced by `single_flight` wait for their leader without
+    holding the lock. `send()` and `recv()` are atomic on their own, a
+    thread using them directly must synchronize the pair itself.
 
     Attributes
     ----------
-    interface : TransportType
-        Either TransportType.HID or TransportType.TCP.
-    com : Union[TCPClient, HID]
+    interface : Optional[TransportType]
+        Type of the communication interface, None for interfaces which
+        aren't shipped with ledgercomm.
+    interface_name : str
+        Name of the communication interface in lowercase, e.g. "hid".
+    com : Comm
         Communication interface to send/receive APDUs.
+    cache : Optional[ResponseCache]
+        Cache of responses to idempotent APDUs.
+    single_flight : Optional[SingleFlight]
+        Coalescing of concurrent identical APDUs.
+    recorder : Optional[Recorder]
+        Recorder of exchanges.
+    metrics : Optional[MetricsSink]
+        Destination of measures of exchanges.
+    connection : Optional[ReconnectingComm]
+        Interface reconnected when its connection breaks, with its state,
+        events and downtime statistics, None without `reconnect`.
 
     """
 
     def __init__(
         self,
-        interface: Literal["hid", "tcp"] = "tcp",
+        interface: str = "tcp",
         server: str = "127.0.0.1",
         port: int = 9999,
         debug: bool = False,
+        cache: Optional["ResponseCache"] = None,
+        single_flight: Optional["SingleFlight"] = None,
+        recorder: Optional["Recorder"] = None,
+        metrics: Optional["MetricsSink"] = None,
+        reconnect: Optional["ReconnectPolicy"] = None,
+        **kwargs: Any,
     ) -> None:
         """Init constructor of Transport."""
         if debug:
-            LOG.setLevel(logging.DEBUG)
-            # create console handler and set level to debug
-            ch = logging.StreamHandler()
-            ch.setLevel(logging.DEBUG)
+            enable_debug_logs()
 
-            # create formatter
-            formatter = logging.Formatter("%(name)s - %(levelname)s - %(message)s")
+        self.cache: Optional["ResponseCache"] = cache
+        self.single_flight: Optional["SingleFlight"] = single_flight
+        self.recorder: Optional["Recorder"] = recorder
+        self.metrics: Optional["MetricsSink"] = metrics
+        self._lock = _ExchangeLock()
 
-            # add formatter to ch
-            ch.setFormatter(formatter)
+        self.interface_name: str = interface.lower()
+        self.interface: Optional[TransportType] = TransportType.__members__.get(interface.upper())
 
-            # add ch to logger
-            LOG.addHandler(ch)
+        if self.interface == TransportType.TCP:
+            kwargs.update(server=server, port=port)
 
-        self.interface: TransportType
+        # raises KeyError if the interface is unknown
+        factory = get_interface(self.interface_name)
 
-        try:
-            self.interface = TransportType[interface.upper()]
-        except KeyError as exc:
-            raise KeyError(f"Unknown interface '{interface}'!") from exc
+        self.connection: Optional["ReconnectingComm"] = None
+        if reconnect is not None:
+            from ledgercomm.reconnect import ReconnectingComm  # pylint: disable=import-outside-toplevel
 
-        self.com: Union[TCPClient, HID] = (
-            TCPClient(server=server, port=port) if self.interface == TransportType.TCP else HID()
-        )
+            self.connection = ReconnectingComm(functools.partial(factory, **kwargs), reconnect)
+
+        self.com: Comm = self.connection if self.connection is not None else factory(**kwargs)
+
+        if recorder is not None:
+            from ledgercomm.capture import RecordingComm  # pylint: disable=import-outside-toplevel
+
+            self.com = RecordingComm(self.com, recorder)
+
+        if metrics is not None:
+            from ledgercomm.metrics import MeteredComm  # pylint: disable=import-outside-toplevel
+
+            self.com = MeteredComm(self.com, metrics, self.interface_name)
 
         self.com.open()
 
@@ -111,11 +244,8 @@ class Transport:
             APDU header packed with parameters.
 
         """
-        ins = cast(int, ins.value) if isinstance(ins, enum.IntEnum) else cast(int, ins)
-
         if opt:
-            return struct.pack(
-                "BBBBBB",
+            return HEADER_WITH_OPTION.pack(
                 cla,
                 ins,
                 p1,
@@ -124,7 +254,7 @@ class Transport:
                 opt,
             )
 
-        return struct.pack("BBBBB", cla, ins, p1, p2, lc)
+        return HEADER.pack(cla, ins, p1, p2, lc)
 
     def send(
         self,
@@ -133,7 +263,7 @@ class Transport:
         p1: int = 0,
         p2: int = 0,
         option: Optional[int] = None,
-        cdata: bytes = b"",
+        cdata: BytesLike = b"",
     ) -> int:
         """Send structured APDUs through `self.com`.
 
@@ -149,7 +279,7 @@ class Transport:
             Instruction parameter: P2 (1 byte).
         option : Optional[int]
             Optional parameter: Opt (1 byte).
-        cdata : bytes
+        cdata : Union[bytes, bytearray, memoryview]
             Command data (variable length).
 
         Returns
@@ -160,14 +290,15 @@ class Transport:
         """
         header: bytes = Transport.apdu_header(cla, ins, p1, p2, option, len(cdata))
 
-        return self.com.send(header + cdata)
+        with self._lock:
+            return self.com.send_parts(header, cdata)
 
-    def send_raw(self, apdu: Union[str, bytes]) -> int:
+    def send_raw(self, apdu: Union[str, BytesLike]) -> int:
         """Send raw bytes `apdu` through `self.com`.
 
         Parameters
         ----------
-        apdu : Union[str, bytes]
+        apdu : Union[str, bytes, bytearray, memoryview]
             Hexstring or bytes within APDU to be sent through `self.com`.
 
         Returns
@@ -179,7 +310,8 @@ class Transport:
         if isinstance(apdu, str):
             apdu = bytes.fromhex(apdu)
 
-        return self.com.send(apdu)
+        with self._lock:
+            return self.com.send(apdu)
 
     def recv(self) -> Tuple[int, bytes]:
         """Receive data from `self.com`.
@@ -193,7 +325,8 @@ class Transport:
             as int) and the response data (variable length).
 
         """
-        return self.com.recv()
+        with self._lock:
+            return self.com.recv()
 
     def exchange(
         self,
@@ -202,7 +335,7 @@ class Transport:
         p1: int = 0,
         p2: int = 0,
         option: Optional[int] = None,
-        cdata: bytes = b"",
+        cdata: BytesLike = b"",
     ) -> Tuple[int, bytes]:
         """Send structured APDUs and wait to receive data from `self.com`.
 
@@ -218,7 +351,7 @@ class Transport:
             Instruction parameter: P2 (1 byte).
         option : Optional[int]
             Optional parameter: Opt (1 byte).
-        cdata : bytes
+        cdata : Union[bytes, bytearray, memoryview]
             Command data (variable length).
 
         Returns
@@ -228,16 +361,51 @@ class Transport:
             as int) and the response data (bytes of variable length).
 
         """
-        header: bytes = Transport.apdu_header(cla, ins, p1, p2, option, len(cdata))
+        with tracing.span("transport.exchange"):
+            header: bytes = Transport.apdu_header(cla, ins, p1, p2, option, len(cdata))
+
+            if self._shared(header):
+                return self._exchange_shared(header + cdata)
 
-        return self.com.exchange(header + cdata)
+            with self._lock:
+                self.com.send_parts(header, cdata)
+                return self.com.recv()
+
+    def exchange_template(
+        self, template: ApduTemplate, cdata: BytesLike = b""
+    ) -> Tuple[int, bytes]:
+        """Send the APDU of `template` and wait to receive data from `self.com`.
+
+        Parameters
+        ----------
+        template : ApduTemplate
+            Command with fixed CLA, INS, P1, P2 and option.
+        cdata : Union[bytes, bytearray, memoryview]
+            Command data (variable length).
+
+        Returns
+        -------
+        Tuple[int, bytes]
+            A pair (sw, rdata) for the status word (2 bytes represented
+            as int) and the response data (bytes of variable length).
+
+        """
+        with tracing.span("transport.exchange"):
+            header: bytes = template.header(len(cdata))
 
-    def exchange_raw(self, apdu: Union[str, bytes]) -> Tuple[int, bytes]:
+            if self._shared(header):
+                return self._exchange_shared(header + cdata)
+
+            with self._lock:
+                self.com.send_parts(header, cdata)
+                return self.com.recv()
+
+    def exchange_raw(self, apdu: Union[str, BytesLike]) -> Tuple[int, bytes]:
         """Send raw bytes `apdu` and wait to receive data from `self.com`.
 
         Parameters
         ----------
-        apdu : Union[str, bytes]
+        apdu : Union[str, bytes, bytearray, memoryview]
             Hexstring or bytes within APDU to send through `self.com`.
 
         Returns
@@ -250,7 +418,191 @@ class Transport:
         if isinstance(apdu, str):
             apdu = bytes.fromhex(apdu)
 
-        return self.com.exchange(apdu)
+        with tracing.span("transport.exchange_raw"):
+            if self._shared(apdu):
+                return self._exchange_shared(apdu)
+
+            with self._lock:
+                return self.com.exchange(apdu)
+
+    def _shared(self, apdu: BytesLike) -> bool:
+        """Whether responses to `apdu` may be shared through cache or coalescing."""
+        return (self.cache is not None and self.cache.cacheable(apdu)) or (
+            self.single_flight is not None and self.single_flight.coalescable(apdu)
+        )
+
+    def _exchange_shared(self, apdu: BytesLike) -> Tuple[int, bytes]:
+        cache: Optional[ResponseCache] = (
+            self.cache if self.cache is not None and self.cache.cacheable(apdu) else None
+        )
+        response: Optional[Tuple[int, bytes]] = cache.get(apdu) if cache is not None else None
+
+        if response is not None:
+            return response
+
+        if self.single_flight is not None and self.single_flight.coalescable(apdu):
+            # only the leader takes the lock, followers wait for its response
+            response = self.single_flight.do(apdu, lambda: self._exchange_locked(apdu))
+        else:
+            response = self._exchange_locked(apdu)
+
+        if cache is not None:
+            cache.put(apdu, response)
+
+        return response
+
+    def _exchange_locked(self, apdu: BytesLike) -> Tuple[int, bytes]:
+        with self._lock:
+            return self.com.exchange(apdu)
+
+    def exchange_iter(
+        self,
+        apdus: Iterable[Union[str, BytesLike]],
+        window: int = 8,
+        stop_on_error: bool = False,
+    ) -> Iterator[Tuple[int, bytes]]:
+        """Pipeline raw `apdus` through `self.com` and yield responses in order.
+
+        Up to `window` APDUs are in flight at once if `self.com` supports
+        pipelining (TCP), otherwise APDUs are exchanged one by one (HID).
+        APDUs are read lazily from `apdus`. Responses still in flight are
+        read whenever iteration stops early, so that `self.com` stays in
+        sync for the next exchanges. Other threads wait for the iteration to
+        end before exchanging, and the iterating thread can't exchange
+        anything else meanwhile (`RuntimeError`).
+
+        The iteration must be resumed by the thread which started it, and
+        ended by exhausting or closing the generator (e.g. `with
+        contextlib.closing(...)`): an abandoned generator blocks the other
+        threads until it is garbage collected.
+
+        Parameters
+        ----------
+        apdus : Iterable[Union[str, bytes, bytearray, memoryview]]
+            Hexstrings or bytes within APDUs to send through `self.com`.
+        window : int
+            Maximum number of APDUs sent without having received their response.
+        stop_on_error : bool
+            Stop sending after the first status word other than 0x9000.
+            Responses of APDUs already in flight are then read and discarded.
+
+        Yields
+        ------
+        Tuple[int, bytes]
+            A pair (sw, rdata) for each APDU, in the same order as `apdus`.
+
+        Raises
+        ------
+        ValueError
+            If an APDU is invalid hexadecimal or empty, after the responses
+            of the APDUs before it. Errors raised by `apdus` are raised
+            likewise.
+        RuntimeError
+            If the iteration is resumed by another thread, after the
+            responses in flight are read.
+
+        """
+        if window < 1:
+            raise ValueError(f"Window must be at least 1, not {window}!")
+
+        self._lock.begin_iteration()
+        pipeline: Generator[Tuple[int, bytes], None, None] = self._pipeline(
+            apdus, window, stop_on_error
+        )
+        try:
+            for response in pipeline:
+                yield response
+                self._lock.check_owner()
+        finally:
+            # also on GeneratorExit: responses in flight are read before other threads go on
+            pipeline.close()
+            self._lock.end_iteration()
+
+    def _pipeline(
+        self, apdus: Iterable[Union[str, BytesLike]], window: int, stop_on_error: bool
+    ) -> Generator[Tuple[int, bytes], None, None]:
+        if not self.com.pipelining:
+            window = 1
+
+        pending: Iterator[Union[str, BytesLike]] = iter(apdus)
+        in_flight: int = 0
+        exhausted: bool = False
+        stopped: bool = False
+        # invalid APDU or failure of `apdus`, raised once the APDUs before it are answered
+        error: Optional[Exception] = None
+
+        try:
+            while True:
+                if not exhausted and not stopped and error is None and in_flight < window:
+                    batch: List[BytesLike] = []
+                    try:
+                        for apdu in pending:
+                            data: BytesLike = bytes.fromhex(apdu) if isinstance(apdu, str) else apdu
+                            if not data:
+                                raise ValueError("Can't send empty APDU!")
+                            batch.append(data)
+                            if in_flight + len(batch) == window:
+                                break
+                        else:
+                            exhausted = True
+                    except Exception as exc:  # pylint: disable=broad-except
+                        error = exc
+
+                    if batch:
+                        self.com.send_many(batch)
+                        in_flight += len(batch)
+
+                if in_flight == 0:
+                    if error is not None and not stopped:
+                        raise error
+                    return
+
+                # counted as answered even if `recv()` fails, its response is lost
+                in_flight -= 1
+                sw, rdata = self.com.recv()
+
+                if stopped:
+                    continue
+
+                if stop_on_error and sw != 0x9000:
+                    stopped = True
+
+                yield sw, rdata
+        except OSError:
+            # broken connection, responses in flight can't be read anymore
+            raise
+        except (Exception, GeneratorExit):
+            # keep `self.com` in sync if iteration stops early, whatever the reason
+            while in_flight:
+                in_flight -= 1
+                self.com.recv()
+            raise
+
+    def exchange_many(
+        self,
+        apdus: Iterable[Union[str, BytesLike]],
+        window: int = 8,
+        stop_on_error: bool = False,
+    ) -> List[Tuple[int, bytes]]:
+        """Pipeline raw `apdus` through `self.com` and wait for all responses.
+
+        Parameters
+        ----------
+        apdus : Iterable[Union[str, bytes, bytearray, memoryview]]
+            Hexstrings or bytes within APDUs to send through `self.com`.
+        window : int
+            Maximum number of APDUs sent without having received their response.
+        stop_on_error : bool
+            Stop after the first status word other than 0x9000, which is
+            the last item of the returned list.
+
+        Returns
+        -------
+        List[Tuple[int, bytes]]
+            A pair (sw, rdata) for each APDU exchanged, in the same order as `apdus`.
+
+        """
+        return list(self.exchange_iter(apdus, window, stop_on_error))
 
     def close(self) -> None:
         """Close `self.com` interface.
@@ -0,0 +1,34 @@
+"""Fixtures of the ledgercomm tests, stand-ins for hardware and Speculos."""
+
+import importlib.util
+from pathlib import Path
+from types import ModuleType
+from typing import Iterator
+
+import pytest
+
+from ledgercomm.fake_device import FakeDevice
+from ledgercomm.interfaces import hid_device, hid_discovery
+
+FAKEHID_PATH = Path(__file__).resolve().parent.parent / "benchmarks" / "fakehid" / "hid.py"
+
+
+@pytest.fixture
+def fake_hid(monkeypatch: pytest.MonkeyPatch) -> ModuleType:
+    """Stand-in for hidapi with one echoing device, and an empty discovery cache."""
+    spec = importlib.util.spec_from_file_location("fakehid", FAKEHID_PATH)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    monkeypatch.setattr(hid_device, "hid", module)
+    monkeypatch.setattr(hid_discovery, "_discoveries", {})
+
+    return module
+
+
+@pytest.fixture
+def fake_device() -> Iterator[FakeDevice]:
+    """Echoing stand-in for Speculos over TCP, in a background thread."""
+    with FakeDevice() as device:
+        yield device
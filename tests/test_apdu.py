@@ -0,0 +1,45 @@
+import itertools
+import struct
+from typing import Optional
+
+import pytest
+
+from ledgercomm import Transport
+from ledgercomm.apdu import ApduTemplate, BulkEncoder
+
+CDATAS = [b"", b"\x01", bytes(range(200)), bytes(254)]
+
+
+@pytest.mark.parametrize(
+    "p1, p2, option",
+    list(itertools.product([0x00, 0x01], [0x00, 0x80], [None, 0x00, 0x01, 0xFF])),
+)
+def test_same_bytes_as_apdu_header(p1: int, p2: int, option: Optional[int]) -> None:
+    template = ApduTemplate(cla=0xE0, ins=0x04, p1=p1, p2=p2, option=option)
+    encoder = BulkEncoder(size=1)
+    buffer = bytearray(300)
+
+    for i, cdata in enumerate(CDATAS):
+        header = Transport.apdu_header(0xE0, 0x04, p1, p2, option, len(cdata))
+        apdu = header + cdata
+
+        assert template.header(len(cdata)) == header
+        assert template.header_size == len(header)
+        assert template.encode(cdata) == apdu
+        assert template.pack_into(buffer, 3, cdata) == 3 + len(apdu)
+        assert buffer[3 : 3 + len(apdu)] == apdu
+        assert encoder.add(template, cdata) == i
+
+    assert [view.tobytes() for view in encoder.views()] == [
+        Transport.apdu_header(0xE0, 0x04, p1, p2, option, len(cdata)) + cdata for cdata in CDATAS
+    ]
+    assert encoder.getbuffer().tobytes() == b"".join(
+        Transport.apdu_header(0xE0, 0x04, p1, p2, option, len(cdata)) + cdata for cdata in CDATAS
+    )
+
+
+def test_invalid_parameters() -> None:
+    with pytest.raises(struct.error):
+        ApduTemplate(cla=0x100, ins=0x01)
+    with pytest.raises(AttributeError):
+        ApduTemplate(cla=0xE0, ins=0x01).extra = 1  # type: ignore
@@ -0,0 +1,113 @@
+import asyncio
+from types import ModuleType
+from typing import Any, Awaitable, Callable, Iterator, List, Tuple
+
+import pytest
+
+from ledgercomm.async_transport import AsyncTransport
+from ledgercomm.fake_device import EchoHandler, FakeDevice, LatencyHandler
+
+
+def echo(apdu: str) -> Tuple[int, bytes]:
+    return 0x9000, bytes.fromhex(apdu)
+
+
+@pytest.fixture
+def slow_device() -> Iterator[FakeDevice]:
+    with FakeDevice(LatencyHandler(EchoHandler(), delay=0.05)) as device:
+        yield device
+
+
+def run(fn: Callable[[AsyncTransport], Awaitable[Any]], **kwargs: Any) -> Any:
+    async def main() -> Any:
+        async with AsyncTransport(timeout=5, **kwargs) as transport:
+            return await fn(transport)
+
+    return asyncio.run(main())
+
+
+APDUS = [f"e0{ins:02x}000000" for ins in range(32)]
+
+
+async def gather(transport: AsyncTransport) -> List[Tuple[int, bytes]]:
+    return await asyncio.gather(*(transport.exchange_raw(apdu) for apdu in APDUS))
+
+
+async def pipelined(transport: AsyncTransport) -> List[Tuple[int, bytes]]:
+    for apdu in APDUS[:3]:
+        await transport.send_raw(apdu)
+    responses = [await transport.recv() for _ in range(2)]
+    responses.append(await transport.exchange_raw(APDUS[3]))
+    responses.append(await transport.recv())
+
+    return responses
+
+
+async def cancelled(transport: AsyncTransport) -> List[Tuple[int, bytes]]:
+    with pytest.raises(asyncio.TimeoutError):
+        await transport.exchange_raw(APDUS[0], timeout=0.01)
+    first = asyncio.ensure_future(transport.exchange_raw(APDUS[1]))
+    second = asyncio.ensure_future(transport.exchange_raw(APDUS[2]))
+    await asyncio.sleep(0.01)
+    first.cancel()
+
+    responses = [await transport.exchange_raw(APDUS[3]), await second]
+    # the response is left to the next recv
+    await transport.send_raw(APDUS[4])
+    with pytest.raises(asyncio.TimeoutError):
+        await transport.recv(timeout=0.01)
+    responses.append(await transport.recv())
+
+    return responses
+
+
+def test_gather_ordered(fake_device: FakeDevice) -> None:
+    assert run(gather, port=fake_device.port) == [echo(apdu) for apdu in APDUS]
+
+
+def test_pipelined_send_recv(fake_device: FakeDevice) -> None:
+    assert run(pipelined, port=fake_device.port) == [echo(APDUS[i]) for i in (0, 1, 3, 2)]
+
+
+def test_cancelled_exchange(slow_device: FakeDevice) -> None:
+    assert run(cancelled, port=slow_device.port) == [
+        echo(APDUS[3]),
+        echo(APDUS[2]),
+        echo(APDUS[4]),
+    ]
+
+
+def test_hid_gather_ordered(fake_hid: ModuleType) -> None:
+    assert run(gather, interface="hid") == [echo(apdu) for apdu in APDUS]
+
+
+def test_hid_pipelined_send_recv(fake_hid: ModuleType) -> None:
+    assert run(pipelined, interface="hid") == [echo(APDUS[i]) for i in (0, 1, 3, 2)]
+
+
+def test_empty_apdu(fake_device: FakeDevice) -> None:
+    async def empty(transport: AsyncTransport) -> Tuple[int, bytes]:
+        with pytest.raises(ValueError):
+            await transport.exchange_raw(b"")
+        return await transport.exchange_raw(APDUS[0])
+
+    assert run(empty, port=fake_device.port) == echo(APDUS[0])
+
+
+def test_hid_write_error(fake_hid: ModuleType, monkeypatch: pytest.MonkeyPatch) -> None:
+    class Device(fake_hid.device):  # type: ignore
+        def write(self, report: Any) -> int:
+            if bytes(report)[8:10] == b"\xe0\xff":
+                raise OSError("write failed")
+            return super().write(report)
+
+    monkeypatch.setattr(fake_hid, "device", Device)
+
+    async def failing(transport: AsyncTransport) -> List[Tuple[int, bytes]]:
+        with pytest.raises(OSError):
+            await transport.exchange_raw("e0ff000000")
+        with pytest.raises(OSError):
+            await transport.send_raw("e0ff000000")
+        return await gather(transport)
+
+    assert run(failing, interface="hid") == [echo(apdu) for apdu in APDUS]
@@ -0,0 +1,94 @@
+import socket
+import threading
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import pytest
+
+from ledgercomm import Transport
+from ledgercomm.broker import MAX_APDU_LENGTH, Broker
+from ledgercomm.fake_device import FakeDevice
+from ledgercomm.interfaces.broker_client import default_broker_path
+from ledgercomm.interfaces.tcp_client import TCPClient
+
+CLIENTS = 4
+APDUS = 50
+
+
+def test_clients_share_the_device(fake_device: FakeDevice, tmp_path: Path) -> None:
+    path = str(tmp_path / "broker.sock")
+    responses: Dict[int, List[Tuple[int, bytes]]] = {}
+
+    def client(i: int) -> None:
+        transport = Transport(interface="broker", path=path)
+        responses[i] = [transport.exchange(0xE0, 0x01, p1=i, p2=j) for j in range(APDUS)]
+        transport.close()
+
+    with Broker(TCPClient(server=fake_device.server, port=fake_device.port), path=path) as broker:
+        threads = [threading.Thread(target=client, args=(i,)) for i in range(CLIENTS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert broker.exchanges == CLIENTS * APDUS
+
+    # each client got the responses to its own APDUs, through one connection to the device
+    assert responses == {
+        i: [(0x9000, bytes([0xE0, 0x01, i, j, 0])) for j in range(APDUS)] for i in range(CLIENTS)
+    }
+    assert fake_device.exchanges == CLIENTS * APDUS
+    assert not Path(path).exists()
+
+
+def test_stale_socket_is_replaced(fake_device: FakeDevice, tmp_path: Path) -> None:
+    path = str(tmp_path / "broker.sock")
+    stale = socket.socket(socket.AF_UNIX)
+    stale.bind(path)
+    stale.close()
+
+    with Broker(TCPClient(server=fake_device.server, port=fake_device.port), path=path):
+        transport = Transport(interface="broker", path=path)
+        assert transport.exchange(0xE0, 0x01) == (0x9000, b"\xe0\x01\x00\x00\x00")
+        transport.close()
+
+
+def test_other_files_are_kept(fake_device: FakeDevice, tmp_path: Path) -> None:
+    path = tmp_path / "broker.sock"
+    path.write_text("not a socket")
+    broker = Broker(TCPClient(server=fake_device.server, port=fake_device.port), path=str(path))
+
+    with pytest.raises(FileExistsError):
+        broker.start()
+
+    assert path.read_text() == "not a socket"
+
+
+def test_default_path(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("XDG_RUNTIME_DIR", "/run/user/1000")
+    assert default_broker_path() == "/run/user/1000/ledgercomm-broker.sock"
+
+    monkeypatch.delenv("XDG_RUNTIME_DIR")
+    with pytest.raises(ValueError, match="XDG_RUNTIME_DIR"):
+        default_broker_path()
+
+
+def test_oversized_apdu_drops_client(fake_device: FakeDevice, tmp_path: Path) -> None:
+    path = str(tmp_path / "broker.sock")
+
+    with Broker(TCPClient(server=fake_device.server, port=fake_device.port), path=path) as broker:
+        transport = Transport(interface="broker", path=path)
+
+        hostile = socket.socket(socket.AF_UNIX)
+        hostile.connect(path)
+        hostile.settimeout(5)
+        hostile.sendall((MAX_APDU_LENGTH + 1).to_bytes(4, byteorder="big"))
+        # closed by the broker without reading the APDU
+        assert hostile.recv(1) == b""
+        hostile.close()
+
+        assert broker.clients == 1
+        assert transport.exchange(0xE0, 0x01) == (0x9000, b"\xe0\x01\x00\x00\x00")
+        transport.close()
+
+    assert fake_device.exchanges == 1
@@ -0,0 +1,169 @@
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+
+from ledgercomm import Transport
+from ledgercomm import cache as cache_module
+from ledgercomm.cache import ResponseCache
+from ledgercomm.fake_device import FakeDevice, ScriptedHandler
+
+OK = (0x9000, b"\x01\x02")
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> List[float]:
+    """Time seen by the cache, moved forward by the tests."""
+    now = [1000.0]
+    monkeypatch.setattr(cache_module, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def apdu(ins: int, p1: int = 0) -> bytes:
+    return bytes([0xE0, ins, p1, 0x00, 0x00])
+
+
+def test_only_registered_commands() -> None:
+    cache = ResponseCache()
+    cache.register(cla=0xE0, ins=0x01)
+
+    cache.put(apdu(0x01), OK)
+    cache.put(apdu(0x02), OK)
+
+    assert cache.cacheable(apdu(0x01)) and not cache.cacheable(apdu(0x02))
+    assert not cache.cacheable(b"\xe0")
+    assert cache.get(apdu(0x01)) == OK
+    assert len(cache) == 1
+
+
+def test_ttl_expiry(clock: List[float]) -> None:
+    cache = ResponseCache(ttl=10)
+    cache.register(cla=0xE0, ins=0x01)
+    cache.register(cla=0xE0, ins=0x02, ttl=1)
+    cache.register(cla=0xE0, ins=0x03, ttl=None)
+
+    for ins in (0x01, 0x02, 0x03):
+        cache.put(apdu(ins), OK)
+
+    clock[0] += 5
+    assert cache.get(apdu(0x01)) == OK
+    assert cache.get(apdu(0x02)) is None
+    assert cache.get(apdu(0x03)) == OK
+
+    clock[0] += 5
+    assert cache.get(apdu(0x01)) is None
+    # default ttl of the cache, 10 seconds here
+    assert cache.get(apdu(0x03)) is None
+    assert cache.stats() == {"hits": 2, "misses": 3, "evictions": 0, "size": 0}
+
+
+def test_ttl_without_expiration(clock: List[float]) -> None:
+    cache = ResponseCache(ttl=None)
+    cache.register(cla=0xE0, ins=0x01)
+    cache.put(apdu(0x01), OK)
+
+    clock[0] += 1e9
+    assert cache.get(apdu(0x01)) == OK
+
+
+def test_lru_eviction() -> None:
+    cache = ResponseCache(maxsize=3)
+    cache.register(cla=0xE0, ins=0x01)
+
+    for p1 in range(3):
+        cache.put(apdu(0x01, p1), (0x9000, bytes([p1])))
+    # most recently used now, so evicted last
+    assert cache.get(apdu(0x01, 0)) == (0x9000, b"\x00")
+
+    cache.put(apdu(0x01, 3), (0x9000, b"\x03"))
+    cache.put(apdu(0x01, 4), (0x9000, b"\x04"))
+
+    assert len(cache) == 3
+    assert cache.get(apdu(0x01, 1)) is None
+    assert cache.get(apdu(0x01, 2)) is None
+    assert [cache.get(apdu(0x01, p1)) is not None for p1 in (0, 3, 4)] == [True] * 3
+    assert cache.evictions == 2
+
+
+def test_invalid_maxsize() -> None:
+    with pytest.raises(ValueError):
+        ResponseCache(maxsize=0)
+
+
+@pytest.mark.parametrize("only_success", [True, False])
+def test_only_success(only_success: bool) -> None:
+    cache = ResponseCache(only_success=only_success)
+    cache.register(cla=0xE0, ins=0x01)
+
+    cache.put(apdu(0x01, 0), (0x6985, b""))
+    cache.put(apdu(0x01, 1), (0x9000, b""))
+
+    assert (cache.get(apdu(0x01, 0)) is not None) is not only_success
+    assert cache.get(apdu(0x01, 1)) == (0x9000, b"")
+
+
+def test_invalidate() -> None:
+    cache = ResponseCache()
+    cache.register(cla=0xE0, ins=0x01)
+    cache.register(cla=0xE0, ins=0x02)
+    cache.register(cla=0xB0, ins=0x01)
+
+    def fill() -> None:
+        for key in (apdu(0x01, 0), apdu(0x01, 1), apdu(0x02), b"\xb0\x01\x00\x00\x00"):
+            cache.put(key, OK)
+
+    fill()
+    assert cache.invalidate(apdu(0x01, 0)) == 1
+    assert cache.invalidate(apdu(0x01, 0)) == 0
+    assert cache.get(apdu(0x01, 0)) is None
+    assert cache.get(apdu(0x01, 1)) == OK
+
+    fill()
+    assert cache.invalidate(ins=0x01) == 3
+    assert len(cache) == 1
+
+    fill()
+    assert cache.invalidate(cla=0xE0, ins=0x02) == 1
+    assert cache.invalidate(cla=0xE0) == 2
+    assert cache.invalidate() == 1
+    assert len(cache) == 0
+
+    fill()
+    cache.unregister(cla=0xE0, ins=0x01)
+    assert len(cache) == 2
+    cache.put(apdu(0x01), OK)
+    assert len(cache) == 2
+
+
+def test_stats() -> None:
+    cache = ResponseCache(maxsize=1)
+    cache.register(cla=0xE0, ins=0x01)
+
+    assert cache.get(apdu(0x01, 0)) is None
+    cache.put(apdu(0x01, 0), OK)
+    assert cache.get(apdu(0x01, 0)) == OK
+    assert cache.get(apdu(0x01, 0)) == OK
+    cache.put(apdu(0x01, 1), OK)
+
+    assert cache.stats() == {"hits": 2, "misses": 1, "evictions": 1, "size": 1}
+
+    cache.clear()
+    assert cache.stats() == {"hits": 0, "misses": 0, "evictions": 0, "size": 0}
+
+
+def test_transport_cache() -> None:
+    cache = ResponseCache()
+    cache.register(cla=0xE0, ins=0x01)
+    handler = ScriptedHandler({b"\xe0\x01": OK, b"\xe0\x02": (0x6985, b"")})
+
+    with FakeDevice(handler=handler) as device:
+        transport = Transport(interface="tcp", server=device.server, port=device.port, cache=cache)
+
+        for _ in range(3):
+            assert transport.exchange(0xE0, 0x01) == OK
+            assert transport.exchange(0xE0, 0x02) == (0x6985, b"")
+        transport.close()
+
+        # failures are sent again, successes only once
+        assert device.exchanges == 4
+    assert cache.stats() == {"hits": 2, "misses": 1, "evictions": 0, "size": 1}
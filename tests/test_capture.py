@@ -0,0 +1,137 @@
+import logging
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+import pytest
+
+from ledgercomm import Transport
+from ledgercomm.capture import Capture, CaptureFormatError, Recorder
+from ledgercomm.fake_device import EchoHandler, FakeDevice, LatencyHandler
+from ledgercomm.interfaces.replay import ReplayComm, ReplayMismatchError
+
+APDUS = [bytes([0xE0, 0x01, i, 0x00, 0x01, i]) for i in range(5)]
+DELAY = 0.02
+
+
+def record(path: Path, apdus: List[bytes] = APDUS) -> List[Tuple[int, bytes]]:
+    """Record the exchanges of `apdus` with an echoing device answering after DELAY."""
+    with FakeDevice(handler=LatencyHandler(EchoHandler(), delay=DELAY)) as device:
+        with Recorder(path) as recorder:
+            transport = Transport(
+                interface="tcp", server=device.server, port=device.port, recorder=recorder
+            )
+            responses = [transport.exchange_raw(apdu) for apdu in apdus]
+            transport.close()
+
+    return responses
+
+
+def test_round_trip(tmp_path: Path) -> None:
+    path = tmp_path / "session.lcap"
+    responses = record(path)
+
+    with Capture(path) as capture:
+        assert len(capture) == len(APDUS)
+        assert [(r.apdu, (r.sw, r.rdata)) for r in capture] == list(zip(APDUS, responses))
+        assert all(r.duration >= DELAY for r in capture)
+        assert [r.start for r in capture] == sorted(r.start for r in capture)
+        assert capture[-1] == capture[len(APDUS) - 1]
+        assert capture[1:3] == [capture[1], capture[2]]
+        with pytest.raises(IndexError):
+            capture[len(APDUS)]  # pylint: disable=pointless-statement
+
+    transport = Transport(interface="replay", capture=path)
+    assert [transport.exchange_raw(apdu) for apdu in APDUS] == responses
+    transport.close()
+
+
+def test_replay_pipelined(tmp_path: Path) -> None:
+    path = tmp_path / "session.lcap"
+    responses = record(path)
+
+    transport = Transport(interface="replay", capture=path)
+    assert transport.exchange_many(APDUS, window=3) == responses
+    transport.close()
+
+
+def test_strict_mismatch(tmp_path: Path) -> None:
+    path = tmp_path / "session.lcap"
+    responses = record(path)
+
+    replay = ReplayComm(path)
+    replay.open()
+    assert replay.exchange(APDUS[0]) == responses[0]
+    with pytest.raises(ReplayMismatchError, match="exchange #1"):
+        replay.exchange(b"\xe0\x02\x00\x00\x00")
+    # the mismatch isn't consumed
+    assert replay.exchange(APDUS[1]) == responses[1]
+    with pytest.raises(ReplayMismatchError, match="No APDU sent"):
+        replay.recv()
+    replay.close()
+
+
+def test_lenient_mismatch(tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+    path = tmp_path / "session.lcap"
+    responses = record(path, APDUS[:2])
+
+    replay = ReplayComm(path, strict=False)
+    replay.open()
+    with caplog.at_level(logging.WARNING):
+        assert replay.exchange(b"\xe0\x02\x00\x00\x00") == responses[0]
+    assert "e002000000" in caplog.text
+    assert replay.exchange(APDUS[1]) == responses[1]
+    with pytest.raises(ReplayMismatchError, match="No more exchanges"):
+        replay.exchange(APDUS[0])
+    replay.close()
+
+
+def test_capture_without_trailer(tmp_path: Path) -> None:
+    path = tmp_path / "session.lcap"
+    responses = record(path)
+
+    # as left by a recorder which wasn't closed: no index nor trailer, last record cut
+    data = path.read_bytes()
+    path.write_bytes(data[: -(len(APDUS) * 8 + 16) - 1])
+
+    with Capture(path) as capture:
+        assert len(capture) == len(APDUS) - 1
+        assert [(r.sw, r.rdata) for r in capture] == responses[:-1]
+
+    transport = Transport(interface="replay", capture=path)
+    assert [transport.exchange_raw(apdu) for apdu in APDUS[:-1]] == responses[:-1]
+    transport.close()
+
+
+def test_invalid_capture(tmp_path: Path) -> None:
+    path = tmp_path / "session.lcap"
+
+    path.write_bytes(b"LCAP")
+    with pytest.raises(CaptureFormatError, match="too short"):
+        Capture(path)
+
+    path.write_bytes(b"PCAP" + bytes(12))
+    with pytest.raises(CaptureFormatError, match="not a capture"):
+        Capture(path)
+
+    with pytest.raises(ValueError):
+        ReplayComm(path, timing="slow")  # type: ignore
+
+
+@pytest.mark.parametrize("timing", ["fast", "original"])
+def test_replay_timing(tmp_path: Path, timing: str) -> None:
+    path = tmp_path / "session.lcap"
+    responses = record(path)
+    with Capture(path) as capture:
+        recorded: float = capture[-1].start + capture[-1].duration - capture[0].start
+
+    transport = Transport(interface="replay", capture=path, timing=timing)
+    start: float = time.monotonic()
+    assert [transport.exchange_raw(apdu) for apdu in APDUS] == responses
+    elapsed: float = time.monotonic() - start
+    transport.close()
+
+    if timing == "original":
+        assert elapsed >= recorded * 0.9
+    else:
+        assert elapsed < len(APDUS) * DELAY
@@ -0,0 +1,66 @@
+import queue
+from pathlib import Path
+from typing import Any, List
+
+import pytest
+
+from ledgercomm import Transport
+from ledgercomm.cli import corpus
+from ledgercomm.fake_device import FakeDevice
+
+
+def bad_script(tmp_path: Path) -> Path:
+    script = tmp_path / "bad.txt"
+    script.write_text("".join(f"e0{i:02x}000000\n" for i in range(20)) + "e0a\ne0ff000000\n")
+    return script
+
+
+def test_invalid_line_counts_apdus_sent(fake_device: FakeDevice, tmp_path: Path) -> None:
+    transport = Transport(interface="tcp", server=fake_device.server, port=fake_device.port)
+
+    result = corpus.run_script(transport, str(bad_script(tmp_path)), "fake", window=8)
+
+    assert (result.status, result.apdus) == ("error", 20)
+    assert result.error is not None and result.error.endswith(":21: invalid APDU 'e0a'")
+    assert fake_device.exchanges == 20
+    # the responses of the APDUs sent before were all received
+    assert transport.exchange(0xE0, 0xBB) == (0x9000, b"\xe0\xbb\x00\x00\x00")
+    transport.close()
+
+
+def test_validate_first(fake_device: FakeDevice, tmp_path: Path) -> None:
+    transport = Transport(interface="tcp", server=fake_device.server, port=fake_device.port)
+
+    result = corpus.run_script(transport, str(bad_script(tmp_path)), "fake", validate_first=True)
+
+    assert (result.status, result.apdus) == ("error", 0)
+    assert fake_device.exchanges == 0
+    transport.close()
+
+
+def test_worker_reopens_after_error(
+    fake_device: FakeDevice, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    opened: List[Transport] = []
+
+    class CountedTransport(Transport):
+        def __init__(self, **kwargs: Any) -> None:
+            super().__init__(**kwargs)
+            opened.append(self)
+
+    monkeypatch.setattr(corpus, "Transport", CountedTransport)
+    good = tmp_path / "good.txt"
+    good.write_text("e001000000\n")
+    tasks: "queue.Queue[Any]" = queue.Queue()
+    results: "queue.Queue[Any]" = queue.Queue()
+    for script in (bad_script(tmp_path), good, None):
+        tasks.put(script and str(script))
+
+    kwargs = {"interface": "tcp", "server": fake_device.server, "port": fake_device.port}
+    corpus._worker("fake", kwargs, {}, tasks, results)  # type: ignore
+
+    messages = [results.get_nowait() for _ in range(results.qsize())]
+    statuses = [value.status for kind, _, value in messages if kind == corpus._RESULT]
+    assert statuses == ["error", "passed"]
+    assert messages[-1][0] == corpus._DONE
+    assert len(opened) == 2
@@ -0,0 +1,43 @@
+import socket
+from pathlib import Path
+
+import pytest
+
+from ledgercomm import Transport
+from ledgercomm.fake_device import FakeDevice, ScriptedHandler
+
+
+def test_scripted_replies() -> None:
+    handler = ScriptedHandler({b"\xe0\x01": (0x9000, b"\x01\x02"), b"\xe0\x01\x01": (0x6985, b"")})
+
+    with FakeDevice(handler) as device:
+        transport = Transport(interface="tcp", server=device.server, port=device.port)
+
+        assert transport.exchange(0xE0, 0x01) == (0x9000, b"\x01\x02")
+        assert transport.exchange(0xE0, 0x01, p1=1) == (0x6985, b"")
+        assert transport.exchange(0xE0, 0x02) == (0x6D00, b"")
+        transport.close()
+
+
+def test_unix_socket_replaces_stale_socket(tmp_path: Path) -> None:
+    path = str(tmp_path / "fake.sock")
+    stale = socket.socket(socket.AF_UNIX)
+    stale.bind(path)
+    stale.close()
+
+    with FakeDevice(path=path):
+        transport = Transport(interface="unix", path=path)
+        assert transport.exchange(0xE0, 0x01) == (0x9000, b"\xe0\x01\x00\x00\x00")
+        transport.close()
+
+    assert not Path(path).exists()
+
+
+def test_unix_socket_keeps_other_files(tmp_path: Path) -> None:
+    path = tmp_path / "fake.sock"
+    path.write_text("not a socket")
+
+    with pytest.raises(FileExistsError):
+        FakeDevice(path=str(path)).start_thread()
+
+    assert path.read_text() == "not a socket"
@@ -0,0 +1,181 @@
+import threading
+from types import ModuleType
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from ledgercomm import Transport
+from ledgercomm.interfaces.hid_device import HID, CannotFindDeviceError
+from ledgercomm.interfaces.hid_discovery import DeviceEvent, HIDDiscovery, get_discovery
+from ledgercomm.metrics import InMemorySink
+from ledgercomm.pool import DevicePool
+
+
+def ledger(path: bytes, interface_number: int = 0) -> Dict[str, Any]:
+    return {
+        "path": path,
+        "vendor_id": 0x2C97,
+        "product_id": 0x4015,
+        "interface_number": interface_number,
+    }
+
+
+def test_cache_avoids_enumeration(fake_hid: ModuleType) -> None:
+    discovery = get_discovery()
+
+    assert HID.cached_devices() == [b"fakehid-0"]
+    Transport(interface="hid").close()
+    Transport(interface="hid").close()
+    assert discovery.enumerations == 1
+
+    # always enumerated again
+    assert HID.enumerate_devices() == [b"fakehid-0"]
+    assert discovery.enumerations == 2
+    assert HID.cached_devices(max_age=0) == [b"fakehid-0"]
+    assert discovery.enumerations == 3
+
+
+def test_enumerate_devices_sees_new_device(fake_hid: ModuleType) -> None:
+    assert HID.cached_devices() == [b"fakehid-0"]
+
+    fake_hid.DEVICES.append(ledger(b"fakehid-1"))
+
+    assert HID.cached_devices() == [b"fakehid-0"]
+    assert HID.enumerate_devices() == [b"fakehid-0", b"fakehid-1"]
+
+
+def test_open_device_plugged_after_cache(fake_hid: ModuleType) -> None:
+    devices = list(fake_hid.DEVICES)
+    fake_hid.DEVICES.clear()
+    assert HID.cached_devices() == []
+
+    fake_hid.DEVICES.extend(devices)
+    transport = Transport(interface="hid")
+
+    assert transport.com.path == b"fakehid-0"  # type: ignore
+    assert transport.exchange(0xE0, 0x01) == (0x9000, b"\xe0\x01\x00\x00\x00")
+    transport.close()
+
+
+def test_open_device_replaced_after_cache(
+    fake_hid: ModuleType, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    class Device(fake_hid.device):  # type: ignore
+        def open_path(self, path: bytes) -> None:
+            if path not in [info["path"] for info in fake_hid.DEVICES]:
+                raise OSError("open failed")
+
+    monkeypatch.setattr(fake_hid, "device", Device)
+    assert HID.cached_devices() == [b"fakehid-0"]
+
+    fake_hid.DEVICES[:] = [ledger(b"fakehid-1")]
+    transport = Transport(interface="hid")
+
+    assert transport.com.path == b"fakehid-1"  # type: ignore
+    transport.close()
+
+
+def test_open_without_device(fake_hid: ModuleType) -> None:
+    fake_hid.DEVICES.clear()
+
+    with pytest.raises(CannotFindDeviceError):
+        Transport(interface="hid")
+    assert get_discovery().enumerations == 2
+
+
+def test_refresh_events(fake_hid: ModuleType) -> None:
+    discovery = HIDDiscovery(hid_module=fake_hid)
+    events: List[DeviceEvent] = []
+    discovery.subscribe(events.append)
+
+    discovery.refresh()
+    # only the interface exchanging APDUs is reported
+    fake_hid.DEVICES.extend([ledger(b"fakehid-1"), ledger(b"fakehid-1-kbd", interface_number=1)])
+    discovery.refresh()
+    del fake_hid.DEVICES[0]
+    discovery.refresh()
+    discovery.refresh()
+
+    assert [(event.kind, event.path) for event in events] == [
+        ("added", b"fakehid-0"),
+        ("added", b"fakehid-1"),
+        ("removed", b"fakehid-0"),
+    ]
+
+    replayed: List[DeviceEvent] = []
+    discovery.subscribe(replayed.append, replay=True)
+    discovery.unsubscribe(events.append)
+    fake_hid.DEVICES.clear()
+    discovery.refresh()
+
+    assert [(event.kind, event.path) for event in replayed] == [
+        ("added", b"fakehid-1"),
+        ("removed", b"fakehid-1"),
+    ]
+    assert len(events) == 3
+
+
+def test_failing_subscriber(fake_hid: ModuleType) -> None:
+    discovery = HIDDiscovery(hid_module=fake_hid)
+    events: List[DeviceEvent] = []
+
+    def fail(event: DeviceEvent) -> None:
+        raise RuntimeError("subscriber failed")
+
+    discovery.subscribe(fail)
+    discovery.subscribe(events.append)
+
+    assert len(discovery.refresh()) == 1
+    assert len(events) == 1
+
+
+@pytest.mark.parametrize("watch", [False, True])
+def test_wait_for_device(fake_hid: ModuleType, watch: bool) -> None:
+    devices = list(fake_hid.DEVICES)
+    fake_hid.DEVICES.clear()
+    discovery = HIDDiscovery(hid_module=fake_hid, interval=0.01, backend="poll")
+    if watch:
+        discovery.start()
+
+    with pytest.raises(CannotFindDeviceError):
+        discovery.wait_for_device(timeout=0.05)
+
+    threading.Timer(0.05, fake_hid.DEVICES.extend, args=(devices,)).start()
+    assert discovery.wait_for_device(timeout=5) == b"fakehid-0"
+
+    threading.Timer(0.05, fake_hid.DEVICES.append, args=(ledger(b"fakehid-1"),)).start()
+    assert discovery.wait_for_device(timeout=5, path=b"fakehid-1") == b"fakehid-1"
+    discovery.stop()
+    assert not discovery.watching
+
+
+def test_watcher_keeps_cache(fake_hid: ModuleType) -> None:
+    with HIDDiscovery(hid_module=fake_hid, interval=0.01, backend="poll") as discovery:
+        discovery.wait_for_device(timeout=5)
+        enumerations = discovery.enumerations
+
+        # not refreshed when read while the watcher is running, whatever its age
+        for _ in range(100):
+            discovery.paths(max_age=1e-9)
+        assert discovery.enumerations - enumerations < 100
+
+
+@pytest.mark.parametrize("metrics", [None, InMemorySink()])
+def test_pool_follow(fake_hid: ModuleType, metrics: Optional[InMemorySink]) -> None:
+    discovery = HIDDiscovery(hid_module=fake_hid)
+    discovery.refresh()
+
+    with DevicePool.from_hid(paths=[b"fakehid-0"], metrics=metrics) as pool:
+        pool.follow(discovery)
+        # devices already seen are replayed, but not added twice
+        assert len(pool) == 1
+
+        fake_hid.DEVICES.append(ledger(b"fakehid-1"))
+        discovery.refresh()
+        discovery.refresh()
+        assert len(pool) == 2
+        assert pool.exchange(0xE0, 0x01).result() == (0x9000, b"\xe0\x01\x00\x00\x00")
+
+    fake_hid.DEVICES.append(ledger(b"fakehid-2"))
+    discovery.refresh()
+    assert len(pool) == 2
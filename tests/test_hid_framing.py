@@ -0,0 +1,90 @@
+from types import ModuleType
+
+import pytest
+
+from ledgercomm import Transport
+from ledgercomm.interfaces.hid_framing import (
+    HIDFrameDecoder,
+    HIDFrameEncoder,
+    HIDFramingError,
+)
+
+
+def reports_of(*parts: bytes) -> list:
+    # without report ID, reports have the layout of those read from a device
+    return [bytes(report) for report in HIDFrameEncoder(report_id=None).encode(*parts)]
+
+
+@pytest.mark.parametrize("size", [0, 1, 57, 58, 59, 64, 255, 1000, 0xFFFF])
+def test_round_trip(size: int) -> None:
+    data = bytes(i % 256 for i in range(size))
+    decoder = HIDFrameDecoder(buffer_size=16)
+
+    reports = reports_of(data)
+    assert all(len(report) <= 64 for report in reports)
+
+    done = [decoder.feed(report) for report in reports]
+
+    assert done == [False] * (len(reports) - 1) + [True]
+    assert decoder.data() == data
+
+
+def test_parts_are_encoded_as_one_apdu() -> None:
+    header, cdata = b"\xe0\x01\x00\x00\x80", bytes(range(128))
+
+    assert reports_of(header, cdata) == reports_of(header + cdata)
+
+
+def test_report_id_is_prepended() -> None:
+    report = bytes(next(HIDFrameEncoder().encode(b"\xe0\x01")))
+
+    assert report[0] == 0
+    assert report[1:] == reports_of(b"\xe0\x01")[0]
+
+
+def test_decoder_is_reusable_after_reset() -> None:
+    decoder = HIDFrameDecoder()
+
+    for data in (b"\xaa" * 300 + b"\x90\x00", b"\x6d\x00"):
+        decoder.reset()
+        for report in reports_of(data):
+            decoder.feed(report)
+        assert decoder.data() == data
+
+    assert decoder.response() == (0x6D00, b"")
+
+
+def test_out_of_sequence_report() -> None:
+    first, _, third = reports_of(bytes(150))
+    decoder = HIDFrameDecoder()
+    decoder.feed(first)
+
+    with pytest.raises(HIDFramingError, match="sequence index 2, expected 1"):
+        decoder.feed(third)
+
+
+def test_wrong_channel() -> None:
+    (report,) = reports_of(b"\x90\x00")
+
+    with pytest.raises(HIDFramingError, match="header"):
+        HIDFrameDecoder(channel=0x0102).feed(report)
+
+
+def test_apdu_too_long() -> None:
+    with pytest.raises(HIDFramingError):
+        list(HIDFrameEncoder().encode(bytes(0x10000)))
+
+
+@pytest.mark.parametrize("reader_thread", [False, True])
+@pytest.mark.parametrize("size", [0, 4, 255])
+def test_hid_exchange(fake_hid: ModuleType, reader_thread: bool, size: int) -> None:
+    cdata = bytes(range(size))
+    transport = Transport(interface="hid", reader_thread=reader_thread, timeout=1.0)
+
+    try:
+        assert transport.exchange(0xE0, 0x01, cdata=cdata) == (
+            0x9000,
+            bytes([0xE0, 0x01, 0x00, 0x00, size]) + cdata,
+        )
+    finally:
+        transport.close()
@@ -0,0 +1,102 @@
+import threading
+from types import ModuleType
+from typing import ClassVar, List
+
+import pytest
+
+from ledgercomm import Transport
+from ledgercomm.interfaces.hid_reader import HIDReader, HIDReaderOverflowError
+
+
+def held_back_device(fake_hid: ModuleType) -> type:
+    """Fake device sending only the first report of responses to INS 0xCC."""
+
+    class Device(fake_hid.device):  # type: ignore
+        held: ClassVar[List[bytes]] = []
+
+        def _respond(self, response: bytes) -> None:
+            super()._respond(response)
+            if response[1] == 0xCC:
+                first = self._reports.popleft()
+                self.held.extend(self._reports)
+                self._reports.clear()
+                self._reports.append(first)
+
+        def release(self) -> None:
+            self._reports.extend(self.held)
+            self.held.clear()
+
+    return Device
+
+
+def test_timeout_mid_response(fake_hid: ModuleType, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(fake_hid, "device", held_back_device(fake_hid))
+    transport = Transport(interface="hid", reader_thread=True, timeout=0.2)
+
+    with pytest.raises(TimeoutError):
+        transport.exchange(0xE0, 0xCC, cdata=bytes(200))
+
+    # the rest of the aborted response arrives late, before the next one
+    transport.com.device.release()  # type: ignore
+
+    assert transport.exchange(0xE0, 0xBB) == (0x9000, b"\xe0\xbb\x00\x00\x00")
+    transport.close()
+
+
+@pytest.mark.parametrize("reader_thread", [False, True])
+def test_leftovers_skipped(fake_hid: ModuleType, reader_thread: bool) -> None:
+    transport = Transport(interface="hid", reader_thread=reader_thread, timeout=1.0)
+    device = transport.com.device  # type: ignore
+
+    # continuation reports of an aborted response, then the next response
+    device._respond(b"\xe0\xcc" + bytes(200))
+    device._reports.popleft()
+    transport.send_raw("e0bb000000")
+
+    assert transport.recv() == (0x9000, b"\xe0\xbb\x00\x00\x00")
+    transport.close()
+
+
+def test_overflow_mid_response(fake_hid: ModuleType) -> None:
+    transport = Transport(
+        interface="hid", reader_thread=True, queue_size=2, overflow="drop_newest", timeout=1.0
+    )
+    transport.com.reader.stop()  # type: ignore
+    # 5 reports for 2 places in the queue
+    transport.send_raw(bytes(255))
+    transport.com.reader.start()  # type: ignore
+
+    with pytest.raises(HIDReaderOverflowError):
+        while True:
+            transport.recv()
+
+    assert transport.exchange(0xE0, 0xBB) == (0x9000, b"\xe0\xbb\x00\x00\x00")
+    transport.close()
+
+
+class FailingDevice:
+    def __init__(self) -> None:
+        self.reads = 0
+
+    def read(self, size: int, timeout_ms: int = 0) -> bytes:
+        self.reads += 1
+        if self.reads == 1:
+            raise OSError("read error")
+        threading.Event().wait(timeout_ms / 1000)
+        return b""
+
+
+def test_restart_resets_reader() -> None:
+    reader = HIDReader(FailingDevice(), poll_timeout_ms=10)
+    reader.start()
+
+    with pytest.raises(OSError):
+        reader.get(timeout=1.0)
+
+    reader.stop()
+    reader.start()
+
+    # the error of the previous session is gone
+    with pytest.raises(TimeoutError):
+        reader.get(timeout=0.05)
+    reader.stop()
@@ -0,0 +1,48 @@
+from ledgercomm.fake_device import FakeDevice
+from ledgercomm.history import HISTORY, ApduHistory
+from ledgercomm.interfaces.tcp_client import TCPClient
+
+
+def test_recv_view_copied_before_reuse(fake_device: FakeDevice) -> None:
+    HISTORY.clear()
+    client = TCPClient(fake_device.server, fake_device.port, buffer_size=64)
+    client.open()
+
+    client.send(b"\xe0\x01\x00\x00\x01\xaa")
+    sw, rdata = client.recv_view()
+    assert (sw, rdata.tobytes()) == (0x9000, b"\xe0\x01\x00\x00\x01\xaa")
+    # not copied while the receive buffer isn't written
+    assert HISTORY._entries[-1][3][0] is rdata
+
+    client.send(b"\xe0\x02\x00\x00\x01\xbb")
+    assert client.recv_view()[0] == 0x9000
+    # larger than the buffer, grown
+    client.send(b"\xe0\x03\x00\x00\x80" + bytes(128))
+    assert client.recv_view()[0] == 0x9000
+    client.close()
+
+    assert [line.split(" ", 1)[1] for line in HISTORY.lines()] == [
+        "TCPClient => e001000001aa",
+        "TCPClient <= e001000001aa 9000",
+        "TCPClient => e002000001bb",
+        "TCPClient <= e002000001bb 9000",
+        # only the beginning of large APDUs
+        "TCPClient => e003000080" + "00" * 27 + "... (133 bytes)",
+        "TCPClient <= e003000080" + "00" * 128 + " 9000",
+    ]
+
+
+def test_sent_parts_not_kept() -> None:
+    history = ApduHistory(prefix=8)
+    cdata = bytearray(b"\xaa" * 100)
+
+    history.sent("HID", (b"\xe0\x01\x00\x00", b"\x64", memoryview(cdata)))
+    history.sent("HID", (b"\xe0\x02\x00\x00\x00",))
+    history.sent("HID", (memoryview(b"\xe0\x03\x00\x00\x01"), bytearray(b"\xbb")))
+    cdata[:] = bytes(100)
+
+    assert [line.split(" ", 1)[1] for line in history.lines()] == [
+        "HID => e001000064aaaaaa... (105 bytes)",
+        "HID => e002000000",
+        "HID => e003000001bb",
+    ]
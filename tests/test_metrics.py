@@ -0,0 +1,72 @@
+from types import ModuleType
+from typing import Callable
+
+import pytest
+
+from ledgercomm import Transport
+from ledgercomm.fake_device import FakeDevice
+from ledgercomm.interfaces.hid_reader import HIDReaderOverflowError
+from ledgercomm.metrics import InMemorySink
+
+
+@pytest.mark.parametrize(
+    "send",
+    [
+        lambda transport: transport.send_raw(b""),
+        lambda transport: transport.com.send_parts(),
+        lambda transport: transport.com.send_many([b"\xe0\xaa\x00\x00\x00", b""]),
+    ],
+)
+def test_failed_send_not_accounted(
+    fake_device: FakeDevice, send: Callable[[Transport], None]
+) -> None:
+    metrics = InMemorySink()
+    transport = Transport(
+        interface="tcp", server=fake_device.server, port=fake_device.port, metrics=metrics
+    )
+
+    with pytest.raises(ValueError):
+        send(transport)
+    assert transport.exchange(0xE0, 0xBB) == (0x9000, b"\xe0\xbb\x00\x00\x00")
+
+    assert metrics.snapshot()["exchanges"] == {("tcp", 0xE0, 0xBB, 0x9000): 1}
+    transport.close()
+
+
+def test_failed_recv_not_paired(fake_hid: ModuleType) -> None:
+    metrics = InMemorySink()
+    transport = Transport(
+        interface="hid",
+        reader_thread=True,
+        queue_size=2,
+        overflow="drop_newest",
+        timeout=1.0,
+        metrics=metrics,
+    )
+    transport.com.com.reader.stop()  # type: ignore
+    # 5 reports for 2 places in the queue
+    transport.send_raw(b"\xe0\xaa" + bytes(253))
+    transport.com.com.reader.start()  # type: ignore
+
+    with pytest.raises(HIDReaderOverflowError):
+        transport.recv()
+    assert transport.exchange(0xE0, 0xBB) == (0x9000, b"\xe0\xbb\x00\x00\x00")
+
+    assert metrics.snapshot()["exchanges"] == {("hid", 0xE0, 0xBB, 0x9000): 1}
+    transport.close()
+
+
+def test_parts_accounted_without_join(fake_device: FakeDevice) -> None:
+    metrics = InMemorySink()
+    transport = Transport(
+        interface="tcp", server=fake_device.server, port=fake_device.port, metrics=metrics
+    )
+    cdata = bytearray(200)
+
+    transport.com.send_parts(b"\xe0", memoryview(b"\xcc\x00\x00"), b"\xc8", memoryview(cdata))
+    assert transport.recv() == (0x9000, b"\xe0\xcc\x00\x00\xc8" + cdata)
+
+    snapshot = metrics.snapshot()
+    assert snapshot["exchanges"] == {("tcp", 0xE0, 0xCC, 0x9000): 1}
+    assert snapshot["bytes_sent"] == {"tcp": 205}
+    transport.close()
@@ -0,0 +1,94 @@
+import threading
+import time
+import zlib
+from concurrent.futures import Future
+from types import ModuleType
+from typing import Iterator, List
+
+import pytest
+
+from ledgercomm import Transport
+from ledgercomm.pool import DevicePool
+
+PATHS = [b"fakehid-0", b"fakehid-1", b"fakehid-2"]
+
+
+@pytest.fixture
+def transports(fake_hid: ModuleType) -> Iterator[List[Transport]]:
+    transports = [Transport(interface="hid", path=path) for path in PATHS]
+    yield transports
+    for transport in transports:
+        transport.close()
+
+
+def device(pool: DevicePool, gate: threading.Event) -> "Future[int]":
+    """Job waiting for `gate`, whose result is the index of its device."""
+
+    def job(transport: Transport) -> int:
+        gate.wait(timeout=5)
+        return pool.transports.index(transport)
+
+    return pool.submit(job)
+
+
+def wait_loads(pool: DevicePool, loads: List[int]) -> None:
+    deadline = time.monotonic() + 5
+    while pool.loads != loads and time.monotonic() < deadline:
+        time.sleep(0.001)
+    assert pool.loads == loads
+
+
+def test_round_robin(transports: List[Transport]) -> None:
+    pool = DevicePool(transports, strategy="round_robin")
+    gate = threading.Event()
+    gate.set()
+
+    assert [device(pool, gate).result() for _ in range(7)] == [0, 1, 2, 0, 1, 2, 0]
+    pool.close()
+
+
+def test_least_loaded(transports: List[Transport]) -> None:
+    pool = DevicePool(transports, strategy="least_loaded")
+    gates = [threading.Event() for _ in range(5)]
+
+    futures = [device(pool, gate) for gate in gates[:3]]
+    wait_loads(pool, [1, 1, 1])
+    gates[1].set()
+    assert futures[1].result() == 1
+    wait_loads(pool, [1, 0, 1])
+
+    # the idle device, then the lowest index of equally loaded ones
+    futures += [device(pool, gate) for gate in gates[3:]]
+    assert pool.loads == [2, 1, 1]
+
+    for gate in gates:
+        gate.set()
+    assert [future.result() for future in futures] == [0, 1, 2, 1, 0]
+    wait_loads(pool, [0, 0, 0])
+    pool.close()
+
+
+def test_affinity(transports: List[Transport]) -> None:
+    pool = DevicePool(transports, strategy="affinity")
+    keys = ["alice", "bob", ("account", 44), 1234]
+
+    for key in keys:
+        indexes = {
+            pool.submit(lambda transport: pool.transports.index(transport), key=key).result()
+            for _ in range(5)
+        }
+        assert indexes == {zlib.crc32(repr(key).encode()) % len(PATHS)}
+
+    # jobs without key go to the least loaded device
+    gate = threading.Event()
+    futures = [device(pool, gate) for _ in range(3)]
+    gate.set()
+    assert [future.result() for future in futures] == [0, 1, 2]
+    pool.close()
+
+
+def test_invalid_pool(transports: List[Transport]) -> None:
+    with pytest.raises(ValueError):
+        DevicePool([])
+    with pytest.raises(ValueError):
+        DevicePool(transports, strategy="random")  # type: ignore
@@ -0,0 +1,174 @@
+import socket
+import threading
+from typing import Iterator, List
+
+import pytest
+
+from ledgercomm import Transport
+from ledgercomm.fake_device import FakeDevice
+from ledgercomm.interfaces.tcp_client import TCPClient
+from ledgercomm.reconnect import (
+    ConnectionEvent,
+    ConnectionLostError,
+    ConnectionState,
+    ReconnectPolicy,
+)
+
+
+class Restartable:
+    """Fake device which can be stopped and started again on the same port."""
+
+    def __init__(self) -> None:
+        self.device = FakeDevice()
+        self.device.start_thread()
+        self.port = self.device.port
+
+    def stop(self) -> None:
+        self.device.stop_thread()
+
+    def restart(self, delay: float = 0.0) -> None:
+        def start() -> None:
+            self.device = FakeDevice(port=self.port)
+            self.device.start_thread()
+
+        if delay:
+            timer = threading.Timer(delay, start)
+            timer.start()
+        else:
+            start()
+
+
+@pytest.fixture
+def server() -> Iterator[Restartable]:
+    restartable = Restartable()
+    yield restartable
+    restartable.stop()
+
+
+def connect(server: Restartable, policy: ReconnectPolicy) -> Transport:
+    return Transport(interface="tcp", port=server.port, reconnect=policy)
+
+
+def test_retryable_apdu_recovered(server: Restartable) -> None:
+    policy = ReconnectPolicy(initial_delay=0.01, max_delay=0.05)
+    policy.register(cla=0xE0, ins=0x01)
+    transport = connect(server, policy)
+    assert transport.exchange(0xE0, 0x01) == (0x9000, b"\xe0\x01\x00\x00\x00")
+
+    server.stop()
+    server.restart(delay=0.1)
+
+    assert transport.exchange(0xE0, 0x01, p1=1) == (0x9000, b"\xe0\x01\x01\x00\x00")
+    assert server.device.exchanges == 1
+
+    stats = transport.connection.stats()  # type: ignore
+    assert (stats["state"], stats["connections"], stats["disconnections"]) == ("connected", 2, 1)
+    assert stats["retries"] == 1 and stats["failures"] == 0
+    assert stats["last_downtime"] > 0
+    transport.close()
+
+
+def test_non_retryable_apdu_lost(server: Restartable) -> None:
+    policy = ReconnectPolicy(initial_delay=0.01, max_delay=0.05)
+    policy.register(cla=0xE0, ins=0x01)
+    transport = connect(server, policy)
+    assert transport.exchange(0xE0, 0x02) == (0x9000, b"\xe0\x02\x00\x00\x00")
+
+    server.stop()
+    server.restart(delay=0.1)
+
+    # the device may have executed it, not sent again
+    with pytest.raises(ConnectionLostError):
+        transport.exchange(0xE0, 0x02)
+    assert transport.exchange(0xE0, 0x02, p1=1) == (0x9000, b"\xe0\x02\x01\x00\x00")
+    assert server.device.exchanges == 1
+
+    stats = transport.connection.stats()  # type: ignore
+    assert (stats["retries"], stats["failures"]) == (0, 1)
+    transport.close()
+
+
+def test_pipelined_apdus_recovered(server: Restartable) -> None:
+    policy = ReconnectPolicy(initial_delay=0.01, max_delay=0.05)
+    policy.register(cla=0xE0, ins=0x01)
+    transport = connect(server, policy)
+    apdus = [bytes([0xE0, 0x01, i, 0, 0]) for i in range(16)]
+
+    transport.send_raw(apdus[0])
+    assert transport.recv() == (0x9000, apdus[0])
+    server.stop()
+    server.restart(delay=0.05)
+
+    assert transport.exchange_many(apdus, window=4) == [(0x9000, apdu) for apdu in apdus]
+    transport.close()
+
+
+def test_give_up_then_reconnect(server: Restartable) -> None:
+    policy = ReconnectPolicy(initial_delay=0.01, max_delay=0.01, max_attempts=3)
+    transport = connect(server, policy)
+    events: List[ConnectionEvent] = []
+    transport.connection.subscribe(events.append)  # type: ignore
+    server.stop()
+
+    with pytest.raises(ConnectionLostError):
+        transport.exchange(0xE0, 0x01)
+    # no server, every attempt fails
+    with pytest.raises(ConnectionLostError, match="Can't connect"):
+        transport.exchange(0xE0, 0x01)
+
+    server.restart()
+    assert transport.exchange(0xE0, 0x01) == (0x9000, b"\xe0\x01\x00\x00\x00")
+    transport.close()
+
+    assert [(event.state, event.attempts) for event in events] == [
+        (ConnectionState.RECONNECTING, 0),
+        (ConnectionState.DISCONNECTED, 3),
+        (ConnectionState.RECONNECTING, 0),
+        (ConnectionState.CONNECTED, 1),
+        (ConnectionState.CLOSED, 0),
+    ]
+    assert isinstance(events[1].error, ConnectionRefusedError)
+    assert events[3].downtime > 0
+
+    with pytest.raises(ConnectionLostError, match="closed"):
+        transport.connection.open()  # type: ignore
+
+
+def test_delay() -> None:
+    policy = ReconnectPolicy(initial_delay=0.1, max_delay=1.0, multiplier=2.0, jitter=0.0)
+    assert [policy.delay(attempt) for attempt in range(1, 7)] == pytest.approx(
+        [0.1, 0.2, 0.4, 0.8, 1.0, 1.0]
+    )
+
+    jittered = ReconnectPolicy(initial_delay=1.0, max_delay=1.0, jitter=0.5)
+    assert all(0.5 <= jittered.delay(1) <= 1.0 for _ in range(100))
+
+    with pytest.raises(ValueError):
+        ReconnectPolicy(jitter=2)
+    with pytest.raises(ValueError):
+        ReconnectPolicy(max_attempts=0)
+
+
+def test_retryable() -> None:
+    policy = ReconnectPolicy()
+    policy.register(cla=0xE0, ins=0x01)
+
+    assert policy.retryable(b"\xe0\x01\x00\x00\x00")
+    assert not policy.retryable(b"\xe0\x02\x00\x00\x00")
+    assert not policy.retryable(b"\xe0")
+
+    policy.unregister(cla=0xE0, ins=0x01)
+    assert not policy.retryable(b"\xe0\x01\x00\x00\x00")
+
+
+def test_failed_open_closes_socket() -> None:
+    with socket.socket() as listener:
+        listener.bind(("127.0.0.1", 0))
+        port = listener.getsockname()[1]
+    client = TCPClient("127.0.0.1", port)
+
+    with pytest.raises(ConnectionRefusedError):
+        client.open()
+    client.close()
+
+    assert client.socket.fileno() == -1
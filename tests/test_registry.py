@@ -0,0 +1,98 @@
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from ledgercomm import Transport
+from ledgercomm.fake_device import FakeDevice
+from ledgercomm.interfaces import registry
+from ledgercomm.interfaces.registry import (
+    available_interfaces,
+    get_interface,
+    register_interface,
+    unregister_interface,
+)
+from ledgercomm.interfaces.tcp_client import TCPClient
+
+
+@pytest.fixture
+def clean_registry(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Registry with built-in interfaces only, entry points not looked up yet."""
+    monkeypatch.setattr(registry, "_registry", dict(registry.BUILTIN_INTERFACES))
+    monkeypatch.setattr(registry, "_entry_points_loaded", False)
+
+
+@pytest.fixture
+def plugin(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, clean_registry: None) -> Iterator[None]:
+    """Installed distribution with interfaces in the entry point group."""
+    (tmp_path / "fake_plugin.py").write_text(
+        textwrap.dedent(
+            """
+            from ledgercomm.interfaces.tcp_client import TCPClient
+
+            def connect(address):
+                server, port = address.rsplit(":", 1)
+                return TCPClient(server=server, port=int(port))
+            """
+        )
+    )
+    dist_info = tmp_path / "fake_plugin-1.0.dist-info"
+    dist_info.mkdir()
+    (dist_info / "METADATA").write_text("Metadata-Version: 2.1\nName: fake-plugin\nVersion: 1.0\n")
+    (dist_info / "entry_points.txt").write_text(
+        "[ledgercomm.interfaces]\nFake = fake_plugin:connect\ntcp = fake_plugin:connect\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield
+    sys.modules.pop("fake_plugin", None)
+
+
+def test_entry_point(plugin: None, fake_device: FakeDevice) -> None:
+    assert "fake_plugin" not in sys.modules
+    assert "fake" in available_interfaces()
+    # listed without being imported
+    assert "fake_plugin" not in sys.modules
+
+    transport = Transport(interface="fake", address=f"{fake_device.server}:{fake_device.port}")
+    assert transport.interface is None
+    assert transport.interface_name == "fake"
+    assert transport.exchange(0xE0, 0x01) == (0x9000, b"\xe0\x01\x00\x00\x00")
+    transport.close()
+
+    # built-in interfaces take precedence
+    assert get_interface("tcp") is TCPClient
+
+
+def test_register_interface(clean_registry: None) -> None:
+    register_interface("Speculos", TCPClient)
+    assert get_interface("speculos") is TCPClient
+
+    with pytest.raises(ValueError, match="already registered"):
+        register_interface("speculos", "ledgercomm.interfaces.unix_socket:UnixClient")
+    register_interface("speculos", "ledgercomm.interfaces.unix_socket:UnixClient", replace=True)
+    assert get_interface("SPECULOS").__name__ == "UnixClient"
+
+    unregister_interface("speculos")
+    with pytest.raises(KeyError, match="Unknown interface"):
+        get_interface("speculos")
+    with pytest.raises(KeyError, match="Unknown interface"):
+        unregister_interface("speculos")
+
+
+def test_transport_imports_no_interface() -> None:
+    code = (
+        "import sys, ledgercomm.transport; "
+        "print(sorted({'hid', 'socket', 'asyncio'} & set(sys.modules)))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).resolve().parent.parent,
+    )
+
+    assert result.stdout.strip() == "[]"
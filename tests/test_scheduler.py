@@ -0,0 +1,105 @@
+import threading
+import time
+from concurrent.futures import Future
+from typing import Iterator, List
+
+import pytest
+
+from ledgercomm import Transport
+from ledgercomm.fake_device import FakeDevice
+from ledgercomm.scheduler import DeadlineExpiredError, Priority, ScheduledTransport
+
+
+@pytest.fixture
+def scheduled(fake_device: FakeDevice) -> Iterator[ScheduledTransport]:
+    with ScheduledTransport(
+        Transport(interface="tcp", server=fake_device.server, port=fake_device.port)
+    ) as scheduled:
+        yield scheduled
+
+
+def block(scheduled: ScheduledTransport) -> threading.Event:
+    """Keep the scheduler busy until the event returned is set."""
+    started, gate = threading.Event(), threading.Event()
+
+    def job(transport: Transport) -> None:
+        started.set()
+        gate.wait(timeout=5)
+
+    scheduled.submit(job)
+    assert started.wait(timeout=5)
+
+    return gate
+
+
+def test_priority_then_fifo(scheduled: ScheduledTransport) -> None:
+    order: List[str] = []
+    gate = block(scheduled)
+
+    futures: List[Future] = []
+    for name, priority in [
+        ("bulk-0", Priority.BULK),
+        ("normal-0", Priority.NORMAL),
+        ("bulk-1", Priority.BULK),
+        ("interactive-0", Priority.INTERACTIVE),
+        ("normal-1", Priority.NORMAL),
+        ("interactive-1", Priority.INTERACTIVE),
+        ("bulk-2", Priority.BULK),
+    ]:
+        futures.append(
+            scheduled.submit(lambda transport, name=name: order.append(name), priority=priority)
+        )
+
+    assert scheduled.stats()["depth_by_priority"] == {0: 2, 5: 2, 10: 3}
+    gate.set()
+    for future in futures:
+        future.result(timeout=5)
+
+    assert order == [
+        "interactive-0",
+        "interactive-1",
+        "normal-0",
+        "normal-1",
+        "bulk-0",
+        "bulk-1",
+        "bulk-2",
+    ]
+    assert scheduled.stats()["max_depth"] == 7
+
+
+def test_exchange_through_scheduler(scheduled: ScheduledTransport) -> None:
+    assert scheduled.exchange(0xE0, 0x01, priority=Priority.INTERACTIVE) == (
+        0x9000,
+        b"\xe0\x01\x00\x00\x00",
+    )
+    assert scheduled.exchange_raw("e0020000", timeout=5) == (0x9000, b"\xe0\x02\x00\x00")
+
+
+def test_deadline_expired(scheduled: ScheduledTransport) -> None:
+    gate = block(scheduled)
+    ran: List[str] = []
+
+    expired = scheduled.submit(lambda transport: ran.append("expired"), timeout=0.01)
+    in_time = scheduled.submit(lambda transport: ran.append("in time"), timeout=60)
+    time.sleep(0.05)
+    gate.set()
+
+    with pytest.raises(DeadlineExpiredError, match="Deadline expired"):
+        expired.result(timeout=5)
+    # subclass of the builtin, for callers catching timeouts
+    assert isinstance(expired.exception(), TimeoutError)
+    in_time.result(timeout=5)
+
+    assert ran == ["in time"]
+    stats = scheduled.stats()
+    assert (stats["executed"], stats["expired"]) == (2, 1)
+
+
+def test_submit_after_close(fake_device: FakeDevice) -> None:
+    scheduled = ScheduledTransport(
+        Transport(interface="tcp", server=fake_device.server, port=fake_device.port)
+    )
+    scheduled.close()
+
+    with pytest.raises(RuntimeError, match="closed"):
+        scheduled.submit(lambda transport: None)
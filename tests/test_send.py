@@ -0,0 +1,138 @@
+import io
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+from ledgercomm.cli import send
+from ledgercomm.fake_device import FakeDevice
+
+
+class CountingReader(io.StringIO):
+    def __init__(self, text: str) -> None:
+        super().__init__(text)
+        self.reads = 0
+
+    def read(self, size: int = -1) -> str:  # type: ignore
+        self.reads += 1
+        return super().read(size)
+
+
+ENTRIES: List[Dict[str, Any]] = [
+    {"type": "apdu", "message": "=> e001000000", "n": -12.5e-3, "ok": True},
+    {"type": "log", "message": 'café 😀 "quoted" \\', "x": None, "no": False, "v": [1, {}]},
+    {"type": "apdu", "message": "=> e00200000401020304", "big": 12345678901234567890},
+]
+
+
+@pytest.mark.parametrize("lines", [False, True])
+def test_json_entries_split_anywhere(lines: bool) -> None:
+    text = "\n".join(json.dumps(e) for e in ENTRIES) if lines else json.dumps(ENTRIES, indent=1)
+
+    for chunk_size in range(1, len(text) + 1):
+        assert list(send._json_entries(io.StringIO(text), chunk_size)) == ENTRIES
+
+
+def test_json_entries_invalid_entry_raises_early() -> None:
+    text = '{"type": "apdu"}\n{"type": "apdu" "message": ""}\n' + '{"type": "log"}\n' * 10000
+    f = CountingReader(text)
+
+    with pytest.raises(json.JSONDecodeError):
+        list(send._json_entries(f, chunk_size=64))
+    assert f.reads == 1
+
+
+def test_json_entries_long_entry_linear() -> None:
+    text = json.dumps({"message": "x" * 100000})
+    f = CountingReader(text)
+
+    assert list(send._json_entries(f, chunk_size=16)) == [json.loads(text)]
+    assert f.reads < 20
+
+
+def run(monkeypatch: pytest.MonkeyPatch, device: FakeDevice, *args: str) -> int:
+    monkeypatch.setattr(
+        sys, "argv", ["ledgercomm-send", "--port", str(device.port), "--quiet", *args]
+    )
+    return send.main()
+
+
+def test_invalid_line_after_responses(
+    monkeypatch: pytest.MonkeyPatch, fake_device: FakeDevice, tmp_path: Path
+) -> None:
+    script = tmp_path / "script.txt"
+    script.write_text("e001000000\ne002000000\ne003000000\ne0a\ne004000000\n")
+    output = tmp_path / "results.jsonl"
+
+    assert run(monkeypatch, fake_device, "-o", str(output), "file", str(script)) == 2
+
+    results = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [(r["line"], r["apdu"]) for r in results] == [
+        (1, "e001000000"),
+        (2, "e002000000"),
+        (3, "e003000000"),
+    ]
+    assert fake_device.exchanges == 3
+
+
+def test_validate_first(
+    monkeypatch: pytest.MonkeyPatch,
+    fake_device: FakeDevice,
+    tmp_path: Path,
+    capsys: pytest.CaptureFixture,
+) -> None:
+    script = tmp_path / "script.txt"
+    script.write_text("e001000000\ne0a\n")
+    output = tmp_path / "results.jsonl"
+
+    args = ("-o", str(output), "--validate-first", "file", str(script))
+    assert run(monkeypatch, fake_device, *args) == 2
+
+    assert f"{script}:2: invalid APDU 'e0a'" in capsys.readouterr().err
+    assert not output.exists()
+    assert fake_device.exchanges == 0
+
+
+SCRIPT = [
+    "# comment\n",
+    "=> E0 01 00 00 00\n",
+    "<= 9000\n",
+    "\n",
+    "=> e0-02-00-00-00\n",
+    "ca:fe\n",
+]
+
+
+def test_parse_lines_strips_non_hex() -> None:
+    assert list(send.parse_lines(SCRIPT, "=>")) == [
+        (2, b"\xe0\x01\x00\x00\x00"),
+        # other lines are sent too, as before --strict
+        (3, b"\x90\x00"),
+        (5, b"\xe0\x02\x00\x00\x00"),
+        (6, b"\xca\xfe"),
+    ]
+
+
+def test_parse_lines_strict() -> None:
+    assert list(send.parse_lines(SCRIPT[:4], "=>", strict=True)) == [(2, b"\xe0\x01\x00\x00\x00")]
+
+    with pytest.raises(send.InvalidInputError, match="<stdin>:5: invalid APDU 'e0-02-00-00-00'"):
+        list(send.parse_lines(SCRIPT, "=>", strict=True))
+    with pytest.raises(send.InvalidInputError, match="<stdin>:1: invalid APDU 'not sent'"):
+        list(send.parse_lines(["not sent\n"], None, strict=True))
+
+
+def test_strict_option(
+    monkeypatch: pytest.MonkeyPatch, fake_device: FakeDevice, tmp_path: Path
+) -> None:
+    script = tmp_path / "script.txt"
+    script.write_text("".join(SCRIPT[:4]))
+    output = tmp_path / "results.jsonl"
+
+    args = ("-o", str(output), "--startswith", "=>", "--strict", "file", str(script))
+    assert run(monkeypatch, fake_device, *args) == 0
+
+    results = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [(r["line"], r["apdu"]) for r in results] == [(2, "e001000000")]
@@ -0,0 +1,122 @@
+import threading
+from typing import Dict, List, Tuple
+
+import pytest
+
+from ledgercomm import Transport
+from ledgercomm.fake_device import EchoHandler, FakeDevice, LatencyHandler
+from ledgercomm.singleflight import SingleFlight
+
+THREADS = 8
+SHARED = "e002000000"
+
+
+def run_threads(transport: Transport, apdus: List[str]) -> Dict[int, Tuple[int, bytes]]:
+    barrier = threading.Barrier(len(apdus))
+    responses: Dict[int, Tuple[int, bytes]] = {}
+
+    def run(i: int, apdu: str) -> None:
+        barrier.wait()
+        responses[i] = transport.exchange_raw(apdu)
+
+    threads = [threading.Thread(target=run, args=item) for item in enumerate(apdus)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return responses
+
+
+def test_coalescing_with_other_apdus_in_flight() -> None:
+    single_flight = SingleFlight()
+    single_flight.register(cla=0xE0, ins=0x02)
+
+    with FakeDevice(LatencyHandler(EchoHandler(), delay=0.02)) as device:
+        transport = Transport(
+            interface="tcp", server=device.server, port=device.port, single_flight=single_flight
+        )
+        # identical registered APDUs interleaved with distinct ones
+        apdus = [apdu for i in range(THREADS) for apdu in (SHARED, f"e0aa00{i:02x}00")]
+
+        responses = run_threads(transport, apdus)
+
+        # every thread got the response to its own APDU, frames were not mixed
+        assert responses == {i: (0x9000, bytes.fromhex(apdu)) for i, apdu in enumerate(apdus)}
+        assert single_flight.followers > 0
+        assert device.exchanges == single_flight.leaders + THREADS
+        assert transport.exchange_raw("e0bb000000") == (0x9000, bytes.fromhex("e0bb000000"))
+        transport.close()
+
+
+def test_exchange_during_iteration_is_refused(fake_device: FakeDevice) -> None:
+    transport = Transport(interface="tcp", server=fake_device.server, port=fake_device.port)
+
+    with pytest.raises(RuntimeError, match="exchange_iter"):
+        for _ in transport.exchange_iter(["e0aa000000"] * 4, window=4):
+            transport.exchange_raw("e0bb000000")
+
+    assert transport.exchange_raw("e0bb000000") == (0x9000, bytes.fromhex("e0bb000000"))
+    transport.close()
+
+
+def test_other_threads_wait_for_iteration(fake_device: FakeDevice) -> None:
+    transport = Transport(interface="tcp", server=fake_device.server, port=fake_device.port)
+    responses: List[Tuple[int, bytes]] = []
+    other = threading.Thread(target=lambda: responses.append(transport.exchange_raw("e0bb00")))
+
+    for i, response in enumerate(transport.exchange_iter(["e0aa00"] * 16, window=8)):
+        if i == 0:
+            other.start()
+        assert response == (0x9000, bytes.fromhex("e0aa00"))
+
+    other.join()
+    assert responses == [(0x9000, bytes.fromhex("e0bb00"))]
+    transport.close()
+
+
+def test_iteration_resumed_by_other_thread(fake_device: FakeDevice) -> None:
+    transport = Transport(interface="tcp", server=fake_device.server, port=fake_device.port)
+    responses = transport.exchange_iter(["e0aa000000"] * 16, window=8)
+    assert next(responses) == (0x9000, bytes.fromhex("e0aa000000"))
+    errors: List[BaseException] = []
+
+    def resume() -> None:
+        try:
+            next(responses)
+        except RuntimeError as exc:
+            errors.append(exc)
+
+    other = threading.Thread(target=resume)
+    other.start()
+    other.join()
+
+    assert len(errors) == 1 and "resumed" in str(errors[0])
+    # the iteration is over, responses in flight were read
+    assert transport.exchange_raw("e0bb000000") == (0x9000, bytes.fromhex("e0bb000000"))
+    transport.close()
+
+
+def test_iteration_closed_by_other_thread(fake_device: FakeDevice) -> None:
+    transport = Transport(interface="tcp", server=fake_device.server, port=fake_device.port)
+    # not started, doesn't hold the transport
+    transport.exchange_iter(["e0aa000000"])
+    responses = transport.exchange_iter(["e0aa000000"] * 16, window=8)
+    next(responses)
+
+    errors: List[BaseException] = []
+
+    def close() -> None:
+        try:
+            responses.close()
+        except RuntimeError as exc:
+            errors.append(exc)
+
+    # e.g. garbage collected in another thread
+    other = threading.Thread(target=close)
+    other.start()
+    other.join()
+
+    assert not errors
+    assert transport.exchange_raw("e0bb000000") == (0x9000, bytes.fromhex("e0bb000000"))
+    transport.close()
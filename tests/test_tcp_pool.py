@@ -0,0 +1,52 @@
+import socket
+from typing import List
+
+import pytest
+
+from ledgercomm import tcp_pool
+from ledgercomm.fake_device import FakeDevice
+from ledgercomm.interfaces.tcp_client import TCPClient
+from ledgercomm.tcp_pool import NoHealthyEndpointError, TCPPool
+
+
+def unused_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def clients(monkeypatch: pytest.MonkeyPatch) -> List[TCPClient]:
+    created: List[TCPClient] = []
+
+    class RecordedClient(TCPClient):
+        def __init__(self, *args, **kwargs) -> None:  # type: ignore
+            super().__init__(*args, **kwargs)
+            created.append(self)
+
+    monkeypatch.setattr(tcp_pool, "TCPClient", RecordedClient)
+
+    return created
+
+
+def test_failed_connection_closes_socket(clients: List[TCPClient]) -> None:
+    pool = TCPPool([("127.0.0.1", unused_port())], reconnect_interval=0)
+
+    assert not pool.endpoints[0].healthy
+    with pytest.raises(NoHealthyEndpointError):
+        pool.exchange_raw("e001000000")
+
+    assert len(clients) == 2
+    assert all(client.socket.fileno() == -1 for client in clients)
+    pool.close()
+
+
+def test_ejected_endpoint_is_skipped(fake_device: FakeDevice, clients: List[TCPClient]) -> None:
+    pool = TCPPool([("127.0.0.1", unused_port()), (fake_device.server, fake_device.port)])
+
+    assert pool.health_check() == {
+        str(endpoint): endpoint is pool.endpoints[1] for endpoint in pool.endpoints
+    }
+    assert pool.exchange(0xE0, 0x01) == (0x9000, b"\xe0\x01\x00\x00\x00")
+    assert clients[0].socket.fileno() == -1
+    pool.close()
@@ -0,0 +1,86 @@
+from typing import Iterator
+
+import pytest
+
+from ledgercomm import Transport
+from ledgercomm.fake_device import FakeDevice, ScriptedHandler
+
+
+@pytest.fixture
+def transport(fake_device: FakeDevice) -> Iterator[Transport]:
+    transport = Transport(interface="tcp", server=fake_device.server, port=fake_device.port)
+    yield transport
+    transport.close()
+
+
+def apdus(count: int) -> list:
+    return [f"e0aa00{i:02x}00" for i in range(count)]
+
+
+def echo(apdu: str) -> tuple:
+    return 0x9000, bytes.fromhex(apdu)
+
+
+def test_exchange_many(transport: Transport) -> None:
+    assert transport.exchange_many(apdus(20), window=4) == [echo(apdu) for apdu in apdus(20)]
+
+
+@pytest.mark.parametrize("window", [1, 4, 8])
+def test_invalid_apdu_after_responses(transport: Transport, window: int) -> None:
+    responses = []
+
+    with pytest.raises(ValueError):
+        responses.extend(transport.exchange_iter(apdus(20) + ["zz"] + apdus(3), window=window))
+
+    # every APDU before the invalid one was exchanged and answered
+    assert responses == [echo(apdu) for apdu in apdus(20)]
+    assert transport.exchange_raw("e0bb000000") == echo("e0bb000000")
+
+
+def test_empty_apdu(transport: Transport) -> None:
+    with pytest.raises(ValueError, match="empty"):
+        transport.exchange_many(apdus(5) + [b""])
+
+    assert transport.exchange_raw("e0bb000000") == echo("e0bb000000")
+
+
+def test_failing_source(transport: Transport) -> None:
+    def source() -> Iterator[str]:
+        yield from apdus(6)
+        raise KeyError("source failed")
+
+    responses = []
+    with pytest.raises(KeyError):
+        responses.extend(transport.exchange_iter(source(), window=8))
+
+    assert responses == [echo(apdu) for apdu in apdus(6)]
+    assert transport.exchange_raw("e0bb000000") == echo("e0bb000000")
+
+
+def test_consumer_stops_early(transport: Transport) -> None:
+    responses = transport.exchange_iter(apdus(20), window=8)
+    assert next(responses) == echo(apdus(1)[0])
+    responses.close()
+
+    assert transport.exchange_raw("e0bb000000") == echo("e0bb000000")
+
+
+def test_consumer_raises(transport: Transport) -> None:
+    with pytest.raises(RuntimeError):
+        for _ in transport.exchange_iter(apdus(20), window=8):
+            raise RuntimeError("consumer failed")
+
+    assert transport.exchange_raw("e0bb000000") == echo("e0bb000000")
+
+
+def test_stop_on_error() -> None:
+    handler = ScriptedHandler({b"\xe0\xaa\x00\x02": (0x6A80, b"")}, default_sw=0x9000)
+
+    with FakeDevice(handler) as device:
+        transport = Transport(interface="tcp", server=device.server, port=device.port)
+        # the invalid APDU is never reached
+        responses = transport.exchange_many(apdus(10) + ["zz"], window=8, stop_on_error=True)
+
+        assert responses == [(0x9000, b""), (0x9000, b""), (0x6A80, b"")]
+        assert transport.exchange_raw("e0bb000000") == (0x9000, b"")
+        transport.close()